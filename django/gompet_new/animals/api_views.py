@@ -45,6 +45,8 @@ from django.contrib.gis.geos import GEOSGeometry, GEOSException
 from django.db.models import Q
 import json
 from django.core.exceptions import FieldError, ObjectDoesNotExist
+from common.compound import CompoundDocumentViewMixin
+from common.follower_counts import annotate_followers_count
 from common.models import Reaction, ReactionType
 from django.contrib.auth import get_user_model
 
@@ -138,7 +140,7 @@ class StandardizedErrorResponseMixin:
     tags=["animals", "animals_new"],
     description="API do zarządzania zwierzętami, ich cechami, galeriami oraz relacjami rodzic–dziecko."
 )
-class AnimalViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
+class AnimalViewSet(StandardizedErrorResponseMixin, CompoundDocumentViewMixin, viewsets.ModelViewSet):
     """
     list, retrieve, create, update, partial_update, destroy dla modelu Animal
 Opis filtrów
@@ -631,6 +633,12 @@ localhost/animals/animals/?size=MEDIUM
         if user_animals_by_id_param:
             qs = qs.filter(owner__id=user_animals_by_id_param)
 
+        if self.action in ("list", "retrieve"):
+            # ``?fields=``/``?omit=`` – relacje i kolumny tylko dla wybranych pól
+            qs = AnimalSerializer.sparse_queryset(qs, self.request)
+            if "followers_count" in AnimalSerializer.selected_field_names(self.request):
+                qs = annotate_followers_count(qs)
+
         limit_param = params.get('limit')
         if limit_param:
             try:
@@ -18,7 +18,11 @@ from users.serializers import OrganizationSerializer, UserSerializer
 
 from .models import ParentRelation
 
-from common.serializers import CommentSerializer
+from common.comment_preview import CommentPreviewSerializerMixin
+from common.compound import CompoundDocumentListSerializer, CompoundDocumentSerializerMixin, IncludedRelation
+from common.follower_counts import EMBEDDED_CONTEXT_KEY, FollowersCountSerializerMixin
+from common.reaction_summary import ReactionSummarySerializerMixin
+from common.sparse_fields import FieldPlan, SparseFieldsetsMixin
 
 
 class Base64ImageField(serializers.ImageField):
@@ -179,7 +183,48 @@ class NullableOrganizationPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedFi
         return super().to_internal_value(data)
 
 
-class AnimalSerializer(serializers.ModelSerializer):
+class AnimalSummarySerializer(serializers.ModelSerializer):
+    """Skrócone zwierzę do side-loadu (``included.animals``) i kart list."""
+
+    class Meta:
+        model = Animal
+        fields = ("id", "name", "image", "species", "breed", "status", "city")
+
+
+class AnimalSerializer(
+    CompoundDocumentSerializerMixin,
+    SparseFieldsetsMixin,
+    CommentPreviewSerializerMixin,
+    FollowersCountSerializerMixin,
+    ReactionSummarySerializerMixin,
+    serializers.ModelSerializer,
+):
+    # ``?embed=included`` – właściciel i organizacja raz na stronę w ``included``
+    included_relations = {
+        "owner_info": IncludedRelation("users", "owner", UserSerializer),
+        "organization": IncludedRelation("organizations", "organization", OrganizationSerializer),
+    }
+    # ``?fields=``/``?omit=`` – relacje i kolumny ładowane tylko dla wybranych pól
+    sparse_field_plans = {
+        "owner": FieldPlan(columns=("owner",)),
+        "owner_info": FieldPlan(columns=("owner",), select_related=("owner",)),
+        "age_display": FieldPlan(columns=("birth_date",)),
+        "parents": FieldPlan(),
+        "distance": FieldPlan(),
+        "organization": FieldPlan(
+            columns=("organization",),
+            select_related=("organization__address",),
+            prefetch_related=("organization__address__species",),
+        ),
+        "organization_id": FieldPlan(columns=("organization",)),
+        "gallery": FieldPlan(prefetch_related=("gallery",)),
+        "comments_count": FieldPlan(),
+        "comments_preview": FieldPlan(),
+        "followers_count": FieldPlan(),
+        "reactions": FieldPlan(prefetch_related=("reactions",)),
+        "reaction_summary": FieldPlan(),
+    }
+
     owner = serializers.PrimaryKeyRelatedField(read_only=True)
     owner_info = UserSerializer(source="owner", read_only=True)
     age = serializers.IntegerField(read_only=True)
@@ -195,8 +240,14 @@ class AnimalSerializer(serializers.ModelSerializer):
     parents = serializers.SerializerMethodField(read_only=True)
     #parentships = AnimalParentSerializer(many=True, read_only=True)
     #offsprings = AnimalParentSerializer(many=True, read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    # liczba komentarzy i (z ``?comments-preview=N``) ostatnie N – pełny wątek w ``CommentViewSet``
+    comments_count = serializers.SerializerMethodField()
+    comments_preview = serializers.SerializerMethodField()
+    # licznik z ``follower_counts`` – widok dokłada go podzapytaniem do listy
+    followers_count = serializers.SerializerMethodField()
     reactions = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    # ``?reactions-version=2`` zastępuje ``reactions`` zbiorczym podsumowaniem.
+    reaction_summary = serializers.SerializerMethodField()
     distance = serializers.SerializerMethodField(read_only=True)
     organization = serializers.SerializerMethodField(read_only=True)
     organization_id = NullableOrganizationPrimaryKeyRelatedField(
@@ -247,8 +298,11 @@ class AnimalSerializer(serializers.ModelSerializer):
             #"offsprings",
             
            
-            "comments",
+            "comments_count",
+            "comments_preview",
+            "followers_count",
             "reactions",
+            "reaction_summary",
             "organization",
             "organization_id",
             "created_at",
@@ -258,6 +312,7 @@ class AnimalSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         )
+        list_serializer_class = CompoundDocumentListSerializer
 
     @staticmethod
     def _normalize_lookup_value(value):
@@ -321,8 +376,11 @@ class AnimalSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation["species"] = self._get_species_data(representation.get("species"))
-        representation["breed"] = self._get_breed_data(representation.get("breed"))
+        # pola mogły zostać pominięte przez ``?fields=``/``?omit=``
+        if "species" in representation:
+            representation["species"] = self._get_species_data(representation.get("species"))
+        if "breed" in representation:
+            representation["breed"] = self._get_breed_data(representation.get("breed"))
         return representation
 
     
@@ -372,7 +430,9 @@ class AnimalSerializer(serializers.ModelSerializer):
         """Return organization data only from explicit animal relation."""
         organization = getattr(obj, "organization", None)
         if organization:
-            return OrganizationSerializer(organization, context=self.context).data
+            return OrganizationSerializer(
+                organization, context={**self.context, EMBEDDED_CONTEXT_KEY: True}
+            ).data
         return None
 
     def validate_organization_id(self, organization):
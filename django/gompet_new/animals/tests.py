@@ -5,14 +5,18 @@ import tempfile
 from unittest.mock import patch
 
 from django.core.exceptions import ValidationError
+from django.contrib.contenttypes.models import ContentType
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.contrib.gis.geos import Point
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from common.models import Comment
 from users.models import Address, MemberRole, Organization, OrganizationMember, OrganizationType, Species
 
 from .models import (
@@ -1038,3 +1042,73 @@ class AnimalCharacteristicsListEndpointTests(TestCase):
         self.assertIn(cat_characteristic.characteristic, names)
         self.assertNotIn("hasChip", names)
         self.assertTrue(all(item["species"] == cat_species.label for item in response.data))
+
+
+class AnimalCommentPreviewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="preview-commenter@example.com",
+            password="secret",
+            first_name="Preview",
+            last_name="Commenter",
+        )
+        self.animal_ct = ContentType.objects.get_for_model(Animal)
+        self.animals = [
+            Animal.objects.create(name=f"PreviewDog{index}", species="Dog", gender=Gender.MALE, size=Size.SMALL)
+            for index in range(3)
+        ]
+
+    def _comment(self, animal, body, minutes_ago):
+        comment = Comment.objects.create(
+            user=self.user,
+            content_type=self.animal_ct,
+            object_id=animal.id,
+            body=body,
+        )
+        Comment.objects.filter(pk=comment.pk).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+        return comment
+
+    def _results(self, response):
+        return {item["id"]: item for item in response.data.get("results", response.data)}
+
+    def test_list_exposes_comments_count_without_full_thread(self):
+        for index in range(4):
+            self._comment(self.animals[0], f"Comment number {index}", minutes_ago=index)
+
+        response = self.client.get(reverse("animal-list"))
+
+        self.assertEqual(response.status_code, 200)
+        results = self._results(response)
+        self.assertEqual(results[self.animals[0].id]["comments_count"], 4)
+        self.assertEqual(results[self.animals[1].id]["comments_count"], 0)
+        self.assertNotIn("comments", results[self.animals[0].id])
+        self.assertNotIn("comments_preview", results[self.animals[0].id])
+
+    def test_preview_returns_latest_comments_per_animal(self):
+        for index in range(4):
+            self._comment(self.animals[0], f"First animal comment {index}", minutes_ago=index)
+        self._comment(self.animals[1], "Second animal comment", minutes_ago=1)
+
+        response = self.client.get(reverse("animal-list"), {"comments-preview": 2})
+
+        results = self._results(response)
+        first_preview = results[self.animals[0].id]["comments_preview"]
+        self.assertEqual(
+            [comment["body"] for comment in first_preview],
+            ["First animal comment 0", "First animal comment 1"],
+        )
+        self.assertEqual(len(results[self.animals[1].id]["comments_preview"]), 1)
+        self.assertEqual(results[self.animals[2].id]["comments_preview"], [])
+
+    def test_preview_queries_do_not_grow_with_page(self):
+        for animal in self.animals:
+            for index in range(3):
+                self._comment(animal, f"Comment number {index}", minutes_ago=index)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("animal-list"), {"comments-preview": 2})
+
+        comment_queries = [query["sql"] for query in queries.captured_queries if '"comments"' in query["sql"]]
+        self.assertEqual(len(comment_queries), 2)
+        self.assertTrue(any("ROW_NUMBER()" in sql for sql in comment_queries))
@@ -165,8 +165,9 @@ class ArticleViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
         if categories_slugs:
             queryset = queryset.filter(categories__slug__in=categories_slugs)
 
-
-
+        if self.request.method in permissions.SAFE_METHODS:
+            # ``?fields=``/``?omit=`` – relacje i kolumny tylko dla wybranych pól
+            queryset = ArticleSerializer.sparse_queryset(queryset, self.request)
 
         return queryset.distinct().order_by('-created_at')
 
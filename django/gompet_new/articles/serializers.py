@@ -1,6 +1,9 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
+from common.models import Comment, Reaction
+from common.sparse_fields import FieldPlan, SparseFieldsetsMixin
 from users.serializers import UserSerializer
 from .models import Article, ArticleCategory
 
@@ -26,7 +29,22 @@ class AuthorSerializer(serializers.ModelSerializer):
         model = User
         fields = ("id", "email")
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    sparse_field_plans = {
+        "author": FieldPlan(columns=("author",), select_related=("author",)),
+        "categories": FieldPlan(prefetch_related=("categories",)),
+        "comments": FieldPlan(
+            prefetch_related=(
+                Prefetch("comments", queryset=Comment.objects.only("id", "content_type_id", "object_id")),
+            ),
+        ),
+        "reactions": FieldPlan(
+            prefetch_related=(
+                Prefetch("reactions", queryset=Reaction.objects.only("id", "reactable_type_id", "reactable_id")),
+            ),
+        ),
+    }
+
     #author = AuthorSerializer(read_only=True)
     comments = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     reactions = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
@@ -2,9 +2,10 @@
 
 # Register your models here.
 from django.contrib import admin
-from .models import Comment, Reaction, Notification, Follow
+from .models import Comment, Reaction, Notification, Follow, OutboxMessage
 
 admin.site.register(Comment)
 admin.site.register(Reaction)
 admin.site.register(Notification)
 admin.site.register(Follow)
+admin.site.register(OutboxMessage)
@@ -1,16 +1,31 @@
+from collections import defaultdict
+
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 from drf_spectacular.utils import extend_schema
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from common.follower_counts import get_follower_counts
 from common.like_counter import resolve_content_type
-from common.models import Comment, Follow, Notification, Reaction, ReactionType
+from common.models import Comment, Follow, FollowerCount, Notification, Reaction, ReactionType
+from common.pagination import KeysetCursorPagination, uses_cursor_pagination
+from common.unread_counter import (
+    adjust_unread_count,
+    cache_unread_count,
+    get_unread_count,
+    push_unread_count,
+    refresh_unread_count,
+)
 
 from .serializers import (
     CommentSerializer,
     ContentTypeSerializer,
+    FollowedTargetSerializer,
     NotificationSerializer,
     ReactionSerializer,
     FollowSerializer,
@@ -101,8 +116,89 @@ class StandardizedErrorResponseMixin:
 
         return response
 
+
+BATCH_LOOKUP_MAX_SIZE = 100
+
+
+class BatchLookupError(ValueError):
+    """Raised when batch lookup query parameters are invalid."""
+
+
+def parse_batch_targets(type_param, ids_param, mixed_param, type_name, ids_name):
+    """Parse batch lookup params into ``[(key, ContentType, object_id), ...]``.
+
+    Supports a single content type (``type_name=animals.animal&ids_name=1,2``)
+    where keys are plain ids, or mixed content types
+    (``reactables=animals.animal:1,posts.post:2``) where keys are ``type:id``.
+    """
+    if mixed_param:
+        raw_items = [item.strip() for item in mixed_param.split(",") if item.strip()]
+        targets = []
+        for item in raw_items:
+            raw_type, separator, raw_id = item.rpartition(":")
+            if not separator:
+                raise BatchLookupError(f"Invalid item '{item}', expected 'app_label.model:id'.")
+            try:
+                content_type = resolve_content_type(raw_type)
+            except ContentType.DoesNotExist:
+                raise BatchLookupError(f"Invalid '{type_name}' in item '{item}'.")
+            try:
+                object_id = int(raw_id)
+            except (TypeError, ValueError):
+                raise BatchLookupError(f"Invalid id in item '{item}'.")
+            targets.append((f"{content_type.app_label}.{content_type.model}:{object_id}", content_type, object_id))
+    else:
+        if type_param is None or ids_param is None:
+            raise BatchLookupError(
+                f"Query parameters '{type_name}' and '{ids_name}' are required."
+            )
+        try:
+            content_type = resolve_content_type(type_param)
+        except ContentType.DoesNotExist:
+            raise BatchLookupError(f"Invalid '{type_name}'.")
+        try:
+            object_ids = [int(value) for value in ids_param.split(",") if value.strip()]
+        except (TypeError, ValueError):
+            raise BatchLookupError(f"Invalid '{ids_name}'.")
+        targets = [(str(object_id), content_type, object_id) for object_id in object_ids]
+
+    if not targets:
+        raise BatchLookupError(f"At least one id is required in '{ids_name}'.")
+    if len(targets) > BATCH_LOOKUP_MAX_SIZE:
+        raise BatchLookupError(
+            f"At most {BATCH_LOOKUP_MAX_SIZE} objects can be looked up at once."
+        )
+    return targets
+
+
+def build_batch_target_filter(targets, type_field, id_field):
+    """Build one ``Q`` matching all targets, grouped by content type."""
+    ids_by_type = defaultdict(set)
+    for _, content_type, object_id in targets:
+        ids_by_type[content_type.pk].add(object_id)
+
+    condition = Q()
+    for content_type_id, object_ids in ids_by_type.items():
+        condition |= Q(**{f"{type_field}_id": content_type_id, f"{id_field}__in": object_ids})
+    return condition
+
+
+def map_batch_results(targets, rows):
+    """Map ``(content_type_id, object_id, value)`` rows back to target keys (0 when missing)."""
+    found = {(content_type_id, object_id): value for content_type_id, object_id, value in rows}
+    return {
+        key: found.get((content_type.pk, object_id), 0)
+        for key, content_type, object_id in targets
+    }
+
+
 # common/api_serializers.py
 
+class CommentCursorPagination(KeysetCursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 20
+
+
 @extend_schema(
     tags=["comments", "comments_organizations", "comments_orgazanizations_profile"],
     description="CRUD API dla komentarzy. GET list, POST create, PUT/PATCH update, DELETE delete."
@@ -127,17 +223,28 @@ class CommentViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
     z danymi:
     
     {"content_type":["To pole jest wymagane."],"object_id":["To pole jest wymagane."],"body":["To pole jest wymagane."]}
+
+    Pełny wątek obiektu stronicowany kursorem po ``(created_at, id)``:
+    GET /common/comments/?content_type=animals.animal&object_id=20&pagination=cursor
+    → {"next": "...?cursor=...", "results": [...]}
+    Bez ``pagination=cursor`` lista zostaje płaska (opcjonalnie przycięta ``limit``).
     """
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.DjangoModelPermissionsOrAnonReadOnly]
+    pagination_class = CommentCursorPagination
+
+    def paginate_queryset(self, queryset):
+        if not uses_cursor_pagination(self.request):
+            return None
+        return super().paginate_queryset(queryset)
 
     def get_queryset(self):
         """
         Optionally restricts the returned comments to a given object,
         by filtering against `content_type` and `object_id` query parameters in the URL.
         """
-        queryset = Comment.objects.all()
+        queryset = Comment.objects.select_related("user")
         object_id = self.request.query_params.get('object_id')
         content_type_id = self.request.query_params.get('content_type')
         limit = self.request.query_params.get('limit')
@@ -149,8 +256,7 @@ class CommentViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
             # Sprawdź, czy content_type jest stringiem w formacie 'app_label.model'
             if '.' in content_type_id:
                 try:
-                    app_label, model = content_type_id.split('.')
-                    content_type_obj = ContentType.objects.get_by_natural_key(app_label, model)
+                    content_type_obj = resolve_content_type(content_type_id)
                     queryset = queryset.filter(content_type=content_type_obj)
                 except ContentType.DoesNotExist:
                     # Opcjonalnie: obsłuż błąd, jeśli podany content_type nie istnieje
@@ -160,7 +266,8 @@ class CommentViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
                 # Zakładamy, że to ID
                 queryset = queryset.filter(content_type_id=content_type_id)
 
-        if limit is not None:
+        # kursor sam wyznacza rozmiar strony – pocięty queryset nie da się filtrować
+        if limit is not None and not uses_cursor_pagination(self.request):
             try:
                 limit_value = int(limit)
             except (TypeError, ValueError):
@@ -264,8 +371,7 @@ class ReactionViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
             # Sprawdź, czy reactable_type jest stringiem w formacie 'app_label.model'
             if '.' in reactable_type:
                 try:
-                    app_label, model = reactable_type.split('.')
-                    content_type_obj = ContentType.objects.get_by_natural_key(app_label, model)
+                    content_type_obj = resolve_content_type(reactable_type)
                     queryset = queryset.filter(reactable_type=content_type_obj)
                 except ContentType.DoesNotExist:
                     # Opcjonalnie: obsłuż błąd, jeśli podany reactable_type nie istnieje
@@ -380,23 +486,100 @@ class ReactionViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
 
         return Response({"reaction_id": reaction_id or 0})
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="has-reactions",
+        url_name="has-reactions",
+    )
+    def has_reactions(self, request):
+        """Wsadowa wersja ``has-reaction`` dla strony obiektów (jedno zapytanie).
+
+        GET /common/reactions/has-reactions/?reactable_type=posts.post&reactable_ids=1,2,3
+        -> {"reactions": {"1": 8, "2": 0, "3": 0}}
+
+        Mieszane typy: ?reactables=animals.animal:4,posts.post:2
+        -> {"reactions": {"animals.animal:4": 0, "posts.post:2": 11}}
+        """
+        reaction_type_value = request.query_params.get(
+            "reaction_type", ReactionType.LIKE
+        ).upper()
+        if reaction_type_value not in ReactionType.values:
+            return self.validation_error_response(
+                {"detail": "Invalid 'reaction_type'."}
+            )
+
+        try:
+            targets = parse_batch_targets(
+                request.query_params.get("reactable_type"),
+                request.query_params.get("reactable_ids"),
+                request.query_params.get("reactables"),
+                "reactable_type",
+                "reactable_ids",
+            )
+        except BatchLookupError as exc:
+            return self.validation_error_response({"detail": str(exc)})
+
+        if not request.user.is_authenticated:
+            return Response({"reactions": map_batch_results(targets, [])})
+
+        rows = Reaction.objects.filter(
+            build_batch_target_filter(targets, "reactable_type", "reactable_id"),
+            user=request.user,
+            reaction_type=reaction_type_value,
+        ).values_list("reactable_type_id", "reactable_id", "id")
+
+        return Response({"reactions": map_batch_results(targets, rows)})
+
+
+class NotificationCursorPagination(KeysetCursorPagination):
+    ordering = ("-last_activity_at", "-id")
+    page_size = 20
+
 
 @extend_schema(
     tags=["notifications"],
     description="Lista powiadomień zalogowanego użytkownika oraz oznaczanie ich jako przeczytane.",
 )
 class NotificationViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
+    """
+    Lista powiadomień (domyślnie płaska tablica). Z ``?pagination=cursor``
+    stronicowana kursorem po ``(last_activity_at, id)``:
+    GET /common/notifications/?pagination=cursor&page_size=20 → {"next": "...?cursor=...", "results": [...]}
+
+    ``?is_read=false`` zawęża listę do nieprzeczytanych (indeks
+    ``idx_notification_rec_read``). Etykiety celów całej strony pobierane są
+    zbiorczo, więc liczba zapytań nie zależy od rozmiaru strony.
+    """
+
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationCursorPagination
+    # bez POST na liście – jedyny POST to akcja mark-all-read (własne http_method_names)
     http_method_names = ["get", "patch", "head", "options"]
 
+    def paginate_queryset(self, queryset):
+        if not uses_cursor_pagination(self.request):
+            return None
+        return super().paginate_queryset(queryset)
+
     def get_queryset(self):
-        return (
+        queryset = (
             Notification.objects.filter(recipient=self.request.user)
             .select_related("actor")
-            .order_by("-created_at")
+            .order_by("-last_activity_at", "-id")
         )
 
+        is_read = self.request.query_params.get("is_read")
+        if is_read is not None:
+            normalized = is_read.strip().lower()
+            if normalized in {"1", "true", "yes"}:
+                queryset = queryset.filter(is_read=True)
+            elif normalized in {"0", "false", "no"}:
+                queryset = queryset.filter(is_read=False)
+
+        return queryset
+
     def partial_update(self, request, *args, **kwargs):
         disallowed_fields = set(request.data.keys()) - {"is_read"}
         if disallowed_fields:
@@ -406,6 +589,84 @@ class NotificationViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet)
 
         return super().partial_update(request, *args, **kwargs)
 
+    def perform_update(self, serializer):
+        was_read = serializer.instance.is_read
+        notification = serializer.save()
+        if was_read == notification.is_read:
+            return
+
+        recipient_id = notification.recipient_id
+        delta = -1 if notification.is_read else 1
+
+        def _update_counter() -> None:
+            adjust_unread_count(recipient_id, delta)
+            push_unread_count(recipient_id)
+
+        transaction.on_commit(_update_counter)
+
+    @action(detail=False, methods=["get"], url_path="unread-count", url_name="unread-count")
+    def unread_count(self, request):
+        """
+        GET /common/notifications/unread-count/ → {"unread": 3}
+        Licznik z cache (bez zapytania do bazy, gdy wpis istnieje).
+        """
+
+        return Response({"unread": get_unread_count(request.user.id)})
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="mark-all-read",
+        url_name="mark-all-read",
+        http_method_names=["post", "options"],
+    )
+    def mark_all_read(self, request):
+        """
+        POST /common/notifications/mark-all-read/
+        opcjonalnie {"up_to_last_activity_at": "...", "up_to_id": 120} – znacznik ostatniego
+        powiadomienia widzianego przez klienta (``last_activity_at`` i ``id`` z listy).
+        Oznacza nieprzeczytane jako przeczytane jednym UPDATE.
+        Zwraca {"updated": n, "unread": m}.
+        """
+
+        queryset = Notification.objects.filter(recipient=request.user, is_read=False)
+
+        up_to_id = request.data.get("up_to_id")
+        up_to_last_activity_at = request.data.get("up_to_last_activity_at")
+        if up_to_id is not None or up_to_last_activity_at is not None:
+            try:
+                up_to_id = int(up_to_id)
+            except (TypeError, ValueError):
+                return self.validation_error_response(
+                    {"up_to_id": "Must be an integer."}
+                )
+            up_to_last_activity_at = parse_datetime(str(up_to_last_activity_at or ""))
+            if up_to_last_activity_at is None:
+                return self.validation_error_response(
+                    {"up_to_last_activity_at": "Must be an ISO 8601 datetime."}
+                )
+            # znacznik po kolejności listy – id grupy nie mówi, czy klient widział jej odświeżenie
+            queryset = queryset.filter(
+                Q(last_activity_at__lt=up_to_last_activity_at)
+                | Q(last_activity_at=up_to_last_activity_at, id__lte=up_to_id)
+            )
+
+        updated = queryset.update(is_read=True)
+        if up_to_last_activity_at is None:
+            unread = 0
+            cache_unread_count(request.user.id, unread)
+        else:
+            unread = refresh_unread_count(request.user.id)
+
+        user_id = request.user.id
+        transaction.on_commit(lambda: push_unread_count(user_id, unread))
+        return Response({"updated": updated, "unread": unread})
+
+
+
+class FollowCursorPagination(KeysetCursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 20
 
 
 @extend_schema(
@@ -430,8 +691,7 @@ class FollowViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
         if target_type is not None:
             if "." in target_type:
                 try:
-                    app_label, model = target_type.split(".")
-                    content_type_obj = ContentType.objects.get_by_natural_key(app_label, model)
+                    content_type_obj = resolve_content_type(target_type)
                     queryset = queryset.filter(target_type=content_type_obj)
                 except ContentType.DoesNotExist:
                     return queryset.none()
@@ -443,6 +703,24 @@ class FollowViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="targets",
+        url_name="targets",
+        serializer_class=FollowedTargetSerializer,
+        pagination_class=FollowCursorPagination,
+    )
+    def targets(self, request):
+        """Obserwowane obiekty użytkownika ze skróconą reprezentacją, stronicowane kursorem.
+
+        GET /common/follows/targets/?target_type=animals.animal&page_size=20
+        → {"next": "...?cursor=...", "results": [{"target_type": "animals.animal", "target": {...}}]}
+        """
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=False, methods=["get"], url_path="is-following", url_name="is-following")
     def is_following(self, request):
         target_type_param = request.query_params.get("target_type")
@@ -479,6 +757,31 @@ class FollowViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
 
         return Response({"follow_id": follow_id or 0})
 
+    @action(detail=False, methods=["get"], url_path="is-following-batch", url_name="is-following-batch")
+    def is_following_batch(self, request):
+        """Wsadowa wersja ``is-following`` zwracająca mapę id -> follow_id (0 gdy brak).
+
+        GET /common/follows/is-following-batch/?target_type=animals.animal&target_ids=1,2
+        Mieszane typy: ?targets=animals.animal:1,users.organization:3
+        """
+        try:
+            targets = parse_batch_targets(
+                request.query_params.get("target_type"),
+                request.query_params.get("target_ids"),
+                request.query_params.get("targets"),
+                "target_type",
+                "target_ids",
+            )
+        except BatchLookupError as exc:
+            return self.validation_error_response({"detail": str(exc)})
+
+        rows = Follow.objects.filter(
+            build_batch_target_filter(targets, "target_type", "target_id"),
+            user=request.user,
+        ).values_list("target_type_id", "target_id", "id")
+
+        return Response({"follows": map_batch_results(targets, rows)})
+
     @action(
         detail=False,
         methods=["get"],
@@ -517,9 +820,36 @@ class FollowViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
                 {"detail": "Invalid 'target_id'."}
             )
 
-        followers_count = Follow.objects.filter(
-            target_type=target_content_type,
-            target_id=target_id,
-        ).count()
+        followers_count = get_follower_counts(target_content_type, [target_id])[target_id]
 
         return Response({"followers_count": followers_count})
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="followers-count-batch",
+        url_name="followers-count-batch",
+        permission_classes=[permissions.IsAuthenticatedOrReadOnly],
+    )
+    def followers_count_batch(self, request):
+        """Wsadowa wersja ``followers-count`` – mapa id -> liczba obserwujących (0 gdy brak).
+
+        GET /common/follows/followers-count-batch/?target_type=animals.animal&target_ids=1,2
+        Mieszane typy: ?targets=animals.animal:1,users.organization:3
+        """
+        try:
+            targets = parse_batch_targets(
+                request.query_params.get("target_type"),
+                request.query_params.get("target_ids"),
+                request.query_params.get("targets"),
+                "target_type",
+                "target_ids",
+            )
+        except BatchLookupError as exc:
+            return self.validation_error_response({"detail": str(exc)})
+
+        rows = FollowerCount.objects.filter(
+            build_batch_target_filter(targets, "target_type", "target_id"),
+        ).values_list("target_type_id", "target_id", "followers_count")
+
+        return Response({"followers_count": map_batch_results(targets, rows)})
@@ -9,5 +9,9 @@ class CommonConfig(AppConfig):
         # Importujemy sygnały przy starcie aplikacji aby zapewnić rejestrację
         # nasłuchiwaczy post_save/post_delete dla modelu Reaction.
         from . import signals  # noqa: F401
+        # Rejestruje czyszczenie procesowego cache ContentType po migracjach.
+        from . import content_types  # noqa: F401
+        # Check: funkcje na cache wymagają cache współdzielonego między procesami.
+        from . import shared_cache  # noqa: F401
 
         return super().ready()
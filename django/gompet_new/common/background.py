@@ -0,0 +1,55 @@
+"""Wykonywanie zadań poza ścieżką żądania HTTP (pula wątków w procesie)."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "BACKGROUND_TASK_WORKERS", 2),
+                thread_name_prefix="gompet-background",
+            )
+        return _executor
+
+
+def _run(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception("Zadanie w tle %s zakończyło się błędem", getattr(func, "__name__", func))
+        raise
+    finally:
+        # wątek puli ma własne połączenia DB – nie zostawiamy ich otwartych
+        connections.close_all()
+
+
+def run_in_background(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future | None:
+    """Uruchamia ``func`` w puli wątków.
+
+    Przy ``BACKGROUND_TASKS_ASYNC = False`` (np. w testach) zadanie wykonuje się
+    od razu w bieżącym wątku i zwracane jest ``None``.
+    """
+
+    if not getattr(settings, "BACKGROUND_TASKS_ASYNC", True):
+        func(*args, **kwargs)
+        return None
+
+    return _get_executor().submit(_run, func, args, kwargs)
+
+
+__all__ = ["run_in_background"]
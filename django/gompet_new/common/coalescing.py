@@ -0,0 +1,100 @@
+"""Zbijanie (coalescing) aktualizacji wysyłanych przez websocket.
+
+Używane przez licznik polubień (``common.signals``) i zgrupowane
+powiadomienia (``common.notifications``).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+GroupKey = tuple[int, int]
+SendCallable = Callable[[int, int], bool]
+
+
+class CoalescingBroadcaster:
+    """Zbiera aktualizacje o tym samym kluczu, np. grupie ``like_counter.{ct}.{id}``.
+
+    Pierwsza aktualizacja w oknie uruchamia timer, kolejne w tym samym oknie
+    są pomijane. Po upływie okna wysyłana jest jedna wiadomość z aktualną
+    (najnowszą) wartością, liczoną dopiero w momencie wysyłki.
+    Okno ``<= 0`` oznacza natychmiastową wysyłkę bez zbijania. Zbijanie
+    działa w obrębie procesu – każdy worker ma własne timery, więc przy kilku
+    workerach ta sama grupa może dostać po jednej wiadomości z każdego. Klucz to
+    para liczb przekazywana do ``send`` (np. ``(content_type_id, object_id)``
+    albo ``(recipient_id, notification_id)``), a długość okna czytana jest z
+    ustawienia ``window_setting``.
+    """
+
+    def __init__(
+        self,
+        send: SendCallable,
+        window_setting: str,
+        window: float | None = None,
+    ) -> None:
+        self._send = send
+        self._window = window
+        self._window_setting = window_setting
+        self._lock = threading.Lock()
+        self._pending: dict[GroupKey, threading.Timer] = {}
+
+    @property
+    def window(self) -> float:
+        if self._window is not None:
+            return self._window
+        return float(getattr(settings, self._window_setting, 0))
+
+    def schedule(self, first_id: int, second_id: int) -> bool:
+        """Planuje wysyłkę; zwraca ``False`` gdy aktualizacja została zbita."""
+
+        window = self.window
+        if window <= 0:
+            return self._send(first_id, second_id)
+
+        key = (first_id, second_id)
+        with self._lock:
+            if key in self._pending:
+                return False
+            timer = threading.Timer(window, self._flush, args=(key,))
+            timer.daemon = True
+            self._pending[key] = timer
+        timer.start()
+        return True
+
+    def pending_keys(self) -> list[GroupKey]:
+        with self._lock:
+            return list(self._pending)
+
+    def flush_all(self) -> int:
+        """Natychmiast wysyła wszystkie oczekujące aktualizacje (np. w testach)."""
+
+        with self._lock:
+            pending = list(self._pending.items())
+            self._pending.clear()
+
+        for key, timer in pending:
+            timer.cancel()
+            self._send(*key)
+        return len(pending)
+
+    def _flush(self, key: GroupKey) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+
+        try:
+            self._send(*key)
+        except Exception:  # pragma: no cover - wątek w tle nie może rzucać dalej
+            logger.exception("Nie udało się wysłać zbitej aktualizacji %s", key)
+        finally:
+            # Timer działa we własnym wątku – zamykamy tylko jego połączenie DB.
+            connection.close()
+
+
+__all__ = ["CoalescingBroadcaster"]
@@ -0,0 +1,161 @@
+"""Licznik komentarzy i podgląd ostatnich N komentarzy liczone dla całej strony.
+
+Zamiast zagnieżdżać wszystkie komentarze obiektu, serializer zwraca
+``comments_count`` (jedno zapytanie GROUP BY na stronę), a z
+``?comments-preview=N`` także ``comments_preview`` – ostatnie ``N``
+komentarzy każdego obiektu z jednego zapytania z funkcją okna
+``ROW_NUMBER() OVER (PARTITION BY object_id ...)``. Pełny wątek udostępnia
+``CommentViewSet`` stronicowany kursorem.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.db.models.manager import BaseManager
+
+from .models import Comment
+from .reaction_summary import ReactionSummaryListSerializer
+from .serializers import CommentSerializer
+
+COMMENTS_PREVIEW_PARAM = "comments-preview"
+MAX_COMMENTS_PREVIEW = 10
+
+
+def comments_preview_size(request) -> int:
+    """Liczba komentarzy w podglądzie z ``?comments-preview=N`` (0 – bez podglądu)."""
+
+    if request is None:
+        return 0
+    raw = request.query_params.get(COMMENTS_PREVIEW_PARAM)
+    if raw is None:
+        return 0
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return 0
+    return max(0, min(value, MAX_COMMENTS_PREVIEW))
+
+
+def build_comment_counts(content_type: ContentType, object_ids: Iterable[int]) -> dict[int, int]:
+    """Zwraca ``{object_id: liczba komentarzy}`` jednym zapytaniem GROUP BY."""
+
+    object_ids = list(dict.fromkeys(object_ids))
+    counts = {object_id: 0 for object_id in object_ids}
+    if not object_ids:
+        return counts
+
+    rows = (
+        Comment.objects.filter(content_type=content_type, object_id__in=object_ids)
+        .values("object_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        counts[row["object_id"]] = row["total"]
+    return counts
+
+
+def build_comment_previews(
+    content_type: ContentType,
+    object_ids: Iterable[int],
+    limit: int,
+) -> dict[int, list[Comment]]:
+    """Ostatnie ``limit`` komentarzy każdego obiektu – jedno zapytanie z funkcją okna."""
+
+    object_ids = list(dict.fromkeys(object_ids))
+    previews: dict[int, list[Comment]] = {object_id: [] for object_id in object_ids}
+    if not object_ids or limit <= 0:
+        return previews
+
+    comments = (
+        Comment.objects.filter(content_type=content_type, object_id__in=object_ids)
+        .select_related("user")
+        .annotate(
+            preview_position=Window(
+                RowNumber(),
+                partition_by=[F("object_id")],
+                order_by=[F("created_at").desc(), F("id").desc()],
+            )
+        )
+        .filter(preview_position__lte=limit)
+        .order_by("object_id", "preview_position")
+    )
+    for comment in comments:
+        previews.setdefault(comment.object_id, []).append(comment)
+    return previews
+
+
+class CommentPreviewListSerializer(ReactionSummaryListSerializer):
+    """Liczy liczniki i podglądy komentarzy dla całej strony przed serializacją elementów."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        items = list(iterable)
+        if isinstance(self.child, CommentPreviewSerializerMixin):
+            self.child.prime_comment_previews(items)
+        return super().to_representation(items)
+
+
+class CommentPreviewSerializerMixin:
+    """Pola ``comments_count`` i opcjonalne ``comments_preview`` w miejsce pełnej listy.
+
+    Serializer musi zadeklarować oba pola jako ``SerializerMethodField`` i
+    użyć ``CommentPreviewListSerializer`` (lub klasy pochodnej) jako
+    ``Meta.list_serializer_class``.
+    """
+
+    def comments_preview_size(self) -> int:
+        return comments_preview_size(self.context.get("request"))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.comments_preview_size():
+            fields.pop("comments_preview", None)
+        return fields
+
+    def prime_comment_previews(self, instances: Iterable[Any]) -> None:
+        instances = list(instances)
+        self._comment_counts: dict[int, int] = {}
+        self._comment_previews: dict[int, list[Comment]] = {}
+        if not instances:
+            return
+
+        # pola mogły zostać pominięte przez ``?fields=``/``?omit=``
+        fields = self.fields
+        content_type = ContentType.objects.get_for_model(type(instances[0]))
+        object_ids = [instance.pk for instance in instances]
+        if "comments_count" in fields:
+            self._comment_counts = build_comment_counts(content_type, object_ids)
+        if "comments_preview" in fields:
+            self._comment_previews = build_comment_previews(
+                content_type, object_ids, self.comments_preview_size()
+            )
+
+    def get_comments_count(self, obj) -> int:
+        counts = getattr(self, "_comment_counts", None) or {}
+        if obj.pk not in counts:
+            counts = build_comment_counts(ContentType.objects.get_for_model(type(obj)), [obj.pk])
+        return counts[obj.pk]
+
+    def get_comments_preview(self, obj) -> list[dict[str, Any]]:
+        previews = getattr(self, "_comment_previews", None) or {}
+        if obj.pk not in previews:
+            previews = build_comment_previews(
+                ContentType.objects.get_for_model(type(obj)), [obj.pk], self.comments_preview_size()
+            )
+        return CommentSerializer(previews[obj.pk], many=True, context=self.context).data
+
+
+__all__ = [
+    "COMMENTS_PREVIEW_PARAM",
+    "CommentPreviewListSerializer",
+    "CommentPreviewSerializerMixin",
+    "MAX_COMMENTS_PREVIEW",
+    "build_comment_counts",
+    "build_comment_previews",
+    "comments_preview_size",
+]
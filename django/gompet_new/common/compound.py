@@ -0,0 +1,141 @@
+"""Dokument złożony (``?embed=included``) – obiekty powiązane serializowane raz na stronę.
+
+Zamiast zagnieżdżać tę samą organizację/użytkownika w każdym elemencie listy,
+elementy niosą same ID, a odpowiedź dostaje mapę ``included``::
+
+    {"results": [...], "included": {"users": {"5": {...}}, "organizations": {...}}}
+
+Serializer deklaruje ``included_relations`` (pole → kolekcja), listę obsługuje
+``CompoundDocumentListSerializer``, a widok dokłada ``included`` do odpowiedzi
+przez ``CompoundDocumentViewMixin``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from .comment_preview import CommentPreviewListSerializer
+
+EMBED_QUERY_PARAM = "embed"
+INCLUDED_EMBED = "included"
+
+
+@dataclass(frozen=True, slots=True)
+class IncludedRelation:
+    """Relacja side-loadowana do kolekcji ``collection`` serializerem ``serializer_class``."""
+
+    collection: str
+    attribute: str
+    serializer_class: type[serializers.BaseSerializer]
+
+
+def uses_included(request) -> bool:
+    # tylko odczyt – przy zapisie pola relacji muszą zostać zapisywalne
+    return (
+        request is not None
+        and request.method in SAFE_METHODS
+        and request.query_params.get(EMBED_QUERY_PARAM) == INCLUDED_EMBED
+    )
+
+
+class CompoundDocumentSerializerMixin:
+    """W trybie ``?embed=included`` zastępuje zagnieżdżone obiekty ich ID.
+
+    Pole o tej samej nazwie co atrybut relacji (np. ``author``) staje się
+    ``PrimaryKeyRelatedField``; pole pomocnicze (np. ``organization_info`` przy
+    istniejącym ``organization``) jest usuwane.
+    """
+
+    included_relations: dict[str, IncludedRelation] = {}
+
+    def uses_included(self) -> bool:
+        return uses_included(self.context.get("request"))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.uses_included():
+            return fields
+
+        self._active_included_relations = {
+            name: relation for name, relation in self.included_relations.items() if name in fields
+        }
+        for name, relation in self._active_included_relations.items():
+            if name == relation.attribute:
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+            else:
+                fields.pop(name)
+        return fields
+
+    def build_included(self, instances: Iterable[Any]) -> dict[str, dict[Any, Any]]:
+        """Serializuje unikalne obiekty powiązane – każdy dokładnie raz."""
+
+        # dostęp do ``fields`` wywołuje get_fields(), który wybiera aktywne relacje
+        self.fields
+        relations = getattr(self, "_active_included_relations", {})
+
+        grouped: dict[str, dict[Any, Any]] = {}
+        serializer_classes: dict[str, type[serializers.BaseSerializer]] = {}
+        for instance in instances:
+            for relation in relations.values():
+                related = getattr(instance, relation.attribute, None)
+                if related is None:
+                    continue
+                grouped.setdefault(relation.collection, {}).setdefault(related.pk, related)
+                serializer_classes.setdefault(relation.collection, relation.serializer_class)
+
+        included: dict[str, dict[Any, Any]] = {relation.collection: {} for relation in relations.values()}
+        for collection, objects in grouped.items():
+            data = serializer_classes[collection](
+                list(objects.values()), many=True, context=self.context
+            ).data
+            included[collection] = {item["id"]: item for item in data}
+        return included
+
+
+class CompoundDocumentListSerializer(CommentPreviewListSerializer):
+    """Lista z podsumowaniem reakcji i komentarzy, która w trybie ``included`` zbiera też obiekty powiązane."""
+
+    included: dict[str, dict[Any, Any]] | None = None
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        items = list(iterable)
+        representation = super().to_representation(items)
+        if isinstance(self.child, CompoundDocumentSerializerMixin) and self.child.uses_included():
+            self.included = self.child.build_included(items)
+        return representation
+
+
+def included_from(data) -> dict[str, dict[Any, Any]] | None:
+    serializer = getattr(data, "serializer", None)
+    return getattr(serializer, "included", None)
+
+
+class CompoundDocumentViewMixin:
+    """Dokłada ``included`` do stronicowanej odpowiedzi listy."""
+
+    def attach_included(self, response, data):
+        included = included_from(data)
+        if included is not None and isinstance(response.data, dict):
+            response.data["included"] = included
+        return response
+
+    def get_paginated_response(self, data):
+        return self.attach_included(super().get_paginated_response(data), data)
+
+
+__all__ = [
+    "CompoundDocumentListSerializer",
+    "CompoundDocumentSerializerMixin",
+    "CompoundDocumentViewMixin",
+    "EMBED_QUERY_PARAM",
+    "INCLUDED_EMBED",
+    "IncludedRelation",
+    "included_from",
+    "uses_included",
+]
@@ -4,14 +4,23 @@ from __future__ import annotations
 
 import logging
 from typing import Any
+from urllib.parse import parse_qs
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 
-from .like_counter import ReactableRef, build_payload, make_group_name, resolve_content_type
-from .notifications import make_user_group_name
+from .like_counter import (
+    ReactableRef,
+    build_payload,
+    build_payloads,
+    make_group_name,
+    resolve_content_type,
+)
+from .notifications import make_user_group_name, notifications_since
+from .presence import amark_connected, amark_disconnected
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +78,120 @@ class LikeCounterConsumer(AsyncJsonWebsocketConsumer):
         await self.send_json(event["payload"])
 
 
+MAX_LIKE_SUBSCRIPTIONS = 200
+
+
+def parse_reactable_refs(items: Any) -> list[ReactableRef]:
+    """Zamienia listę ``{"type": "app.model", "id": 1}`` (lub ``"app.model:1"``) na referencje.
+
+    ContentType pobierany jest z procesowego cache, więc subskrypcje nie
+    trafiają do bazy po typy obiektów.
+    """
+
+    if not isinstance(items, list):
+        raise ValueError("Pole 'reactables' musi być listą.")
+
+    refs: list[ReactableRef] = []
+    seen: set[tuple[int, int]] = set()
+    for item in items:
+        if isinstance(item, dict):
+            type_value, id_value = item.get("type"), item.get("id")
+        elif isinstance(item, str) and ":" in item:
+            type_value, id_value = item.rsplit(":", 1)
+        else:
+            raise ValueError(f"Niepoprawny obiekt: {item!r}.")
+
+        try:
+            object_id = int(id_value)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Niepoprawne id obiektu: {id_value!r}.") from exc
+
+        try:
+            content_type = resolve_content_type(type_value)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Niepoprawny typ obiektu: {type_value!r}.") from exc
+
+        key = (content_type.pk, object_id)
+        if key in seen:
+            continue
+        seen.add(key)
+        refs.append(ReactableRef(content_type=content_type, object_id=object_id))
+    return refs
+
+
+class MultiLikeCounterConsumer(AsyncJsonWebsocketConsumer):
+    """Jeden websocket dla wielu liczników polubień.
+
+    Klient wysyła ``{"action": "subscribe", "reactables": [{"type": "posts.post", "id": 1}, ...]}``
+    oraz analogicznie ``"unsubscribe"``. Po subskrypcji otrzymuje
+    ``{"type": "snapshot", "items": [...]}`` z aktualnymi licznikami (jedno
+    zapytanie dla całej paczki), a następnie pojedyncze aktualizacje w tym
+    samym formacie co ``LikeCounterConsumer``.
+    """
+
+    subscriptions: set[str]
+
+    async def connect(self) -> None:
+        self.subscriptions = set()
+        await self.accept()
+
+    async def disconnect(self, code: int) -> None:  # noqa: D401 - API channels
+        for group_name in getattr(self, "subscriptions", set()):
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+        self.subscriptions = set()
+        await super().disconnect(code)
+
+    async def receive_json(self, content: Any, **kwargs: Any) -> None:
+        action = content.get("action") if isinstance(content, dict) else None
+        if action not in {"subscribe", "unsubscribe"}:
+            await self.send_json({"type": "error", "detail": "Nieznana akcja."})
+            return
+
+        try:
+            refs = await database_sync_to_async(parse_reactable_refs)(content.get("reactables"))
+        except (ValueError, ContentType.DoesNotExist) as exc:
+            await self.send_json({"type": "error", "detail": str(exc) or "Nieznany typ obiektu."})
+            return
+
+        if action == "subscribe":
+            await self._subscribe(refs)
+        else:
+            await self._unsubscribe(refs)
+
+    async def _subscribe(self, refs: list[ReactableRef]) -> None:
+        new_refs = [
+            ref
+            for ref in refs
+            if make_group_name(ref.content_type.pk, ref.object_id) not in self.subscriptions
+        ]
+        if len(self.subscriptions) + len(new_refs) > MAX_LIKE_SUBSCRIPTIONS:
+            await self.send_json(
+                {
+                    "type": "error",
+                    "detail": f"Maksymalnie {MAX_LIKE_SUBSCRIPTIONS} subskrypcji na połączenie.",
+                }
+            )
+            return
+
+        for ref in new_refs:
+            group_name = make_group_name(ref.content_type.pk, ref.object_id)
+            await self.channel_layer.group_add(group_name, self.channel_name)
+            self.subscriptions.add(group_name)
+
+        items = await database_sync_to_async(build_payloads)(refs)
+        await self.send_json({"type": "snapshot", "items": items})
+
+    async def _unsubscribe(self, refs: list[ReactableRef]) -> None:
+        for ref in refs:
+            group_name = make_group_name(ref.content_type.pk, ref.object_id)
+            if group_name in self.subscriptions:
+                await self.channel_layer.group_discard(group_name, self.channel_name)
+                self.subscriptions.discard(group_name)
+
+    async def like_count_update(self, event: dict[str, Any]) -> None:
+        await self.send_json(event["payload"])
+
+
 class NotificationConsumer(AsyncJsonWebsocketConsumer):
     """Udostępnia realtime powiadomienia dla zalogowanego użytkownika."""
 
@@ -93,11 +216,45 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
 
         self.group_name = make_user_group_name(user.id)
         await self.channel_layer.group_add(self.group_name, self.channel_name)
+        self.presence_user_id = user.id
+        await amark_connected(user.id)
         await self.accept()
 
+        last_seen_id = self._last_seen_id()
+        if last_seen_id is not None:
+            await self._send_catch_up(user.id, last_seen_id)
+
+    def _last_seen_id(self) -> int | None:
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        try:
+            value = int(query.get("last_seen_id", [""])[0])
+        except ValueError:
+            return None
+        return value if value >= 0 else None
+
+    async def _send_catch_up(self, user_id: int, last_seen_id: int) -> None:
+        """Wysyła zaległe powiadomienia (ten sam format co na żywo), potem znacznik końca.
+
+        Grupa jest już subskrybowana, więc zdarzenie na żywo może dotrzeć
+        również w paczce zaległych – klient deduplikuje po ``id``.
+        """
+
+        limit = int(getattr(settings, "NOTIFICATION_CATCH_UP_LIMIT", 50))
+        payloads, has_more = await database_sync_to_async(notifications_since)(
+            user_id, last_seen_id, limit
+        )
+        for payload in payloads:
+            await self.send_json(payload)
+        await self.send_json(
+            {"type": "catch_up_complete", "count": len(payloads), "has_more": has_more}
+        )
+
     async def disconnect(self, code: int) -> None:  # noqa: D401 - API channels
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if getattr(self, "presence_user_id", None) is not None:
+            await amark_disconnected(self.presence_user_id)
+            self.presence_user_id = None
         await super().disconnect(code)
 
     async def receive_json(self, content: Any, **kwargs: Any) -> None:  # pragma: no cover - API read-only
@@ -105,3 +262,6 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
 
     async def notification_message(self, event: dict[str, Any]) -> None:
         await self.send_json(event["payload"])
+
+    async def notification_unread_count(self, event: dict[str, Any]) -> None:
+        await self.send_json(event["payload"])
@@ -0,0 +1,117 @@
+"""Procesowy cache ``ContentType`` (po ID i po ``app_label.model``)."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_by_id: dict[int, ContentType] = {}
+_by_key: dict[tuple[str, str], ContentType] = {}
+_warmed = False
+
+
+def _remember(content_type: ContentType) -> ContentType:
+    _by_id[content_type.pk] = content_type
+    _by_key[(content_type.app_label, content_type.model)] = content_type
+    return content_type
+
+
+def warm_content_type_cache() -> int:
+    """Wczytuje wszystkie ``ContentType`` jednym zapytaniem; zwraca ich liczbę."""
+
+    global _warmed
+    content_types = list(ContentType.objects.all())
+    with _lock:
+        _by_id.clear()
+        _by_key.clear()
+        for content_type in content_types:
+            _remember(content_type)
+        _warmed = True
+    return len(content_types)
+
+
+def safe_warm_content_type_cache() -> None:
+    """Rozgrzewa cache przy starcie procesu; brak bazy nie blokuje uruchomienia."""
+
+    try:
+        warm_content_type_cache()
+    except DatabaseError as exc:
+        logger.warning("Nie udało się rozgrzać cache ContentType: %s", exc)
+
+
+def clear_content_type_cache() -> None:
+    global _warmed
+    with _lock:
+        _by_id.clear()
+        _by_key.clear()
+        _warmed = False
+
+
+def _lookup(cache_key: Any, cache: dict, **lookup: Any) -> ContentType:
+    content_type = cache.get(cache_key)
+    if content_type is not None:
+        return content_type
+
+    if not _warmed:
+        warm_content_type_cache()
+        content_type = cache.get(cache_key)
+        if content_type is not None:
+            return content_type
+
+    # typ dodany po rozgrzaniu cache (np. nowa migracja) – pojedyncze zapytanie
+    content_type = ContentType.objects.get(**lookup)
+    with _lock:
+        return _remember(content_type)
+
+
+def get_content_type_by_id(content_type_id: int) -> ContentType:
+    return _lookup(int(content_type_id), _by_id, pk=content_type_id)
+
+
+def get_content_type_by_natural_key(app_label: str, model: str) -> ContentType:
+    app_label, model = app_label.lower(), model.lower()
+    return _lookup((app_label, model), _by_key, app_label=app_label, model=model)
+
+
+def resolve_content_type(value: Any) -> ContentType:
+    """Zwraca ``ContentType`` dla obiektu, ID (int/str) lub ``"app_label.model"``."""
+
+    if isinstance(value, ContentType):
+        return value
+
+    if isinstance(value, int):
+        return get_content_type_by_id(value)
+
+    if isinstance(value, str):
+        if value.isdigit():
+            return get_content_type_by_id(int(value))
+        if "." in value:
+            app_label, model = value.split(".", 1)
+            return get_content_type_by_natural_key(app_label, model)
+
+    raise ContentType.DoesNotExist(value)
+
+
+@receiver(post_migrate)
+def _reset_after_migrate(sender, **kwargs: Any) -> None:
+    # migracje (również flush w testach) mogą zmienić identyfikatory typów
+    clear_content_type_cache()
+
+
+__all__ = [
+    "clear_content_type_cache",
+    "get_content_type_by_id",
+    "get_content_type_by_natural_key",
+    "resolve_content_type",
+    "safe_warm_content_type_cache",
+    "warm_content_type_cache",
+]
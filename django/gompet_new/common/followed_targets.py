@@ -0,0 +1,72 @@
+"""Obiekty obserwowane przez użytkownika – wczytywane zbiorczo dla strony obserwacji.
+
+Obserwacje strony grupowane są po ``target_type``; każdy typ celu to jedno
+``in_bulk`` i jedna serializacja skróconym serializerem (karta zwierzęcia,
+karta organizacji). Typy bez serializera w ``followed_target_types`` oraz
+usunięte cele dają ``target = None``.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+from .content_types import get_content_type_by_id
+from .models import Follow
+
+
+@dataclass(frozen=True, slots=True)
+class FollowedTargetType:
+    """Jak wczytać i zserializować obserwowany obiekt danego typu."""
+
+    queryset: QuerySet
+    serializer_class: type[serializers.BaseSerializer]
+
+
+def followed_target_types() -> dict[type, FollowedTargetType]:
+    # import leniwy – serializery zwierząt i organizacji importują moduły ``common``
+    from animals.models import Animal
+    from animals.serializers import AnimalSummarySerializer
+    from users.models import Organization
+    from users.serializers import OrganizationSummarySerializer
+
+    return {
+        Animal: FollowedTargetType(Animal.objects.all(), AnimalSummarySerializer),
+        Organization: FollowedTargetType(
+            Organization.objects.select_related("address"), OrganizationSummarySerializer
+        ),
+    }
+
+
+def load_followed_targets(
+    follows: Iterable[Follow],
+    context: dict[str, Any] | None = None,
+) -> dict[tuple[int, int], dict[str, Any]]:
+    """Zwraca ``{(target_type_id, target_id): dane celu}`` – jedno zapytanie na typ celu."""
+
+    ids_by_type: dict[int, set[int]] = defaultdict(set)
+    for follow in follows:
+        ids_by_type[follow.target_type_id].add(follow.target_id)
+
+    target_types = followed_target_types()
+    targets: dict[tuple[int, int], dict[str, Any]] = {}
+    for content_type_id, object_ids in ids_by_type.items():
+        target_type = target_types.get(get_content_type_by_id(content_type_id).model_class())
+        if target_type is None:
+            continue
+        objects = target_type.queryset.in_bulk(object_ids)
+        data = target_type.serializer_class(list(objects.values()), many=True, context=context or {}).data
+        for obj, item in zip(objects.values(), data):
+            targets[(content_type_id, obj.pk)] = item
+    return targets
+
+
+__all__ = [
+    "FollowedTargetType",
+    "followed_target_types",
+    "load_followed_targets",
+]
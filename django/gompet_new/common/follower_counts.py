@@ -0,0 +1,175 @@
+"""Liczniki obserwujących utrzymywane przy zapisie ``Follow``.
+
+Nowa obserwacja zwiększa, a usunięta zmniejsza wiersz ``follower_counts``
+jednym ``UPDATE ... SET followers_count = followers_count ± 1``. Odczyt to
+wyszukanie po unikalnym ``(target_type, target_id)`` – dla listy zwierząt
+czy organizacji jako podzapytanie w tym samym ``SELECT``
+(``annotate_followers_count``), bez osobnego zapytania na element. Listy bez
+adnotacji (np. ``included``) dostają liczniki jednym zapytaniem na stronę
+(``FollowersCountListSerializer``), a serializery zagnieżdżone w innym
+(``organization_info`` posta, organizacja zwierzęcia) pomijają pole.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+from .models import Follow, FollowerCount
+
+FOLLOWERS_COUNT_FIELD = "followers_count"
+# serializer osadzony ręcznie (``SerializerMethodField``) – bez licznika, jak zagnieżdżony
+EMBEDDED_CONTEXT_KEY = "embedded"
+
+
+def _counter(target_type_id: int, target_id: int) -> QuerySet[FollowerCount]:
+    return FollowerCount.objects.filter(target_type_id=target_type_id, target_id=target_id)
+
+
+def increment_follower_count(target_type_id: int, target_id: int) -> None:
+    counter = _counter(target_type_id, target_id)
+    if counter.update(followers_count=F("followers_count") + 1):
+        return
+    # pierwszy obserwujący – wiersz z zerem (równoległy insert jest ignorowany), potem ten sam UPDATE
+    FollowerCount.objects.bulk_create(
+        [FollowerCount(target_type_id=target_type_id, target_id=target_id)],
+        ignore_conflicts=True,
+    )
+    counter.update(followers_count=F("followers_count") + 1)
+
+
+def decrement_follower_count(target_type_id: int, target_id: int) -> None:
+    _counter(target_type_id, target_id).filter(followers_count__gt=0).update(
+        followers_count=F("followers_count") - 1
+    )
+
+
+def get_follower_counts(content_type: ContentType, object_ids: Iterable[int]) -> dict[int, int]:
+    """Zwraca ``{object_id: liczba obserwujących}`` (0 gdy brak wiersza)."""
+
+    object_ids = list(dict.fromkeys(object_ids))
+    counts = {object_id: 0 for object_id in object_ids}
+    if not object_ids:
+        return counts
+
+    rows = FollowerCount.objects.filter(
+        target_type=content_type, target_id__in=object_ids
+    ).values_list("target_id", "followers_count")
+    counts.update(rows)
+    return counts
+
+
+def annotate_followers_count(queryset: QuerySet) -> QuerySet:
+    """Dokłada ``followers_count`` jako podzapytanie po unikalnym indeksie licznika."""
+
+    content_type = ContentType.objects.get_for_model(queryset.model)
+    counter = FollowerCount.objects.filter(
+        target_type_id=content_type.pk,
+        target_id=OuterRef("pk"),
+    ).values("followers_count")[:1]
+    return queryset.annotate(**{FOLLOWERS_COUNT_FIELD: Coalesce(Subquery(counter), Value(0))})
+
+
+def prime_followers_count(instances: Iterable[Any]) -> None:
+    """Ustawia ``followers_count`` obiektom bez adnotacji – jedno zapytanie na typ."""
+
+    missing: dict[type, list[Any]] = {}
+    for instance in instances:
+        if getattr(instance, FOLLOWERS_COUNT_FIELD, None) is None:
+            missing.setdefault(type(instance), []).append(instance)
+
+    for model, objects in missing.items():
+        counts = get_follower_counts(
+            ContentType.objects.get_for_model(model), [obj.pk for obj in objects]
+        )
+        for obj in objects:
+            setattr(obj, FOLLOWERS_COUNT_FIELD, counts[obj.pk])
+
+
+def rebuild_follower_counts() -> int:
+    """Odbudowuje liczniki z tabeli ``follows``; zwraca liczbę obserwowanych obiektów.
+
+    Usunięcie i wstawienie liczników to jedna transakcja – odczyty nigdy nie
+    widzą pustej tabeli. Obserwacje dodane w trakcie przebudowy mogą się
+    rozminąć z wynikiem, więc komendę ``reconcile_follower_counts`` najlepiej
+    uruchamiać przy małym ruchu.
+    """
+
+    with transaction.atomic():
+        rows = (
+            Follow.objects.order_by()
+            .values("target_type_id", "target_id")
+            .annotate(total=Count("id"))
+        )
+        counters = [
+            FollowerCount(
+                target_type_id=row["target_type_id"],
+                target_id=row["target_id"],
+                followers_count=row["total"],
+            )
+            for row in rows
+        ]
+        FollowerCount.objects.all().delete()
+        FollowerCount.objects.bulk_create(counters, batch_size=1000)
+    return len(counters)
+
+
+class FollowersCountListSerializer(serializers.ListSerializer):
+    """Dokłada liczniki obserwujących całej strony przed serializacją elementów."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        items = list(iterable)
+        if FOLLOWERS_COUNT_FIELD in self.child.fields:
+            prime_followers_count(items)
+        return super().to_representation(items)
+
+
+class FollowersCountSerializerMixin:
+    """Pole ``followers_count`` czytane z adnotacji widoku, a bez niej z licznika.
+
+    Serializer musi zadeklarować ``followers_count = serializers.SerializerMethodField()``.
+    Zagnieżdżony w innym serializerze (lub z ``context["embedded"]``) pole
+    pomija – inaczej każdy element strony rodzica kosztowałby zapytanie.
+    """
+
+    def is_embedded(self) -> bool:
+        if self.context.get(EMBEDDED_CONTEXT_KEY):
+            return True
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is not None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.is_embedded():
+            fields.pop(FOLLOWERS_COUNT_FIELD, None)
+        return fields
+
+    def get_followers_count(self, obj: Any) -> int:
+        annotated = getattr(obj, FOLLOWERS_COUNT_FIELD, None)
+        if annotated is not None:
+            return annotated
+        content_type = ContentType.objects.get_for_model(type(obj))
+        return get_follower_counts(content_type, [obj.pk])[obj.pk]
+
+
+__all__ = [
+    "EMBEDDED_CONTEXT_KEY",
+    "FOLLOWERS_COUNT_FIELD",
+    "FollowersCountListSerializer",
+    "FollowersCountSerializerMixin",
+    "annotate_followers_count",
+    "decrement_follower_count",
+    "get_follower_counts",
+    "increment_follower_count",
+    "prime_followers_count",
+    "rebuild_follower_counts",
+]
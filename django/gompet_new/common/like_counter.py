@@ -6,8 +6,9 @@ from dataclasses import dataclass
 from typing import Any
 
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import QuerySet
+from django.db.models import Count, Q, QuerySet
 
+from .content_types import resolve_content_type
 from .models import Reaction, ReactionType
 
 
@@ -23,25 +24,6 @@ class ReactableRef:
         return f"{self.content_type.app_label}.{self.content_type.model}"
 
 
-def resolve_content_type(value: Any) -> ContentType:
-    """Zwraca ``ContentType`` niezależnie od tego jaką postać przyjmie ``value``."""
-
-    if isinstance(value, ContentType):
-        return value
-
-    if isinstance(value, int):
-        return ContentType.objects.get(pk=value)
-
-    if isinstance(value, str):
-        if value.isdigit():
-            return ContentType.objects.get(pk=int(value))
-        if "." in value:
-            app_label, model = value.split(".", 1)
-            return ContentType.objects.get(app_label=app_label, model=model)
-
-    raise ContentType.DoesNotExist(value)
-
-
 def like_queryset(ref: ReactableRef) -> QuerySet[Reaction]:
     """Queryset z wszystkimi reakcjami LIKE dla wskazanego obiektu."""
 
@@ -76,10 +58,54 @@ def build_payload(ref: ReactableRef) -> dict[str, Any]:
     }
 
 
+def calculate_like_totals(refs: list[ReactableRef]) -> dict[tuple[int, int], int]:
+    """Zwraca ``{(content_type_id, object_id): liczba_like}`` jednym zapytaniem GROUP BY."""
+
+    totals = {(ref.content_type.pk, ref.object_id): 0 for ref in refs}
+    if not totals:
+        return totals
+
+    ids_by_type: dict[int, set[int]] = {}
+    for content_type_id, object_id in totals:
+        ids_by_type.setdefault(content_type_id, set()).add(object_id)
+
+    target_filter = Q()
+    for content_type_id, object_ids in ids_by_type.items():
+        target_filter |= Q(reactable_type_id=content_type_id, reactable_id__in=object_ids)
+
+    rows = (
+        Reaction.objects.filter(target_filter, reaction_type=ReactionType.LIKE)
+        .values("reactable_type_id", "reactable_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        totals[(row["reactable_type_id"], row["reactable_id"])] = row["total"]
+    return totals
+
+
+def build_payloads(refs: list[ReactableRef]) -> list[dict[str, Any]]:
+    """Payloady dla wielu obiektów naraz (jedno zapytanie o liczby polubień)."""
+
+    totals = calculate_like_totals(refs)
+    return [
+        {
+            "reactable": {
+                "id": ref.object_id,
+                "type": ref.natural_key,
+            },
+            "total_likes": totals[(ref.content_type.pk, ref.object_id)],
+        }
+        for ref in refs
+    ]
+
+
 __all__ = [
     "ReactableRef",
     "resolve_content_type",
     "calculate_like_total",
+    "calculate_like_totals",
     "make_group_name",
     "build_payload",
+    "build_payloads",
 ]
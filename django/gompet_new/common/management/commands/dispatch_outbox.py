@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from common.outbox import drain, exhausted_messages, prune_exhausted
+
+
+class Command(BaseCommand):
+    help = (
+        "Send pending websocket messages from the outbox to the channel layer. "
+        "Run it with --loop as a separate process in production so retries survive restarts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Messages per batch.")
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the outbox every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Polling interval in seconds when --loop is used.",
+        )
+        parser.add_argument(
+            "--prune-exhausted",
+            action="store_true",
+            help="Delete messages that used up OUTBOX_MAX_ATTEMPTS instead of only reporting them.",
+        )
+
+    def handle(self, *args, **options):
+        self._reported_exhausted = 0
+        while True:
+            result = drain(batch_size=options["batch_size"])
+            if result.sent or result.failed or not options["loop"]:
+                self.stdout.write(f"Sent {result.sent} message(s), {result.failed} failed.")
+            self._handle_exhausted(options["prune_exhausted"])
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+
+    def _handle_exhausted(self, prune: bool) -> None:
+        if prune:
+            pruned = prune_exhausted()
+            if pruned:
+                self.stderr.write(self.style.WARNING(f"Deleted {pruned} exhausted message(s)."))
+            return
+
+        exhausted = exhausted_messages().count()
+        # w pętli zgłaszamy tylko zmianę liczby, nie co ``--interval``
+        if exhausted and exhausted != self._reported_exhausted:
+            self.stderr.write(
+                self.style.ERROR(
+                    f"{exhausted} message(s) used up all attempts; "
+                    "inspect outbox_messages.last_error or rerun with --prune-exhausted."
+                )
+            )
+        self._reported_exhausted = exhausted
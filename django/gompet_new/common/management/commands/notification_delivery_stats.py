@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from common.presence import delivery_metrics, is_enabled, reset_delivery_metrics
+
+
+class Command(BaseCommand):
+    help = "Show how many realtime notifications were delivered vs skipped for offline users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Reset the counters after printing.")
+
+    def handle(self, *args, **options):
+        if not is_enabled():
+            self.stdout.write(
+                "Notification presence is disabled (no shared cache); every notification is sent."
+            )
+            return
+
+        metrics = delivery_metrics()
+        total = metrics["delivered"] + metrics["skipped_offline"]
+        skipped_ratio = (metrics["skipped_offline"] / total * 100) if total else 0.0
+        self.stdout.write(
+            f"delivered={metrics['delivered']} skipped_offline={metrics['skipped_offline']} "
+            f"skipped_ratio={skipped_ratio:.1f}%"
+        )
+        if options["reset"]:
+            reset_delivery_metrics()
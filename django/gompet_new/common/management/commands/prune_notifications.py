@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from common.partitions import (
+    archive_partition,
+    drop_partition,
+    ensure_monthly_partitions,
+    expired_partitions,
+    is_supported,
+    prune_default_partition,
+    warn_if_default_partition_used,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly notification partitions, drop (or archive) "
+        "partitions older than the retention window and expired rows of the "
+        "DEFAULT partition. Warns when the DEFAULT partition is not empty."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=None,
+            help="Keep this many full months (default: NOTIFICATION_RETENTION_MONTHS).",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=None,
+            help="Create partitions this many months ahead (default: NOTIFICATION_PARTITIONS_AHEAD).",
+        )
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            help="Detach expired partitions and keep them as archive_* tables instead of dropping.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list partitions that would be removed.",
+        )
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError("Notification partitioning requires PostgreSQL.")
+
+        retention = options["retention_months"]
+        if retention is None:
+            retention = settings.NOTIFICATION_RETENTION_MONTHS
+        months_ahead = options["months_ahead"]
+        if months_ahead is None:
+            months_ahead = settings.NOTIFICATION_PARTITIONS_AHEAD
+        if retention < 1:
+            raise CommandError("--retention-months must be at least 1.")
+
+        if options["dry_run"]:
+            for partition in expired_partitions(retention):
+                self.stdout.write(f"Would remove {partition.name}")
+            self._warn_about_default_partition()
+            return
+
+        with transaction.atomic():
+            # najpierw wiersze DEFAULT spoza retencji – inaczej dostałyby partycję tylko po to, by ją usunąć
+            pruned_rows = prune_default_partition(retention, archive=options["archive"])
+            if pruned_rows:
+                self.stdout.write(f"Removed {pruned_rows} expired row(s) from the DEFAULT partition")
+
+            default_rows = self._warn_about_default_partition()
+            created = ensure_monthly_partitions(months_ahead)
+            for name in created:
+                self.stdout.write(f"Created {name}")
+            if default_rows:
+                self.stdout.write(f"Moved {default_rows} row(s) from the DEFAULT partition")
+
+            expired = expired_partitions(retention)
+            for partition in expired:
+                if options["archive"]:
+                    archived = archive_partition(partition)
+                    self.stdout.write(f"Archived {partition.name} as {archived}")
+                else:
+                    drop_partition(partition)
+                    self.stdout.write(f"Dropped {partition.name}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(created)} partition(s) created, {len(expired)} expired partition(s) removed."
+            )
+        )
+
+    def _warn_about_default_partition(self) -> int:
+        rows = warn_if_default_partition_used()
+        if rows:
+            self.stderr.write(
+                self.style.WARNING(
+                    f"The DEFAULT notification partition holds {rows} row(s); "
+                    "a monthly partition was missing when they were written."
+                )
+            )
+        return rows
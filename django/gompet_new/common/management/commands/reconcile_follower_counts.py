@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from common.follower_counts import rebuild_follower_counts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the follower_counts table from follows."
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_follower_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt follower counters for {rebuilt} followed object(s)."))
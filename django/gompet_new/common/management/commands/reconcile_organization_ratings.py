@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from users.ratings import recalculate_organization_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute organization rating counters and histograms from rated comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            dest="organization_ids",
+            type=int,
+            action="append",
+            help="Reconcile only the given organization id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        reconciled = recalculate_organization_ratings(options.get("organization_ids"))
+        self.stdout.write(self.style.SUCCESS(f"Reconciled rating counters for {reconciled} organization(s)."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from common.unread_counter import is_cache_enabled, reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute cached unread notification counters from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="user_ids",
+            type=int,
+            action="append",
+            help="Reconcile only the given user id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        if not is_cache_enabled():
+            self.stdout.write("Unread counter cache is disabled (no shared cache); counts are read from the database.")
+            return
+        reconciled = reconcile_unread_counts(options.get("user_ids"))
+        self.stdout.write(self.style.SUCCESS(f"Reconciled unread counters for {reconciled} user(s)."))
@@ -0,0 +1,134 @@
+"""Zamienia tabelę ``notifications`` na tabelę partycjonowaną miesięcznie po ``created_at``.
+
+PostgreSQL wymaga, by klucz główny tabeli partycjonowanej zawierał klucz
+partycjonowania, więc w bazie PK to ``(id, created_at)``; ``id`` nadal jest
+unikalne (sekwencja) i Django traktuje je jako klucz główny. Stan modeli się
+nie zmienia. Na innych bazach migracja jest no-opem.
+"""
+
+import datetime as dt
+
+from django.conf import settings
+from django.db import migrations
+
+TABLE = "notifications"
+LEGACY_TABLE = "notifications_unpartitioned"
+SEQUENCE = "notifications_id_seq"
+PARTITIONS_AHEAD = 3
+
+
+def _add_months(month, months):
+    index = month.year * 12 + (month.month - 1) + months
+    return dt.date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_sql(month):
+    lower = f"{month.isoformat()} 00:00:00+00"
+    upper = f"{_add_months(month, 1).isoformat()} 00:00:00+00"
+    return (
+        f'CREATE TABLE "{TABLE}_p{month:%Y%m}" PARTITION OF "{TABLE}" '
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+
+def _user_table(apps):
+    app_label, model_name = settings.AUTH_USER_MODEL.split(".")
+    return apps.get_model(app_label, model_name)._meta.db_table
+
+
+def _create_indexes_and_foreign_keys(schema_editor, user_table):
+    execute = schema_editor.execute
+    execute(
+        f'CREATE INDEX "idx_notification_rec_read" ON "{TABLE}" '
+        f'("recipient_id", "is_read", "created_at")'
+    )
+    execute(f'CREATE INDEX "notifications_actor_id_idx" ON "{TABLE}" ("actor_id")')
+    execute(f'CREATE INDEX "notifications_recipient_id_idx" ON "{TABLE}" ("recipient_id")')
+    execute(
+        f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "notifications_actor_id_fk_users" '
+        f'FOREIGN KEY ("actor_id") REFERENCES "{user_table}" ("id") DEFERRABLE INITIALLY DEFERRED'
+    )
+    execute(
+        f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "notifications_recipient_id_fk_users" '
+        f'FOREIGN KEY ("recipient_id") REFERENCES "{user_table}" ("id") DEFERRABLE INITIALLY DEFERRED'
+    )
+
+
+def partition_notifications(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    execute = schema_editor.execute
+    user_table = _user_table(apps)
+
+    execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY_TABLE}"')
+    execute(
+        f'CREATE TABLE "{TABLE}" (LIKE "{LEGACY_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ("created_at")'
+    )
+    # kolumna identity nie jest dozwolona w tabeli partycjonowanej (PG < 17) – zwykła sekwencja
+    execute(f'CREATE SEQUENCE "{SEQUENCE}_partitioned"')
+    execute(
+        f'ALTER TABLE "{TABLE}" ALTER COLUMN "id" SET DEFAULT nextval(\'"{SEQUENCE}_partitioned"\')'
+    )
+    execute(f'ALTER SEQUENCE "{SEQUENCE}_partitioned" OWNED BY "{TABLE}"."id"')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT (date_trunc('month', \"created_at\" AT TIME ZONE 'UTC'))::date "
+            f'FROM "{LEGACY_TABLE}"'
+        )
+        months = {row[0] for row in cursor.fetchall()}
+
+    today = dt.datetime.now(dt.timezone.utc).date()
+    current = dt.date(today.year, today.month, 1)
+    months.update(_add_months(current, offset) for offset in range(PARTITIONS_AHEAD + 1))
+    for month in sorted(months):
+        execute(_partition_sql(month))
+    execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+    execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{LEGACY_TABLE}"')
+    execute(
+        f"SELECT setval('\"{SEQUENCE}_partitioned\"', "
+        f'COALESCE((SELECT MAX("id") FROM "{TABLE}"), 0) + 1, false)'
+    )
+    execute(f'DROP TABLE "{LEGACY_TABLE}"')
+
+    execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "notifications_pkey" PRIMARY KEY ("id", "created_at")')
+    _create_indexes_and_foreign_keys(schema_editor, user_table)
+
+
+def unpartition_notifications(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    execute = schema_editor.execute
+    user_table = _user_table(apps)
+
+    execute(
+        f'CREATE TABLE "{LEGACY_TABLE}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    )
+    execute(f'ALTER TABLE "{LEGACY_TABLE}" ALTER COLUMN "id" DROP DEFAULT')
+    execute(f'INSERT INTO "{LEGACY_TABLE}" SELECT * FROM "{TABLE}"')
+    execute(f'DROP TABLE "{TABLE}" CASCADE')
+    execute(f'ALTER TABLE "{LEGACY_TABLE}" RENAME TO "{TABLE}"')
+    execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "notifications_pkey" PRIMARY KEY ("id")')
+    execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN "id" ADD GENERATED BY DEFAULT AS IDENTITY')
+    execute(
+        f"SELECT setval(pg_get_serial_sequence('\"{TABLE}\"', 'id'), "
+        f'COALESCE((SELECT MAX("id") FROM "{TABLE}"), 0) + 1, false)'
+    )
+    _create_indexes_and_foreign_keys(schema_editor, user_table)
+
+
+class Migration(migrations.Migration):
+    atomic = True
+
+    dependencies = [
+        ("common", "0009_alter_follow_notification_preferences"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_notifications, unpartition_notifications),
+    ]
@@ -0,0 +1,61 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_follower_counts(apps, schema_editor):
+    Follow = apps.get_model("common", "Follow")
+    FollowerCount = apps.get_model("common", "FollowerCount")
+
+    rows = (
+        Follow.objects.order_by()
+        .values("target_type_id", "target_id")
+        .annotate(total=Count("id"))
+    )
+    FollowerCount.objects.bulk_create(
+        [
+            FollowerCount(
+                target_type_id=row["target_type_id"],
+                target_id=row["target_id"],
+                followers_count=row["total"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("common", "0013_comment_target_recent_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FollowerCount",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("target_id", models.PositiveBigIntegerField()),
+                ("followers_count", models.PositiveIntegerField(default=0)),
+                (
+                    "target_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "follower_counts",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("target_type", "target_id"),
+                        name="uniq_follower_count_target",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_follower_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0015_follow_user_created_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=("recipient", "-created_at", "-id"),
+                name="idx_notification_rec_created",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_last_activity_at(apps, schema_editor):
+    Notification = apps.get_model("common", "Notification")
+    Notification.objects.update(last_activity_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0016_notification_recipient_created_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="last_activity_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_last_activity_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="notification",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterModelOptions(
+            name="notification",
+            options={"ordering": ("-last_activity_at",)},
+        ),
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="idx_notification_rec_created",
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=("recipient", "-last_activity_at", "-id"),
+                name="idx_notification_rec_activity",
+            ),
+        ),
+    ]
@@ -4,8 +4,7 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import Avg
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -64,15 +63,29 @@ class Comment(TimeStampedModel):
     class Meta:
         db_table = "comments"
         indexes = [
-            models.Index(fields=("content_type", "object_id"), name="idx_comment_target"),
+            # wątek obiektu od najnowszego: kursor CommentViewSet i podgląd ``comments_preview``
+            models.Index(
+                fields=("content_type", "object_id", "-created_at", "-id"),
+                name="idx_comment_target_recent",
+            ),
         ]
         ordering = ("-created_at",)
 
-    def _is_organization_comment(self) -> bool:
-        return (
-            self.content_type.app_label == "users"
-            and self.content_type.model == "organization"
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # ocena i cel wczytane z bazy – do walidacji zmian bez dodatkowego SELECT-a
+        instance._loaded_rating = instance.__dict__.get("rating")
+        instance._loaded_target = (
+            instance.__dict__.get("content_type_id"),
+            instance.__dict__.get("object_id"),
         )
+        return instance
+
+    def _is_organization_comment(self) -> bool:
+        # ContentType z cache managera – bez zapytania o ``self.content_type``
+        content_type = ContentType.objects.get_for_id(self.content_type_id)
+        return content_type.app_label == "users" and content_type.model == "organization"
 
     def _validate_body_length(self) -> None:
         if len((self.body or "").strip()) >= self.MIN_BODY_LENGTH:
@@ -87,38 +100,65 @@ class Comment(TimeStampedModel):
             }
         )
 
-    def _refresh_organization_rating_from_comments(self) -> None:
-        """Przelicza ocenę organizacji na podstawie ocenionych komentarzy."""
-        if not self._is_organization_comment():
+    def _validate_target_unchanged(self) -> None:
+        """Komentarz nie może zmienić obiektu – liczniki ocen są przypięte do celu."""
+        loaded_target = getattr(self, "_loaded_target", None)
+        if self._state.adding or loaded_target is None:
+            return
+        if loaded_target == (self.content_type_id, self.object_id):
             return
 
-        from users.models import Organization
+        raise ValidationError(
+            {
+                "object_id": ValidationError(
+                    "Nie można przenieść komentarza do innego obiektu.",
+                    code="COMMENT_TARGET_IMMUTABLE",
+                )
+            }
+        )
+
+    def _stored_rating(self) -> int | None:
+        """Ocena zapisana obecnie w bazie, z blokadą wiersza (``None`` dla nowego komentarza).
+
+        Wywoływane w ``transaction.atomic()`` – równoległy zapis tego samego
+        komentarza czeka na commit, więc liczniki przenoszone są z oceny, którą
+        ten zapis faktycznie nadpisuje, a nie z oceny wczytanej wcześniej.
+        Liczniki mają tylko organizacje, więc pozostałe komentarze (cel jest
+        niezmienny – ``_validate_target_unchanged``) nie blokują wiersza.
+        """
+        if self._state.adding or not self._is_organization_comment():
+            return None
+        return (
+            Comment.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list("rating", flat=True)
+            .first()
+        )
 
-        try:
-            organization = Organization.objects.get(pk=self.object_id)
-        except Organization.DoesNotExist:
+    def _apply_organization_rating_change(self, old_rating: int | None, new_rating: int | None) -> None:
+        """Przenosi ocenę w licznikach organizacji jednym atomowym ``UPDATE``."""
+        if old_rating == new_rating or not self._is_organization_comment():
             return
 
-        avg_rating = Comment.objects.filter(
-            content_type=self.content_type,
-            object_id=self.object_id,
-            rating__isnull=False,
-        ).aggregate(avg=Avg("rating"))["avg"]
+        from users.ratings import apply_rating_change
 
-        organization.rating = None if avg_rating is None else int(round(avg_rating))
-        organization.save(update_fields=["rating", "updated_at"])
+        apply_rating_change(self.object_id, old_rating, new_rating)
 
     def _validate_single_organization_rating_per_user(self) -> None:
         """Pozwala użytkownikowi wystawić tylko jedną ocenę komentarzem dla organizacji."""
         if not self.user_id or self.rating is None:
             return
 
+        # ocena bez zmian była już sprawdzona przy zapisie, który ją ustawił
+        if not self._state.adding and getattr(self, "_loaded_rating", None) == self.rating:
+            return
+
         if not self._is_organization_comment():
             return
 
         existing_rating = Comment.objects.filter(
             user_id=self.user_id,
-            content_type=self.content_type,
+            content_type_id=self.content_type_id,
             object_id=self.object_id,
             rating__isnull=False,
         )
@@ -139,41 +179,28 @@ class Comment(TimeStampedModel):
     def clean(self) -> None:
         super().clean()
         self._validate_body_length()
+        self._validate_target_unchanged()
         self._validate_single_organization_rating_per_user()
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
-        self._refresh_organization_rating_from_comments()
-
-    def delete(self, *args, **kwargs):
-        organization_content_type = self.content_type
-        organization_object_id = self.object_id
-        is_organization_comment = (
-            organization_content_type.app_label == "users"
-            and organization_content_type.model == "organization"
-        )
-
-        super().delete(*args, **kwargs)
-
-        if not is_organization_comment:
-            return
-
-        from users.models import Organization
-
-        try:
-            organization = Organization.objects.get(pk=organization_object_id)
-        except Organization.DoesNotExist:
-            return
+        update_fields = kwargs.get("update_fields")
+        tracks_rating = update_fields is None or "rating" in update_fields
 
-        avg_rating = Comment.objects.filter(
-            content_type=organization_content_type,
-            object_id=organization_object_id,
-            rating__isnull=False,
-        ).aggregate(avg=Avg("rating"))["avg"]
+        with transaction.atomic():
+            old_rating = self._stored_rating() if tracks_rating else None
+            super().save(*args, **kwargs)
+            if tracks_rating:
+                self._apply_organization_rating_change(old_rating, self.rating)
+                self._loaded_rating = self.rating
+            self._loaded_target = (self.content_type_id, self.object_id)
 
-        organization.rating = None if avg_rating is None else int(round(avg_rating))
-        organization.save(update_fields=["rating", "updated_at"])
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            old_rating = self._stored_rating()
+            result = super().delete(*args, **kwargs)
+            self._apply_organization_rating_change(old_rating, None)
+        return result
 
     def __str__(self) -> str:
         return f"{self.user_id} → {self.content_type.app_label}.{self.content_type.model}#{self.object_id}"
@@ -231,6 +258,24 @@ class Reaction(TimeStampedModel):
     def __str__(self) -> str:
         return f"{self.user_id} {self.reaction_type} {self.reactable_type}.{self.reactable_id}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # zapamiętujemy typ wczytany z bazy, żeby sygnały nie musiały robić dodatkowego SELECT-a
+        instance._loaded_reaction_type = instance.__dict__.get("reaction_type")
+        return instance
+
+    @property
+    def previous_reaction_type(self) -> str | None:
+        """Typ reakcji zapisany w bazie przed bieżącą zmianą (``None`` dla nowej reakcji)."""
+
+        return getattr(self, "_loaded_reaction_type", None)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # sygnał post_save widział już poprzednią wartość – od teraz stanem bazowym jest bieżący typ
+        self._loaded_reaction_type = self.reaction_type
+
 
 User = get_user_model()
 
@@ -248,20 +293,57 @@ class Notification(models.Model):
     target_type = models.CharField(max_length=50)
     target_id = models.PositiveIntegerField()
     created_object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    # agregacja ("Ala i 24 inne osoby polubiły…"): liczba aktorów w grupie
+    # oraz ID ostatnich aktorów (najnowszy pierwszy); ``actor`` to najnowszy aktor
+    actor_count = models.PositiveIntegerField(default=1)
+    recent_actor_ids = models.JSONField(default=list, blank=True)
     is_read = models.BooleanField(default=False)
+    # klucz partycji – nie zmienia się po utworzeniu
     created_at = models.DateTimeField(auto_now_add=True)
+    # ostatnie dołączenie aktora do grupy; po nim sortowana jest lista
+    last_activity_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = "notifications"
-        ordering = ("-created_at",)
+        ordering = ("-last_activity_at",)
         indexes = [
             models.Index(fields=("recipient", "is_read", "created_at"), name="idx_notification_rec_read"),
+            # lista bez filtra ``is_read``: kursor po ``(last_activity_at, id)`` od najnowszego
+            models.Index(
+                fields=("recipient", "-last_activity_at", "-id"), name="idx_notification_rec_activity"
+            ),
         ]
 
     def __str__(self) -> str:
         return f"{self.recipient_id} ← {self.actor_id}: {self.verb} {self.target_type}#{self.target_id}"
 
 
+class OutboxMessage(models.Model):
+    """Wiadomość websocket zapisana w tej samej transakcji co zmiana danych.
+
+    Dispatcher (``common.outbox``) wysyła zaległe wiadomości do warstwy kanałów
+    paczkami i ponawia nieudane próby z wykładniczym odstępem.
+    """
+
+    group = models.CharField(max_length=200)
+    message_type = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "outbox_messages"
+        ordering = ("id",)
+        indexes = [
+            models.Index(fields=("available_at", "id"), name="idx_outbox_available"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.message_type} → {self.group} (#{self.pk}, attempts={self.attempts})"
+
+
 def default_follow_notification_preferences() -> dict[str, bool]:
     return {
         "posts": True,
@@ -293,6 +375,8 @@ class Follow(TimeStampedModel):
         ordering = ("-created_at",)
         indexes = [
             models.Index(fields=("target_type", "target_id"), name="idx_follow_target"),
+            # obserwacje użytkownika od najnowszej – kursor ``follows/targets``
+            models.Index(fields=("user", "-created_at", "-id"), name="idx_follow_user_created"),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -303,3 +387,27 @@ class Follow(TimeStampedModel):
 
     def __str__(self) -> str:
         return f"{self.user_id} follows {self.target_type.app_label}.{self.target_type.model}#{self.target_id}"
+
+
+class FollowerCount(models.Model):
+    """Zdenormalizowana liczba obserwujących obiektu.
+
+    Aktualizowana atomowo w sygnałach zapisu/usunięcia ``Follow``
+    (``common.follower_counts``), więc odczyt nie wymaga ``COUNT(*)``.
+    """
+
+    target_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    target_id = models.PositiveBigIntegerField()
+    followers_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "follower_counts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("target_type", "target_id"),
+                name="uniq_follower_count_target",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.target_type_id}#{self.target_id}: {self.followers_count}"
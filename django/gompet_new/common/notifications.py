@@ -3,14 +3,19 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Iterable
 
-from asgiref.sync import async_to_sync
-from channels.exceptions import InvalidChannelLayerError
-from channels.layers import get_channel_layer
-from django.core.exceptions import ImproperlyConfigured
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
 
 from animals.models import Animal
+from common import outbox, presence
+from common.coalescing import CoalescingBroadcaster
 from common.models import Notification
 
 logger = logging.getLogger(__name__)
@@ -22,57 +27,201 @@ def make_user_group_name(user_id: int) -> str:
     return f"notifications.user.{user_id}"
 
 
-def broadcast_user_notification(user_id: int, payload: dict[str, Any]) -> bool:
-    """Wysyła powiadomienie realtime do właściciela."""
+def send_to_user_group(user_id: int, message_type: str, payload: dict[str, Any]) -> bool:
+    """Zapisuje wiadomość ``message_type`` dla grupy użytkownika w outboxie.
+
+    Wysyłka do warstwy kanałów następuje dopiero po commicie bieżącej
+    transakcji (``common.outbox``). Dla użytkownika offline (``common.presence``)
+    nic nie jest zapisywane i zwracane jest ``False``.
+    """
 
     if not user_id:
         return False
 
-    try:
-        channel_layer = get_channel_layer()
-    except (InvalidChannelLayerError, ImproperlyConfigured) as exc:
-        logger.debug("Kanał warstwy websocket niedostępny: %s", exc)
+    if not presence.online_user_ids([user_id]):
+        presence.record_delivery(delivered=0, skipped=1)
         return False
 
-    if channel_layer is None:
-        return False
+    outbox.enqueue(make_user_group_name(user_id), message_type, payload)
+    presence.record_delivery(delivered=1, skipped=0)
+    return True
 
-    group_name = make_user_group_name(user_id)
 
-    try:
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                "type": "notification_message",
-                "payload": payload,
-            },
-        )
-    except TypeError as exc:
-        logger.debug("Nie udało się wysłać powiadomienia: %s", exc, exc_info=True)
+def broadcast_user_notification(user_id: int, payload: dict[str, Any]) -> bool:
+    """Wysyła powiadomienie realtime do właściciela."""
+
+    return send_to_user_group(user_id, "notification_message", payload)
+
+
+def broadcast_user_notifications(messages: Iterable[tuple[int, dict[str, Any]]]) -> int:
+    """Zapisuje wiele powiadomień w outboxie jednym ``bulk_create``.
+
+    Dispatcher wysyła je potem paczką, z równoległymi ``group_send``.
+    Odbiorcy bez otwartego websocketu są pomijani. Zwraca liczbę zapisanych
+    wiadomości.
+    """
+
+    messages = [(user_id, payload) for user_id, payload in messages if user_id]
+    online = presence.online_user_ids(user_id for user_id, _ in messages)
+    delivered = outbox.enqueue_many(
+        (make_user_group_name(user_id), "notification_message", payload)
+        for user_id, payload in messages
+        if user_id in online
+    )
+    presence.record_delivery(delivered=delivered, skipped=len(messages) - delivered)
+    return delivered
+
+
+# Czasowniki, których powiadomienia są grupowane po (odbiorca, czasownik, cel).
+AGGREGATED_VERBS = frozenset({"polubił(a)", "zaczął(a) obserwować"})
+RECENT_ACTORS_LIMIT = 3
+
+
+def record_notification(
+    *,
+    recipient_id: int,
+    actor: Any,
+    verb: str,
+    target_type: str,
+    target_id: int,
+    created_object_id: int | None = None,
+) -> tuple[Notification, bool]:
+    """Tworzy powiadomienie albo dołącza aktora do istniejącej grupy.
+
+    Nieprzeczytane powiadomienie o tym samym odbiorcy, czasowniku i celu,
+    aktywne w ciągu ostatnich ``NOTIFICATION_AGGREGATION_WINDOW`` sekund, jest
+    aktualizowane (licznik aktorów, ostatni aktorzy, ``last_activity_at``)
+    zamiast wstawiania nowego wiersza. ``created_at`` to klucz partycji i się
+    nie zmienia. Zwraca ``(powiadomienie, czy_utworzono)``.
+
+    ``actor_count`` jest przybliżony: grupa pamięta tylko
+    ``RECENT_ACTORS_LIMIT`` ostatnich aktorów, więc aktor, który wypadł z tej
+    listy i wrócił, jest liczony ponownie.
+    """
+
+    window = float(getattr(settings, "NOTIFICATION_AGGREGATION_WINDOW", 0))
+    if verb in AGGREGATED_VERBS and window > 0:
+        now = timezone.now()
+        with transaction.atomic():
+            group = (
+                Notification.objects.select_for_update()
+                .filter(
+                    recipient_id=recipient_id,
+                    verb=verb,
+                    target_type=target_type,
+                    target_id=target_id,
+                    is_read=False,
+                    last_activity_at__gte=now - timedelta(seconds=window),
+                )
+                .order_by("-last_activity_at", "-id")
+                .first()
+            )
+            if group is not None:
+                known_actor = actor.id == group.actor_id or actor.id in group.recent_actor_ids
+                recent_actor_ids = [actor.id] + [
+                    actor_id for actor_id in group.recent_actor_ids if actor_id != actor.id
+                ][: RECENT_ACTORS_LIMIT - 1]
+                increment = 0 if known_actor else 1
+                Notification.objects.filter(pk=group.pk, created_at=group.created_at).update(
+                    actor=actor,
+                    actor_count=F("actor_count") + increment,
+                    recent_actor_ids=recent_actor_ids,
+                    created_object_id=created_object_id,
+                    last_activity_at=now,
+                )
+                group.actor = actor
+                group.actor_count += increment
+                group.recent_actor_ids = recent_actor_ids
+                group.created_object_id = created_object_id
+                group.last_activity_at = now
+                return group, False
+
+    notification = Notification.objects.create(
+        recipient_id=recipient_id,
+        actor=actor,
+        verb=verb,
+        target_type=target_type,
+        target_id=target_id,
+        created_object_id=created_object_id,
+        recent_actor_ids=[actor.id],
+    )
+    return notification, True
+
+
+def _push_notification_update(recipient_id: int, notification_id: int) -> bool:
+    notification = Notification.objects.select_related("actor").filter(pk=notification_id).first()
+    if notification is None:
         return False
+    return broadcast_user_notification(recipient_id, build_notification_payload(notification))
 
-    return True
 
+# Aktualizacje zgrupowanych powiadomień są zbijane: jedna wiadomość na grupę w oknie.
+notification_update_broadcaster = CoalescingBroadcaster(
+    _push_notification_update,
+    window_setting="NOTIFICATION_AGGREGATION_PUSH_WINDOW",
+)
 
-def _get_target_label(notification: Notification) -> str | None:
-    if notification.target_type != "animal":
-        return None
 
-    try:
-        animal = Animal.objects.only("name").get(pk=notification.target_id)
-    except Animal.DoesNotExist:
-        return None
+def schedule_notification_update(notification: Notification) -> None:
+    """Po commicie planuje (zbitą) wysyłkę zaktualizowanego powiadomienia grupowego."""
 
-    return animal.name
+    recipient_id = notification.recipient_id
+    notification_id = notification.pk
+    transaction.on_commit(
+        lambda: notification_update_broadcaster.schedule(recipient_id, notification_id)
+    )
 
 
-def _get_animal_context(notification: Notification) -> dict[str, Any]:
-    if notification.target_type != "animal":
-        return {"target_owner": None, "target_organization": None}
+@dataclass(slots=True)
+class NotificationTargets:
+    """Obiekty potrzebne do zbudowania payloadów dla paczki powiadomień."""
+
+    actors: dict[int, Any] = field(default_factory=dict)
+    animals: dict[int, Animal] = field(default_factory=dict)
+
+    def target_label(self, notification: Notification) -> str | None:
+        if notification.target_type != "animal":
+            return None
+        animal = self.animals.get(notification.target_id)
+        return animal.name if animal is not None else None
+
 
-    try:
-        animal = Animal.objects.select_related("owner", "organization").get(pk=notification.target_id)
-    except Animal.DoesNotExist:
+def resolve_notification_targets(notifications: Iterable[Notification]) -> NotificationTargets:
+    """Pobiera aktorów i cele powiadomień – jedno zapytanie na typ celu.
+
+    Aktorzy już wczytani przez ``select_related("actor")`` nie są pobierani ponownie.
+    """
+
+    targets = NotificationTargets()
+    missing_actor_ids: set[int] = set()
+    animal_ids: set[int] = set()
+
+    for notification in notifications:
+        if Notification.actor.is_cached(notification):
+            targets.actors[notification.actor_id] = notification.actor
+        else:
+            missing_actor_ids.add(notification.actor_id)
+        missing_actor_ids.update(notification.recent_actor_ids or [])
+        if notification.target_type == "animal":
+            animal_ids.add(notification.target_id)
+
+    missing_actor_ids -= set(targets.actors)
+    if missing_actor_ids:
+        User = get_user_model()
+        targets.actors.update(User.objects.in_bulk(missing_actor_ids))
+
+    if animal_ids:
+        targets.animals = Animal.objects.select_related("owner", "organization").in_bulk(animal_ids)
+
+    return targets
+
+
+def _get_animal_context(notification: Notification, targets: NotificationTargets) -> dict[str, Any]:
+    animal = None
+    if notification.target_type == "animal":
+        animal = targets.animals.get(notification.target_id)
+
+    if animal is None:
         return {"target_owner": None, "target_organization": None}
 
     owner_payload: dict[str, Any] | None = None
@@ -98,12 +247,13 @@ def _get_animal_context(notification: Notification) -> dict[str, Any]:
     }
 
 
-def build_notification_payload(
+def _build_payload(
     notification: Notification,
+    targets: NotificationTargets,
     extra_payload: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    actor = notification.actor
-    target_label = _get_target_label(notification)
+    actor = targets.actors.get(notification.actor_id) or notification.actor
+    target_label = targets.target_label(notification)
     origin_label = target_label or notification.target_type
     notification_type = "unknown"
     if (
@@ -130,17 +280,91 @@ def build_notification_payload(
             "label": origin_label,
         },
         "type": notification_type,
+        "actor_count": notification.actor_count,
+        "recent_actors": [
+            {
+                "id": recent_actor.id,
+                "first_name": recent_actor.first_name,
+                "last_name": recent_actor.last_name,
+            }
+            for recent_actor in (
+                targets.actors.get(actor_id) for actor_id in notification.recent_actor_ids or []
+            )
+            if recent_actor is not None
+        ],
         "is_read": notification.is_read,
         "created_at": notification.created_at.isoformat(),
+        "last_activity_at": notification.last_activity_at.isoformat(),
     }
-    payload.update(_get_animal_context(notification))
+    payload.update(_get_animal_context(notification, targets))
     if extra_payload:
         payload.update(extra_payload)
     return payload
 
 
+def build_notification_payloads(
+    notifications: Iterable[Notification],
+    extra_payload: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Payloady dla wielu powiadomień (broadcast, lista REST, odtwarzanie).
+
+    Stała liczba zapytań niezależnie od liczby powiadomień.
+    """
+
+    notifications = list(notifications)
+    targets = resolve_notification_targets(notifications)
+    return [_build_payload(notification, targets, extra_payload) for notification in notifications]
+
+
+def build_notification_payload(
+    notification: Notification,
+    extra_payload: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    return build_notification_payloads([notification], extra_payload)[0]
+
+
+def notifications_since(
+    user_id: int,
+    last_seen_id: int,
+    limit: int,
+) -> tuple[list[dict[str, Any]], bool]:
+    """Payloady powiadomień nowszych niż ostatnio widziane (rosnąco, maks. ``limit``).
+
+    "Nowsze" liczone jest po ``(last_activity_at, id)`` ostatnio widzianego
+    powiadomienia, więc obejmuje też zgrupowane powiadomienia, które zostały
+    zaktualizowane po rozłączeniu. Zwraca ``(payloady, czy_jest_więcej)``.
+    """
+
+    queryset = Notification.objects.filter(recipient_id=user_id)
+    last_seen = queryset.filter(pk=last_seen_id).values("last_activity_at").first()
+    if last_seen is not None:
+        queryset = queryset.filter(
+            Q(last_activity_at__gt=last_seen["last_activity_at"])
+            | Q(last_activity_at=last_seen["last_activity_at"], id__gt=last_seen_id)
+        )
+    else:
+        # ostatnio widziane powiadomienie mogło zostać usunięte (retencja)
+        queryset = queryset.filter(id__gt=last_seen_id)
+
+    notifications = list(
+        queryset.select_related("actor").order_by("last_activity_at", "id")[: limit + 1]
+    )
+    has_more = len(notifications) > limit
+    return build_notification_payloads(notifications[:limit]), has_more
+
+
 __all__ = [
+    "AGGREGATED_VERBS",
     "broadcast_user_notification",
+    "broadcast_user_notifications",
     "build_notification_payload",
+    "build_notification_payloads",
+    "NotificationTargets",
+    "resolve_notification_targets",
     "make_user_group_name",
+    "notification_update_broadcaster",
+    "notifications_since",
+    "record_notification",
+    "schedule_notification_update",
+    "send_to_user_group",
 ]
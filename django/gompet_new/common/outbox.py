@@ -0,0 +1,272 @@
+"""Transakcyjny outbox dla wiadomości websocket.
+
+Wiadomość zapisywana jest w ``outbox_messages`` w tej samej transakcji co
+zmiana danych, więc wycofany zapis nie zostanie rozgłoszony. Po commicie
+dispatcher w tle (lub komenda ``dispatch_outbox``) rezerwuje zaległe
+wiadomości, wysyła je paczkami do warstwy kanałów poza transakcją i usuwa
+wysłane wiersze. Dostarczenie jest „co najmniej raz”: wiadomość wysłana tuż
+przed awarią procesu zostanie wysłana ponownie po upływie rezerwacji.
+
+Po nieudanej wysyłce proces planuje kolejny przebieg na termin najbliższej
+ponownej próby (``OUTBOX_SCHEDULE_RETRIES``). Timer żyje tylko w procesie, więc
+po restarcie zaległe próby podejmie dopiero następny zapis albo
+``dispatch_outbox --loop`` – w produkcji ta komenda powinna działać jako osobny
+proces. Wiadomości, które wyczerpały ``OUTBOX_MAX_ATTEMPTS``, są logowane jako
+błąd, a ``dispatch_outbox`` je zgłasza i (z ``--prune-exhausted``) usuwa.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Iterable
+
+from asgiref.sync import async_to_sync
+from channels.exceptions import InvalidChannelLayerError
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Min, QuerySet
+from django.utils import timezone
+
+from .background import run_in_background
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+_dispatch_lock = threading.Lock()
+_dispatch_scheduled = False
+_retry_timer: threading.Timer | None = None
+
+
+@dataclass(slots=True)
+class DispatchResult:
+    sent: int = 0
+    failed: int = 0
+
+
+def get_layer():
+    try:
+        return get_channel_layer()
+    except (InvalidChannelLayerError, ImproperlyConfigured) as exc:
+        logger.debug("Kanał warstwy websocket niedostępny: %s", exc)
+        return None
+
+
+def _setting(name: str, default: Any) -> Any:
+    return getattr(settings, name, default)
+
+
+def enqueue(group: str, message_type: str, payload: dict[str, Any]) -> OutboxMessage:
+    """Zapisuje wiadomość w outboxie; wysyłka nastąpi po commicie transakcji."""
+
+    message = OutboxMessage.objects.create(group=group, message_type=message_type, payload=payload)
+    transaction.on_commit(request_dispatch)
+    return message
+
+
+def enqueue_many(messages: Iterable[tuple[str, str, dict[str, Any]]]) -> int:
+    rows = [
+        OutboxMessage(group=group, message_type=message_type, payload=payload)
+        for group, message_type, payload in messages
+    ]
+    if not rows:
+        return 0
+    OutboxMessage.objects.bulk_create(rows)
+    transaction.on_commit(request_dispatch)
+    return len(rows)
+
+
+def request_dispatch() -> None:
+    """Planuje opróżnienie outboxa w tle (kolejne żądania w trakcie są łączone)."""
+
+    global _dispatch_scheduled
+    if not _setting("OUTBOX_DISPATCH_ON_COMMIT", True):
+        return
+
+    with _dispatch_lock:
+        if _dispatch_scheduled:
+            return
+        _dispatch_scheduled = True
+    run_in_background(_run_scheduled_dispatch)
+
+
+def _run_scheduled_dispatch() -> None:
+    global _dispatch_scheduled
+    with _dispatch_lock:
+        # zerujemy flagę przed wysyłką, żeby wiadomości dodane w trakcie uruchomiły kolejny przebieg
+        _dispatch_scheduled = False
+    drain()
+
+
+def _max_attempts() -> int:
+    return int(_setting("OUTBOX_MAX_ATTEMPTS", 10))
+
+
+def _schedule_retry() -> bool:
+    """Planuje ``request_dispatch`` na termin najbliższej ponownej próby (jeden timer na proces)."""
+
+    global _retry_timer
+    if not _setting("OUTBOX_SCHEDULE_RETRIES", True) or not _setting("OUTBOX_DISPATCH_ON_COMMIT", True):
+        return False
+
+    next_due = OutboxMessage.objects.filter(attempts__lt=_max_attempts()).aggregate(
+        next_due=Min("available_at")
+    )["next_due"]
+    if next_due is None:
+        return False
+
+    delay = max((next_due - timezone.now()).total_seconds(), 0.0)
+    with _dispatch_lock:
+        if _retry_timer is not None and _retry_timer.is_alive():
+            return False
+        _retry_timer = threading.Timer(delay, request_dispatch)
+        _retry_timer.daemon = True
+    _retry_timer.start()
+    return True
+
+
+def exhausted_messages() -> QuerySet[OutboxMessage]:
+    """Wiadomości, które wyczerpały ``OUTBOX_MAX_ATTEMPTS`` i nie będą już wysyłane."""
+
+    return OutboxMessage.objects.filter(attempts__gte=_max_attempts())
+
+
+def prune_exhausted() -> int:
+    deleted, _ = exhausted_messages().delete()
+    return deleted
+
+
+def retry_delay(attempts: int) -> timedelta:
+    base = float(_setting("OUTBOX_RETRY_BASE_SECONDS", 2))
+    maximum = float(_setting("OUTBOX_RETRY_MAX_SECONDS", 300))
+    return timedelta(seconds=min(maximum, base * (2 ** max(attempts - 1, 0))))
+
+
+async def _send_all(channel_layer, messages: list[OutboxMessage]) -> list[Any]:
+    return await asyncio.gather(
+        *(
+            channel_layer.group_send(
+                message.group,
+                {"type": message.message_type, "payload": message.payload},
+            )
+            for message in messages
+        ),
+        return_exceptions=True,
+    )
+
+
+def _claim_batch(batch_size: int, max_attempts: int, now) -> list[OutboxMessage]:
+    """Rezerwuje paczkę wiadomości w krótkiej transakcji.
+
+    Zarezerwowane wiersze dostają ``available_at`` przesunięte o
+    ``OUTBOX_CLAIM_SECONDS`` i zwiększone ``attempts``, więc inne dispatchery
+    je pomijają, a po awarii procesu w trakcie wysyłki wracają do kolejki.
+    """
+
+    claim_until = now + timedelta(seconds=float(_setting("OUTBOX_CLAIM_SECONDS", 60)))
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(available_at__lte=now, attempts__lt=max_attempts)
+            .order_by("id")[:batch_size]
+        )
+        for message in messages:
+            message.attempts += 1
+            message.available_at = claim_until
+        if messages:
+            OutboxMessage.objects.bulk_update(messages, ["attempts", "available_at"])
+    return messages
+
+
+def dispatch_batch(batch_size: int | None = None) -> DispatchResult:
+    """Wysyła jedną paczkę zaległych wiadomości.
+
+    Trzy kroki, żadna transakcja nie jest otwarta w trakcie wysyłki:
+    rezerwacja wierszy (``SELECT … FOR UPDATE SKIP LOCKED`` i commit, więc
+    kilka dispatcherów może pracować równolegle), wysyłka do warstwy kanałów,
+    a na końcu usunięcie wysłanych i nowy termin próby dla nieudanych.
+    Wiadomości, które wyczerpały ``OUTBOX_MAX_ATTEMPTS``, zostają w tabeli do
+    ręcznej analizy.
+    """
+
+    channel_layer = get_layer()
+    if channel_layer is None:
+        return DispatchResult()
+
+    batch_size = batch_size or int(_setting("OUTBOX_BATCH_SIZE", 200))
+    max_attempts = _max_attempts()
+
+    messages = _claim_batch(batch_size, max_attempts, timezone.now())
+    if not messages:
+        return DispatchResult()
+
+    results = async_to_sync(_send_all)(channel_layer, messages)
+
+    now = timezone.now()
+    sent_ids = []
+    failed = []
+    for message, result in zip(messages, results):
+        if isinstance(result, Exception):
+            message.available_at = now + retry_delay(message.attempts)
+            message.last_error = repr(result)[:2000]
+            failed.append(message)
+            if message.attempts >= max_attempts:
+                logger.error(
+                    "Wiadomość outboxa #%s (%s → %s) wyczerpała %s prób: %s",
+                    message.pk,
+                    message.message_type,
+                    message.group,
+                    max_attempts,
+                    message.last_error,
+                )
+        else:
+            sent_ids.append(message.pk)
+
+    with transaction.atomic():
+        if sent_ids:
+            OutboxMessage.objects.filter(pk__in=sent_ids).delete()
+        if failed:
+            OutboxMessage.objects.bulk_update(failed, ["available_at", "last_error"])
+    if failed:
+        logger.warning("Nie udało się wysłać %s wiadomości z outboxa", len(failed))
+
+    return DispatchResult(sent=len(sent_ids), failed=len(failed))
+
+
+def drain(batch_size: int | None = None, max_batches: int | None = None) -> DispatchResult:
+    """Wysyła paczki, dopóki są gotowe wiadomości (lub do ``max_batches``).
+
+    Po nieudanych wysyłkach planuje kolejny przebieg na termin ponownej próby.
+    """
+
+    total = DispatchResult()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        result = dispatch_batch(batch_size)
+        batches += 1
+        total.sent += result.sent
+        total.failed += result.failed
+        if result.sent == 0:
+            break
+    if total.failed:
+        _schedule_retry()
+    return total
+
+
+__all__ = [
+    "DispatchResult",
+    "dispatch_batch",
+    "drain",
+    "enqueue",
+    "enqueue_many",
+    "exhausted_messages",
+    "get_layer",
+    "prune_exhausted",
+    "request_dispatch",
+    "retry_delay",
+]
@@ -0,0 +1,154 @@
+"""Paginacja kursorowa (keyset) po krotce pól sortowania."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# ``?pagination=cursor`` – widoki z domyślnie płaską listą przechodzą na kursor
+PAGINATION_QUERY_PARAM = "pagination"
+CURSOR_PAGINATION = "cursor"
+
+
+def uses_cursor_pagination(request) -> bool:
+    return request is not None and request.query_params.get(PAGINATION_QUERY_PARAM) == CURSOR_PAGINATION
+
+
+class KeysetCursorPagination(BasePagination):
+    """Stronicowanie ``WHERE (a, b) < (:a, :b) ORDER BY a DESC, b DESC LIMIT n``.
+
+    W przeciwieństwie do ``PageNumberPagination`` nie wykonuje ``COUNT(*)`` ani
+    ``OFFSET`` – koszt strony nie rośnie wraz z jej numerem. Kursor to
+    zakodowane wartości pól ``ordering`` ostatniego elementu strony. Ostatnie
+    pole sortowania musi być unikalne (np. ``id``).
+    """
+
+    ordering: tuple[str, ...] = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw is None:
+            return self.page_size
+        try:
+            value = int(raw)
+        except (TypeError, ValueError):
+            return self.page_size
+        if value <= 0:
+            return self.page_size
+        return min(value, self.max_page_size)
+
+    @staticmethod
+    def _field_name(ordering_field: str) -> str:
+        return ordering_field.lstrip("-")
+
+    def encode_cursor(self, instance: Any) -> str:
+        values = []
+        for ordering_field in self.ordering:
+            value = getattr(instance, self._field_name(ordering_field))
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, queryset: QuerySet, cursor: str) -> list[Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (binascii.Error, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        opts = queryset.model._meta
+        try:
+            return [
+                opts.get_field(self._field_name(ordering_field)).to_python(value)
+                for ordering_field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def build_after_filter(self, values: list[Any]) -> Q:
+        """Warunek "za kursorem" dla krotki pól (rozwinięty do OR-ów dla ORM)."""
+
+        condition = Q()
+        for index, ordering_field in enumerate(self.ordering):
+            name = self._field_name(ordering_field)
+            lookup = "lt" if ordering_field.startswith("-") else "gt"
+            term = Q(**{f"{name}__{lookup}": values[index]})
+            for previous_field, previous_value in zip(self.ordering[:index], values[:index]):
+                term &= Q(**{self._field_name(previous_field): previous_value})
+            condition |= term
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.build_after_filter(self.decode_cursor(queryset, cursor)))
+
+        items = list(queryset[: self.page_size_value + 1])
+        self.has_next = len(items) > self.page_size_value
+        self.page = items[: self.page_size_value]
+        return self.page
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Kursor następnej strony (pole ``next`` poprzedniej odpowiedzi).",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Liczba elementów na stronie (maks. {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+__all__ = [
+    "CURSOR_PAGINATION",
+    "KeysetCursorPagination",
+    "PAGINATION_QUERY_PARAM",
+    "uses_cursor_pagination",
+]
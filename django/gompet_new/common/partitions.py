@@ -0,0 +1,275 @@
+"""Miesięczne partycje tabeli ``notifications`` (PostgreSQL, RANGE po ``created_at``).
+
+Wiersze spoza zakresów partycji miesięcznych trafiają do partycji DEFAULT
+(``notifications_default``). PostgreSQL nie pozwoli utworzyć partycji
+miesiąca, dla którego DEFAULT ma już wiersze, więc ``ensure_monthly_partitions``
+odpina DEFAULT, tworzy partycję, przenosi do niej wiersze tego miesiąca i
+podpina DEFAULT z powrotem. Niepusta DEFAULT oznacza brakującą partycję –
+``prune_notifications`` to zgłasza i czyści z niej wiersze spoza retencji.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import re
+from dataclasses import dataclass
+
+from django.db import connection as default_connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATIONS_TABLE = "notifications"
+ARCHIVE_PREFIX = "archive_"
+DEFAULT_PARTITION_SUFFIX = "_default"
+_PARTITION_RE = re.compile(r"^(?P<parent>\w+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+
+@dataclass(frozen=True, slots=True)
+class MonthlyPartition:
+    name: str
+    month: dt.date
+
+    @property
+    def upper_bound(self) -> dt.date:
+        return add_months(self.month, 1)
+
+
+def month_start(value: dt.date | dt.datetime) -> dt.date:
+    return dt.date(value.year, value.month, 1)
+
+
+def add_months(month: dt.date, months: int) -> dt.date:
+    index = month.year * 12 + (month.month - 1) + months
+    return dt.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: dt.date, parent: str = NOTIFICATIONS_TABLE) -> str:
+    return f"{parent}_p{month:%Y%m}"
+
+
+def default_partition_name(parent: str = NOTIFICATIONS_TABLE) -> str:
+    return f"{parent}{DEFAULT_PARTITION_SUFFIX}"
+
+
+def _bound(month: dt.date) -> str:
+    # granice partycji zawsze w UTC – niezależnie od strefy czasowej sesji
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def is_supported(connection=None) -> bool:
+    connection = connection or default_connection
+    return connection.vendor == "postgresql"
+
+
+def create_month_partition_sql(month: dt.date, parent: str = NOTIFICATIONS_TABLE) -> str:
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(month, parent)}" '
+        f'PARTITION OF "{parent}" '
+        f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(add_months(month, 1))}')"
+    )
+
+
+def list_monthly_partitions(parent: str = NOTIFICATIONS_TABLE, connection=None) -> list[MonthlyPartition]:
+    """Partycje miesięczne podpięte pod ``parent`` (bez partycji DEFAULT)."""
+
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [parent],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_RE.match(name)
+        if match is None or match.group("parent") != parent:
+            continue
+        month = dt.date(int(match.group("year")), int(match.group("month")), 1)
+        partitions.append(MonthlyPartition(name=name, month=month))
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+def has_default_partition(parent: str = NOTIFICATIONS_TABLE, connection=None) -> bool:
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s AND child.relname = %s
+            """,
+            [parent, default_partition_name(parent)],
+        )
+        return cursor.fetchone() is not None
+
+
+def default_partition_months(parent: str = NOTIFICATIONS_TABLE, connection=None) -> dict[dt.date, int]:
+    """``{miesiąc: liczba wierszy}`` zalegających w partycji DEFAULT."""
+
+    connection = connection or default_connection
+    if not has_default_partition(parent, connection):
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT (date_trunc('month', \"created_at\" AT TIME ZONE 'UTC'))::date, COUNT(*) "
+            f'FROM "{default_partition_name(parent)}" GROUP BY 1'
+        )
+        return {month: total for month, total in cursor.fetchall()}
+
+
+def _create_month_partition(cursor, month: dt.date, parent: str, default_rows: int) -> None:
+    if not default_rows:
+        cursor.execute(create_month_partition_sql(month, parent))
+        return
+
+    # DEFAULT ma wiersze z tego zakresu – CREATE ... PARTITION OF by się nie powiódł
+    default_name = default_partition_name(parent)
+    in_range = f"\"created_at\" >= '{_bound(month)}' AND \"created_at\" < '{_bound(add_months(month, 1))}'"
+    cursor.execute(f'ALTER TABLE "{parent}" DETACH PARTITION "{default_name}"')
+    cursor.execute(create_month_partition_sql(month, parent))
+    cursor.execute(f'INSERT INTO "{partition_name(month, parent)}" SELECT * FROM "{default_name}" WHERE {in_range}')
+    cursor.execute(f'DELETE FROM "{default_name}" WHERE {in_range}')
+    cursor.execute(f'ALTER TABLE "{parent}" ATTACH PARTITION "{default_name}" DEFAULT')
+
+
+def ensure_monthly_partitions(
+    months_ahead: int,
+    parent: str = NOTIFICATIONS_TABLE,
+    today: dt.date | None = None,
+    connection=None,
+) -> list[str]:
+    """Tworzy partycje od bieżącego miesiąca do ``months_ahead`` miesięcy naprzód.
+
+    Tworzy też partycje miesięcy, których wiersze zalegają w DEFAULT, i
+    przenosi je tam z DEFAULT. Wywoływać w transakcji – odpięcie DEFAULT nie
+    może być widoczne dla innych sesji.
+    """
+
+    connection = connection or default_connection
+    current = month_start(today or timezone.now().date())
+    existing = {partition.name for partition in list_monthly_partitions(parent, connection)}
+    default_rows = default_partition_months(parent, connection)
+
+    months = {add_months(current, offset) for offset in range(months_ahead + 1)}
+    months.update(default_rows)
+
+    created = []
+    with connection.cursor() as cursor:
+        for month in sorted(months):
+            name = partition_name(month, parent)
+            if name in existing:
+                continue
+            _create_month_partition(cursor, month, parent, default_rows.get(month, 0))
+            created.append(name)
+    return created
+
+
+def expired_partitions(
+    retention_months: int,
+    parent: str = NOTIFICATIONS_TABLE,
+    today: dt.date | None = None,
+    connection=None,
+) -> list[MonthlyPartition]:
+    """Partycje, których cały zakres jest starszy niż okno retencji."""
+
+    cutoff = add_months(month_start(today or timezone.now().date()), -retention_months)
+    return [
+        partition
+        for partition in list_monthly_partitions(parent, connection)
+        if partition.upper_bound <= cutoff
+    ]
+
+
+def prune_default_partition(
+    retention_months: int,
+    parent: str = NOTIFICATIONS_TABLE,
+    today: dt.date | None = None,
+    archive: bool = False,
+    connection=None,
+) -> int:
+    """Usuwa z DEFAULT wiersze starsze niż okno retencji; zwraca ich liczbę.
+
+    Z ``archive=True`` wiersze trafiają najpierw do tabeli ``archive_<parent>_default``.
+    """
+
+    connection = connection or default_connection
+    if not has_default_partition(parent, connection):
+        return 0
+
+    cutoff = add_months(month_start(today or timezone.now().date()), -retention_months)
+    default_name = default_partition_name(parent)
+    expired = f"\"created_at\" < '{_bound(cutoff)}'"
+    with connection.cursor() as cursor:
+        if archive:
+            archived_name = f"{ARCHIVE_PREFIX}{default_name}"
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS "{archived_name}" (LIKE "{parent}")')
+            cursor.execute(f'INSERT INTO "{archived_name}" SELECT * FROM "{default_name}" WHERE {expired}')
+        cursor.execute(f'DELETE FROM "{default_name}" WHERE {expired}')
+        return cursor.rowcount
+
+
+def warn_if_default_partition_used(parent: str = NOTIFICATIONS_TABLE, connection=None) -> int:
+    """Loguje ostrzeżenie, gdy DEFAULT nie jest pusta; zwraca liczbę jej wierszy."""
+
+    rows = sum(default_partition_months(parent, connection).values())
+    if rows:
+        logger.warning(
+            "Partycja %s zawiera %d wierszy – brakuje partycji miesięcznej.",
+            default_partition_name(parent),
+            rows,
+        )
+    return rows
+
+
+def drop_partition(partition: MonthlyPartition, parent: str = NOTIFICATIONS_TABLE, connection=None) -> None:
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{parent}" DETACH PARTITION "{partition.name}"')
+        cursor.execute(f'DROP TABLE "{partition.name}"')
+
+
+def archive_partition(
+    partition: MonthlyPartition,
+    parent: str = NOTIFICATIONS_TABLE,
+    connection=None,
+) -> str:
+    """Odpina partycję i zostawia ją jako osobną tabelę ``archive_<nazwa>``."""
+
+    connection = connection or default_connection
+    archived_name = f"{ARCHIVE_PREFIX}{partition.name}"
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{parent}" DETACH PARTITION "{partition.name}"')
+        cursor.execute(f'ALTER TABLE "{partition.name}" RENAME TO "{archived_name}"')
+    return archived_name
+
+
+__all__ = [
+    "MonthlyPartition",
+    "NOTIFICATIONS_TABLE",
+    "add_months",
+    "archive_partition",
+    "create_month_partition_sql",
+    "default_partition_months",
+    "default_partition_name",
+    "drop_partition",
+    "ensure_monthly_partitions",
+    "expired_partitions",
+    "has_default_partition",
+    "is_supported",
+    "list_monthly_partitions",
+    "month_start",
+    "partition_name",
+    "prune_default_partition",
+    "warn_if_default_partition_used",
+]
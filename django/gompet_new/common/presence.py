@@ -0,0 +1,152 @@
+"""Obecność użytkowników na websocketach powiadomień (liczniki połączeń w cache).
+
+``NotificationConsumer`` zwiększa licznik przy ``connect`` i zmniejsza przy
+``disconnect``; ostatnie rozłączenie zostawia licznik ``0``. Pomijana jest
+tylko wysyłka do użytkownika z licznikiem ``0`` – powiadomienie i tak jest w
+bazie, a klient dogoni je po ponownym połączeniu. Brak klucza (nigdy nie
+połączony, albo klucz wygasł po ``NOTIFICATION_PRESENCE_TTL`` sekundach, także
+przy połączeniu otwartym dłużej) oznacza „nie wiadomo” i wiadomość jest
+wysyłana. Przy awarii procesu licznik może zostać zawyżony – w najgorszym
+razie wiadomość zostanie wysłana niepotrzebnie, nigdy odwrotnie.
+
+Liczniki muszą być wspólne dla wszystkich workerów websocketów i procesów
+wysyłających, więc obecność działa tylko przy współdzielonym cache
+(``common.shared_cache``). Bez niego wiadomości wysyłane są do wszystkich,
+jak przed wprowadzeniem obecności.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .shared_cache import shared_cache_feature_enabled
+
+DELIVERED_METRIC = "notifications.delivery.delivered"
+SKIPPED_METRIC = "notifications.delivery.skipped_offline"
+
+
+def presence_key(user_id: int) -> str:
+    return f"notifications.presence.{user_id}"
+
+
+def is_enabled() -> bool:
+    return shared_cache_feature_enabled("NOTIFICATION_PRESENCE_ENABLED")
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "NOTIFICATION_PRESENCE_TTL", 86400))
+
+
+def mark_connected(user_id: int) -> int:
+    if not is_enabled():
+        return 0
+    key = presence_key(user_id)
+    cache.add(key, 0, _ttl())
+    count = cache.incr(key)
+    cache.touch(key, _ttl())
+    return count
+
+
+def mark_disconnected(user_id: int) -> int:
+    if not is_enabled():
+        return 0
+    key = presence_key(user_id)
+    try:
+        count = cache.decr(key)
+    except ValueError:
+        # klucz wygasł – inne połączenia mogą być otwarte, zostaje „nie wiadomo”
+        return 0
+    if count <= 0:
+        cache.set(key, 0, _ttl())
+        return 0
+    return count
+
+
+async def amark_connected(user_id: int) -> int:
+    if not is_enabled():
+        return 0
+    key = presence_key(user_id)
+    await cache.aadd(key, 0, _ttl())
+    count = await cache.aincr(key)
+    await cache.atouch(key, _ttl())
+    return count
+
+
+async def amark_disconnected(user_id: int) -> int:
+    if not is_enabled():
+        return 0
+    key = presence_key(user_id)
+    try:
+        count = await cache.adecr(key)
+    except ValueError:
+        return 0
+    if count <= 0:
+        await cache.aset(key, 0, _ttl())
+        return 0
+    return count
+
+
+def online_user_ids(user_ids: Iterable[int]) -> set[int]:
+    """Zwraca użytkowników, do których warto wysyłać (jedno ``get_many``).
+
+    Pomija tylko tych, o których wiadomo, że nie mają otwartego połączenia
+    (licznik ``0``); brak klucza traktowany jest jak połączenie.
+    """
+
+    user_ids = list(user_ids)
+    if not is_enabled():
+        return set(user_ids)
+    keys = {presence_key(user_id): user_id for user_id in user_ids}
+    found = cache.get_many(list(keys))
+    return {user_id for key, user_id in keys.items() if found.get(key, 1) > 0}
+
+
+def is_online(user_id: int) -> bool:
+    return user_id in online_user_ids([user_id])
+
+
+def _incr_metric(key: str, value: int) -> None:
+    if value <= 0:
+        return
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, value)
+    except ValueError:
+        cache.set(key, value, None)
+
+
+def record_delivery(delivered: int, skipped: int) -> None:
+    if not is_enabled():
+        return
+    _incr_metric(DELIVERED_METRIC, delivered)
+    _incr_metric(SKIPPED_METRIC, skipped)
+
+
+def delivery_metrics() -> dict[str, int]:
+    values = cache.get_many([DELIVERED_METRIC, SKIPPED_METRIC])
+    return {
+        "delivered": values.get(DELIVERED_METRIC, 0),
+        "skipped_offline": values.get(SKIPPED_METRIC, 0),
+    }
+
+
+def reset_delivery_metrics() -> None:
+    cache.delete_many([DELIVERED_METRIC, SKIPPED_METRIC])
+
+
+__all__ = [
+    "amark_connected",
+    "amark_disconnected",
+    "delivery_metrics",
+    "is_enabled",
+    "is_online",
+    "mark_connected",
+    "mark_disconnected",
+    "online_user_ids",
+    "presence_key",
+    "record_delivery",
+    "reset_delivery_metrics",
+]
@@ -0,0 +1,132 @@
+"""Zbiorcze podsumowanie reakcji (liczby per typ + reakcja bieżącego użytkownika)."""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Q
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+from .models import Reaction, ReactionType
+
+# ``?reactions-version=2`` zastępuje listę ID reakcji polem ``reaction_summary``.
+REACTIONS_VERSION_PARAM = "reactions-version"
+REACTION_SUMMARY_VERSION = "2"
+
+
+def empty_reaction_summary() -> dict[str, Any]:
+    return {
+        "total": 0,
+        "counts": {reaction_type: 0 for reaction_type in ReactionType.values},
+        "my_reaction": None,
+    }
+
+
+def build_reaction_summaries(
+    content_type: ContentType,
+    object_ids: Iterable[int],
+    user: Any = None,
+) -> dict[int, dict[str, Any]]:
+    """Zwraca ``{object_id: summary}`` dla wszystkich obiektów jednym zapytaniem GROUP BY."""
+
+    object_ids = list(dict.fromkeys(object_ids))
+    summaries = {object_id: empty_reaction_summary() for object_id in object_ids}
+    if not object_ids:
+        return summaries
+
+    annotations: dict[str, Any] = {"total": Count("id")}
+    user_id = getattr(user, "id", None) if getattr(user, "is_authenticated", False) else None
+    if user_id is not None:
+        annotations["mine"] = Count("id", filter=Q(user_id=user_id))
+
+    rows = (
+        Reaction.objects.filter(reactable_type=content_type, reactable_id__in=object_ids)
+        .values("reactable_id", "reaction_type")
+        .annotate(**annotations)
+        .order_by()
+    )
+
+    reaction_order = {value: index for index, value in enumerate(ReactionType.values)}
+    for row in rows:
+        summary = summaries.get(row["reactable_id"])
+        if summary is None:
+            continue
+        reaction_type = row["reaction_type"]
+        summary["counts"][reaction_type] = row["total"]
+        summary["total"] += row["total"]
+        if row.get("mine"):
+            current = summary["my_reaction"]
+            if current is None or reaction_order[reaction_type] < reaction_order[current]:
+                summary["my_reaction"] = reaction_type
+
+    return summaries
+
+
+class ReactionSummaryListSerializer(serializers.ListSerializer):
+    """Liczy podsumowania reakcji dla całej strony przed serializacją elementów."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        items = list(iterable)
+        if self.child.uses_reaction_summary():
+            self.child.prime_reaction_summaries(items)
+        return super().to_representation(items)
+
+
+class ReactionSummarySerializerMixin:
+    """Wersjonowane pole ``reaction_summary`` w miejsce listy ``reactions``.
+
+    Serializer musi zadeklarować ``reaction_summary = serializers.SerializerMethodField()``
+    i ustawić ``Meta.list_serializer_class = ReactionSummaryListSerializer``.
+    """
+
+    @staticmethod
+    def uses_reaction_summary_for(request) -> bool:
+        if request is None:
+            return False
+        return request.query_params.get(REACTIONS_VERSION_PARAM) == REACTION_SUMMARY_VERSION
+
+    def uses_reaction_summary(self) -> bool:
+        return self.uses_reaction_summary_for(self.context.get("request"))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.uses_reaction_summary():
+            fields.pop("reactions", None)
+        else:
+            fields.pop("reaction_summary", None)
+        return fields
+
+    def _request_user(self):
+        request = self.context.get("request")
+        return getattr(request, "user", None)
+
+    def prime_reaction_summaries(self, instances: Iterable[Any]) -> None:
+        instances = list(instances)
+        if not instances:
+            self._reaction_summaries = {}
+            return
+        content_type = ContentType.objects.get_for_model(type(instances[0]))
+        self._reaction_summaries = build_reaction_summaries(
+            content_type,
+            [instance.pk for instance in instances],
+            self._request_user(),
+        )
+
+    def get_reaction_summary(self, obj) -> dict[str, Any]:
+        summaries = getattr(self, "_reaction_summaries", None) or {}
+        if obj.pk not in summaries:
+            content_type = ContentType.objects.get_for_model(type(obj))
+            summaries = build_reaction_summaries(content_type, [obj.pk], self._request_user())
+        return summaries[obj.pk]
+
+
+__all__ = [
+    "REACTIONS_VERSION_PARAM",
+    "ReactionSummaryListSerializer",
+    "ReactionSummarySerializerMixin",
+    "build_reaction_summaries",
+    "empty_reaction_summary",
+]
@@ -13,6 +13,11 @@ websocket_urlpatterns = [
         consumers.LikeCounterConsumer.as_asgi(),
         name="like-counter",
     ),
+    re_path(
+        r"^ws/reactables/$",
+        consumers.MultiLikeCounterConsumer.as_asgi(),
+        name="like-counters",
+    ),
     re_path(
         r"^ws/notifications/(?P<user_id>\d+)/$",
         consumers.NotificationConsumer.as_asgi(),
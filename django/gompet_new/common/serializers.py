@@ -1,9 +1,13 @@
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
 
-from animals.models import Animal
+from common.content_types import get_content_type_by_id, get_content_type_by_natural_key
+from common.followed_targets import load_followed_targets
 from common.models import Comment, Follow, Notification, Reaction, ReactionType
+from common.notifications import resolve_notification_targets
+from common.services import switch_reaction
 from users.serializers import UserSerializer
 
 
@@ -19,9 +23,14 @@ class ContentTypeRelatedField(serializers.PrimaryKeyRelatedField):
             app_label = app_label.lower()
             model = model.lower()
             try:
-                return self.get_queryset().get(
-                    app_label=app_label, model=model
-                )
+                return get_content_type_by_natural_key(app_label, model)
+            except ContentType.DoesNotExist:
+                self.fail("does_not_exist", pk_value=data)
+        if (isinstance(data, int) and not isinstance(data, bool)) or (
+            isinstance(data, str) and data.isdigit()
+        ):
+            try:
+                return get_content_type_by_id(int(data))
             except ContentType.DoesNotExist:
                 self.fail("does_not_exist", pk_value=data)
         return super().to_internal_value(data)
@@ -131,6 +140,16 @@ class ReactionSerializer(serializers.ModelSerializer):
             ) from exc
 
     def update(self, instance, validated_data):
+        # sama zmiana typu reakcji idzie przez atomowy serwis (jeden UPDATE, jedna wysyłka)
+        changed = set(validated_data) - {"user", "reaction_type"}
+        if "reaction_type" in validated_data and not changed:
+            try:
+                return switch_reaction(instance, validated_data["reaction_type"])
+            except DjangoValidationError as exc:
+                raise serializers.ValidationError(
+                    getattr(exc, "message_dict", exc.messages)
+                ) from exc
+
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
@@ -183,12 +202,63 @@ class FollowSerializer(serializers.ModelSerializer):
 
         return value
 
+
+class FollowedTargetListSerializer(serializers.ListSerializer):
+    """Wczytuje obserwowane obiekty całej strony – jedno ``in_bulk`` na typ celu."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        items = list(iterable)
+        self.child._followed_targets = load_followed_targets(items, self.child.context)
+        return super().to_representation(items)
+
+
+class FollowedTargetSerializer(serializers.ModelSerializer):
+    """Obserwacja wraz ze skróconą reprezentacją obserwowanego obiektu."""
+
+    target_type = serializers.SerializerMethodField()
+    target = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Follow
+        fields = (
+            "id",
+            "target_type",
+            "target_id",
+            "target",
+            "notification_preferences",
+            "created_at",
+        )
+        read_only_fields = fields
+        list_serializer_class = FollowedTargetListSerializer
+
+    def get_target_type(self, obj) -> str:
+        content_type = get_content_type_by_id(obj.target_type_id)
+        return f"{content_type.app_label}.{content_type.model}"
+
+    def get_target(self, obj) -> dict | None:
+        targets = getattr(self, "_followed_targets", None)
+        if targets is None:
+            targets = load_followed_targets([obj], self.context)
+        return targets.get((obj.target_type_id, obj.target_id))
+
+
 class ContentTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContentType
         fields = ["id", "app_label", "model"]
 
 
+class NotificationListSerializer(serializers.ListSerializer):
+    """Pobiera cele całej strony powiadomień naraz (bez N+1 na ``target_label``)."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        items = list(iterable)
+        self.child._notification_targets = resolve_notification_targets(items)
+        return super().to_representation(items)
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     actor = UserSerializer(read_only=True)
     target_label = serializers.SerializerMethodField()
@@ -203,8 +273,11 @@ class NotificationSerializer(serializers.ModelSerializer):
             "target_id",
             "created_object_id",
             "target_label",
+            "actor_count",
+            "recent_actor_ids",
             "is_read",
             "created_at",
+            "last_activity_at",
         ]
         read_only_fields = [
             "id",
@@ -214,16 +287,15 @@ class NotificationSerializer(serializers.ModelSerializer):
             "target_id",
             "created_object_id",
             "target_label",
+            "actor_count",
+            "recent_actor_ids",
             "created_at",
+            "last_activity_at",
         ]
+        list_serializer_class = NotificationListSerializer
 
     def get_target_label(self, obj: Notification) -> str | None:
-        if obj.target_type != "animal":
-            return None
-
-        try:
-            animal = Animal.objects.only("name").get(pk=obj.target_id)
-        except Animal.DoesNotExist:
-            return None
-
-        return animal.name
+        targets = getattr(self, "_notification_targets", None)
+        if targets is None:
+            targets = resolve_notification_targets([obj])
+        return targets.target_label(obj)
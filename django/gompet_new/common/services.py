@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Reaction, ReactionType
+from .signals import notify_owner_about_like, schedule_like_count_broadcast
+
+
+@transaction.atomic
+def switch_reaction(reaction: Reaction, reaction_type: str) -> Reaction:
+    """Atomowo zmienia typ istniejącej reakcji.
+
+    Wiersz aktualizowany jest jednym ``UPDATE`` (bez ``post_save``), a skutki
+    uboczne – jedna wysyłka licznika polubień po commicie i ewentualna
+    notyfikacja o nowym polubieniu – są wywoływane tutaj jawnie.
+    """
+
+    if reaction_type not in ReactionType.values:
+        raise ValidationError({"reaction_type": f"Invalid reaction type: {reaction_type}"})
+
+    previous_type = reaction.previous_reaction_type or reaction.reaction_type
+    if previous_type == reaction_type:
+        reaction.reaction_type = reaction_type
+        return reaction
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            Reaction.objects.filter(pk=reaction.pk).update(
+                reaction_type=reaction_type,
+                updated_at=now,
+            )
+    except IntegrityError as exc:
+        raise ValidationError(
+            {"reaction_type": "Użytkownik dodał już reakcję tego typu do tego obiektu."}
+        ) from exc
+
+    reaction.reaction_type = reaction_type
+    reaction.updated_at = now
+    reaction._loaded_reaction_type = reaction_type
+
+    if ReactionType.LIKE in (previous_type, reaction_type):
+        schedule_like_count_broadcast(reaction)
+
+    notify_owner_about_like(reaction, previous_type)
+    return reaction
+
+
+__all__ = ["switch_reaction"]
@@ -0,0 +1,68 @@
+"""Funkcje oparte o cache, które działają tylko na cache współdzielonym przez procesy.
+
+Np. licznik nieprzeczytanych i liczniki obecności na websocketach muszą być
+widoczne dla wszystkich workerów, dispatchera outboxa i komend zarządzania. Cache w
+pamięci procesu (``LocMemCache``) tego nie zapewnia, więc funkcja włączona
+ustawieniem działa wyłącznie przy cache współdzielonym (np. Redis przez
+``CACHE_REDIS_URL``). Przy starcie ``manage.py`` check ``common.E001``
+odmawia uruchomienia z taką konfiguracją; procesy bez checków (gunicorn,
+daphne) wyłączają funkcję i logują ostrzeżenie.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+logger = logging.getLogger(__name__)
+
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+SHARED_CACHE_FEATURES = ("NOTIFICATION_UNREAD_CACHE_ENABLED", "NOTIFICATION_PRESENCE_ENABLED")
+
+_warned: set[str] = set()
+
+
+def cache_is_shared(alias: str = DEFAULT_CACHE_ALIAS) -> bool:
+    backend = settings.CACHES.get(alias, {}).get("BACKEND", "")
+    return backend not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def shared_cache_feature_enabled(setting_name: str) -> bool:
+    """``True`` gdy funkcja jest włączona i cache jest współdzielony."""
+
+    if not getattr(settings, setting_name, False):
+        return False
+    if cache_is_shared():
+        return True
+    if setting_name not in _warned:
+        _warned.add(setting_name)
+        logger.warning("%s wymaga współdzielonego cache (CACHE_REDIS_URL) – wyłączono.", setting_name)
+    return False
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache_features(app_configs=None, **kwargs) -> list[checks.CheckMessage]:
+    if cache_is_shared():
+        return []
+    return [
+        checks.Error(
+            f"{setting_name} requires a cache shared between processes.",
+            hint="Set CACHE_REDIS_URL or disable the feature.",
+            id="common.E001",
+        )
+        for setting_name in SHARED_CACHE_FEATURES
+        if getattr(settings, setting_name, False)
+    ]
+
+
+__all__ = [
+    "cache_is_shared",
+    "check_shared_cache_features",
+    "shared_cache_feature_enabled",
+]
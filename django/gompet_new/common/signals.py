@@ -8,19 +8,31 @@ from typing import Any
 from asgiref.sync import async_to_sync
 from channels.exceptions import InvalidChannelLayerError
 from channels.layers import get_channel_layer
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models.signals import post_delete, post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from animals.models import Animal
+from .background import run_in_background
+from .follower_counts import decrement_follower_count, increment_follower_count
+from .coalescing import CoalescingBroadcaster
 from .like_counter import ReactableRef, build_payload, make_group_name, resolve_content_type
 from articles.models import Article
 from posts.models import Post
 from users.models import Organization
 
 from .models import Comment, Follow, Notification, Reaction, ReactionType
-from .notifications import broadcast_user_notification, build_notification_payload
+from .notifications import (
+    broadcast_user_notification,
+    broadcast_user_notifications,
+    build_notification_payload,
+    record_notification,
+    schedule_notification_update,
+)
+from .unread_counter import adjust_unread_count, adjust_unread_counts, push_unread_count
 
 logger = logging.getLogger(__name__)
 
@@ -66,32 +78,35 @@ def broadcast_like_count(reactable_type: Any, reactable_id: int) -> bool:
     return True
 
 
-@receiver(pre_save, sender=Reaction)
-def remember_previous_reaction_type(sender, instance: Reaction, **kwargs: Any) -> None:
-    if not instance.pk:
-        instance._previous_reaction_type = None
-        return
+like_count_broadcaster = CoalescingBroadcaster(
+    broadcast_like_count,
+    window_setting="LIKE_COUNTER_BROADCAST_WINDOW",
+)
 
-    try:
-        previous = Reaction.objects.get(pk=instance.pk)
-    except Reaction.DoesNotExist:
-        instance._previous_reaction_type = None
-    else:
-        instance._previous_reaction_type = previous.reaction_type
+
+def schedule_like_count_broadcast(reaction: Reaction) -> None:
+    """Po zatwierdzeniu transakcji planuje (zbitą) wysyłkę licznika polubień."""
+
+    content_type_id = reaction.reactable_type_id
+    reactable_id = reaction.reactable_id
+    transaction.on_commit(
+        lambda: like_count_broadcaster.schedule(content_type_id, reactable_id)
+    )
 
 
 @receiver(post_save, sender=Reaction)
-def handle_reaction_saved(sender, instance: Reaction, **kwargs: Any) -> None:
-    previous_type = getattr(instance, "_previous_reaction_type", None)
+def handle_reaction_saved(sender, instance: Reaction, created: bool, **kwargs: Any) -> None:
+    # poprzedni typ pochodzi ze stanu wczytanego w Reaction.from_db – bez dodatkowego zapytania
+    previous_type = None if created else instance.previous_reaction_type
+
+    if not created and previous_type == instance.reaction_type:
+        return
 
     if instance.reaction_type == ReactionType.LIKE or previous_type == ReactionType.LIKE:
-        broadcast_like_count(instance.reactable_type, instance.reactable_id)
+        schedule_like_count_broadcast(instance)
 
     notify_owner_about_like(instance, previous_type)
 
-    if hasattr(instance, "_previous_reaction_type"):
-        delattr(instance, "_previous_reaction_type")
-
 
 @receiver(post_save, sender=Comment)
 def handle_comment_saved(sender, instance: Comment, created: bool, **kwargs: Any) -> None:
@@ -106,21 +121,41 @@ def handle_follow_saved(sender, instance: Follow, created: bool, **kwargs: Any)
     if not created:
         return
 
+    increment_follower_count(instance.target_type_id, instance.target_id)
     notify_target_owner_about_follow(instance)
 
 
+@receiver(post_delete, sender=Follow)
+def handle_follow_deleted(sender, instance: Follow, **kwargs: Any) -> None:
+    decrement_follower_count(instance.target_type_id, instance.target_id)
+
+
 @receiver(post_save, sender=Post)
 def handle_post_saved(sender, instance: Post, created: bool, **kwargs: Any) -> None:
     if not created:
         return
 
-    notify_followers_about_new_post(instance)
+    schedule_new_post_fanout(instance)
+
+
+@receiver(post_save, sender=Notification)
+def handle_notification_saved(sender, instance: Notification, created: bool, **kwargs: Any) -> None:
+    if not created or instance.is_read:
+        return
+
+    recipient_id = instance.recipient_id
+
+    def _update_counter() -> None:
+        adjust_unread_count(recipient_id, 1)
+        push_unread_count(recipient_id)
+
+    transaction.on_commit(_update_counter)
 
 
 @receiver(post_delete, sender=Reaction)
 def handle_reaction_deleted(sender, instance: Reaction, **kwargs: Any) -> None:
     if instance.reaction_type == ReactionType.LIKE:
-        broadcast_like_count(instance.reactable_type, instance.reactable_id)
+        schedule_like_count_broadcast(instance)
 
 
 def notify_owner_about_like(reaction: Reaction, previous_type: ReactionType | None = None) -> None:
@@ -167,8 +202,8 @@ def notify_owner_about_like(reaction: Reaction, previous_type: ReactionType | No
     if not recipient or recipient.id == reaction.user_id:
         return
 
-    notification = Notification.objects.create(
-        recipient=recipient,
+    notification, created = record_notification(
+        recipient_id=recipient.id,
         actor=reaction.user,
         verb="polubił(a)",
         target_type=target_type,
@@ -176,6 +211,10 @@ def notify_owner_about_like(reaction: Reaction, previous_type: ReactionType | No
         created_object_id=reaction.id,
     )
 
+    if not created:
+        schedule_notification_update(notification)
+        return
+
     broadcast_user_notification(
         recipient.id, build_notification_payload(notification)
     )
@@ -271,8 +310,8 @@ def notify_target_owner_about_follow(follow: Follow) -> None:
     if not recipient or recipient.id == follow.user_id:
         return
 
-    notification = Notification.objects.create(
-        recipient=recipient,
+    notification, created = record_notification(
+        recipient_id=recipient.id,
         actor=follow.user,
         verb="zaczął(a) obserwować",
         target_type=target_type,
@@ -280,19 +319,45 @@ def notify_target_owner_about_follow(follow: Follow) -> None:
         created_object_id=follow.id,
     )
 
+    if not created:
+        schedule_notification_update(notification)
+        return
+
     broadcast_user_notification(recipient.id, build_notification_payload(notification))
 
 
-def notify_followers_about_new_post(post: Post) -> None:
+def schedule_new_post_fanout(post: Post) -> None:
+    """Po commicie przekazuje rozesłanie powiadomień o nowym poście do wątku w tle."""
+
+    post_id = post.pk
+    transaction.on_commit(lambda: run_in_background(notify_followers_about_new_post, post_id))
+
+
+def notify_followers_about_new_post(post_or_id: Post | int) -> int:
+    """Tworzy powiadomienia dla obserwujących paczkami ``bulk_create``.
+
+    Payload budowany jest raz na post (szablon), a dla każdego powiadomienia
+    uzupełniane są tylko ``id`` i znaczniki czasu. Wysyłka każdej paczki idzie
+    jednym, współbieżnym przejściem przez warstwę kanałów. Zwraca liczbę
+    utworzonych powiadomień.
+    """
+
+    if isinstance(post_or_id, Post):
+        post = post_or_id
+    else:
+        post = Post.objects.select_related("author").filter(pk=post_or_id).first()
+        if post is None:
+            return 0
+
     actor = post.author
     if not actor:
-        return
+        return 0
 
     try:
         animal_content_type = ContentType.objects.get_for_model(Animal)
         organization_content_type = ContentType.objects.get_for_model(Organization)
     except ContentType.DoesNotExist:
-        return
+        return 0
 
     target_type = None
     target_id = None
@@ -316,25 +381,70 @@ def notify_followers_about_new_post(post: Post) -> None:
         )
 
     if target_type is None or target_id is None:
-        return
+        return 0
 
-    recipient_ids = list(
-        follow_qs.exclude(user_id=actor.id).values_list("user_id", flat=True).distinct()
+    recipient_ids = (
+        follow_qs.exclude(user_id=actor.id)
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+        .distinct()
     )
 
-    if not recipient_ids:
-        return
-
-    for recipient_id in recipient_ids:
-        notification = Notification.objects.create(
-            recipient_id=recipient_id,
-            actor=actor,
-            verb="dodał(a) nowy post",
-            target_type=target_type,
-            target_id=target_id,
-            created_object_id=post.id,
+    chunk_size = max(1, int(getattr(settings, "NOTIFICATION_FANOUT_CHUNK_SIZE", 500)))
+    template: dict[str, Any] | None = None
+    created = 0
+    chunk: list[int] = []
+
+    def flush(recipients: list[int]) -> None:
+        nonlocal template, created
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(
+                    recipient_id=recipient_id,
+                    actor=actor,
+                    verb="dodał(a) nowy post",
+                    target_type=target_type,
+                    target_id=target_id,
+                    created_object_id=post.id,
+                    recent_actor_ids=[actor.id],
+                )
+                for recipient_id in recipients
+            ]
         )
-        broadcast_user_notification(recipient_id, build_notification_payload(notification))
-
-
-__all__ = ["broadcast_like_count"]
+        if template is None:
+            # wspólna część payloadu (aktor, etykieta i kontekst celu) liczona raz na post
+            template = build_notification_payload(notifications[0])
+        broadcast_user_notifications(
+            (
+                notification.recipient_id,
+                {
+                    **template,
+                    "id": notification.id,
+                    "created_at": notification.created_at.isoformat(),
+                    "last_activity_at": notification.last_activity_at.isoformat(),
+                },
+            )
+            for notification in notifications
+        )
+        # bulk_create nie wysyła post_save – licznik nieprzeczytanych aktualizujemy ręcznie
+        adjust_unread_counts(notification.recipient_id for notification in notifications)
+        created += len(notifications)
+
+    for recipient_id in recipient_ids.iterator(chunk_size=chunk_size):
+        chunk.append(recipient_id)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    return created
+
+
+__all__ = [
+    "broadcast_like_count",
+    "like_count_broadcaster",
+    "notify_followers_about_new_post",
+    "schedule_like_count_broadcast",
+    "schedule_new_post_fanout",
+]
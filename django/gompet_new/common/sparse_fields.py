@@ -0,0 +1,165 @@
+"""Rzadkie zestawy pól (``?fields=`` / ``?omit=``) dla serializerów DRF.
+
+``?fields=id,name,image`` zostawia tylko wskazane pola, ``?omit=comments``
+usuwa wskazane. Przycinane jest tylko pole najwyższego poziomu i tylko przy
+odczycie (metody bezpieczne). Ten sam wybór steruje zapytaniem:
+``SparseFieldsetsMixin.sparse_queryset`` dokłada ``select_related`` /
+``prefetch_related`` wyłącznie dla wybranych pól, a przy rzadkim zestawie
+ogranicza kolumny przez ``.only()`` – pominięte pole nie kosztuje ani
+zapytania, ani bajtów.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_QUERY_PARAM = "fields"
+OMIT_QUERY_PARAM = "omit"
+
+
+@dataclass(frozen=True, slots=True)
+class FieldPlan:
+    """Czego pole serializera potrzebuje od querysetu."""
+
+    columns: tuple[str, ...] = ()
+    select_related: tuple[str, ...] = ()
+    prefetch_related: tuple[Any, ...] = ()
+
+
+def parse_field_list(raw: str | None) -> set[str] | None:
+    if raw is None:
+        return None
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+def requested_fieldset(request) -> tuple[set[str] | None, set[str]]:
+    """Zwraca ``(fields, omit)``; ``fields`` = ``None`` oznacza „wszystkie”."""
+
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    params = request.query_params
+    return parse_field_list(params.get(FIELDS_QUERY_PARAM)), parse_field_list(params.get(OMIT_QUERY_PARAM)) or set()
+
+
+def is_sparse(request) -> bool:
+    fields, omit = requested_fieldset(request)
+    return fields is not None or bool(omit)
+
+
+class SparseFieldsetsMixin:
+    """Mixin serializera obsługujący ``?fields=`` i ``?omit=``.
+
+    ``sparse_field_plans`` opisuje pola wymagające relacji lub innych kolumn
+    niż własna nazwa (np. ``SerializerMethodField``). Pola bez planu, które
+    nie są kolumnami modelu, wyłączają ``.only()`` – wtedy ładowany jest
+    pełny wiersz, ale relacje nadal tylko dla wybranych pól.
+    """
+
+    sparse_field_plans: dict[str, FieldPlan] = {}
+    sparse_required_columns: tuple[str, ...] = ("id",)
+
+    def _is_root_serializer(self) -> bool:
+        parent = getattr(self, "parent", None)
+        # ``many=True`` – korzeniem jest ListSerializer bez rodzica
+        if parent is not None and not (getattr(parent, "child", None) is self and parent.parent is None):
+            return False
+        # serializer tworzony ręcznie w innym serializerze (np. w SerializerMethodField)
+        # dostaje ten sam kontekst – przycinamy tylko serializer widoku
+        view = self.context.get("view")
+        if view is not None and hasattr(view, "get_serializer_class"):
+            return type(self) is view.get_serializer_class()
+        return True
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root_serializer():
+            return fields
+
+        selected, omit = requested_fieldset(self.context.get("request"))
+        if selected is None and not omit:
+            return fields
+        return {
+            name: field
+            for name, field in fields.items()
+            if (selected is None or name in selected) and name not in omit
+        }
+
+    @classmethod
+    def selected_field_names(cls, request) -> list[str]:
+        declared = list(getattr(cls.Meta, "fields", ()))
+        selected, omit = requested_fieldset(request)
+        return [
+            name
+            for name in declared
+            if (selected is None or name in selected) and name not in omit
+        ]
+
+    @classmethod
+    def _field_columns(cls, model, serializer_fields, name: str) -> tuple[str, ...] | None:
+        plan = cls.sparse_field_plans.get(name)
+        if plan is not None:
+            return plan.columns
+
+        field = serializer_fields.get(name)
+        source = getattr(field, "source", None) or name
+        if source == "*" or "." in source:
+            return None
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            # relacje odwrotne i M2M nie mają kolumn – wystarczy klucz główny
+            return () if model_field.is_relation else None
+        return (model_field.name,)
+
+    @classmethod
+    def sparse_queryset(cls, queryset, request, field_names: Iterable[str] | None = None):
+        """Dokłada relacje wybranych pól i – przy rzadkim zestawie – ``.only()``."""
+
+        names = list(field_names) if field_names is not None else cls.selected_field_names(request)
+        select_related: list[str] = []
+        prefetch_related: list[Any] = []
+        for name in names:
+            plan = cls.sparse_field_plans.get(name)
+            if plan is None:
+                continue
+            select_related.extend(path for path in plan.select_related if path not in select_related)
+            prefetch_related.extend(plan.prefetch_related)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        if not is_sparse(request):
+            return queryset
+
+        serializer_fields = cls(context={"request": request}).fields
+        columns = list(cls.sparse_required_columns)
+        for name in names:
+            field_columns = cls._field_columns(queryset.model, serializer_fields, name)
+            if field_columns is None:
+                return queryset
+            columns.extend(column for column in field_columns if column not in columns)
+        for path in select_related:
+            # klucz obcy przechodzony przez select_related nie może być odroczony
+            root = path.split("__", 1)[0]
+            if root not in columns and queryset.model._meta.get_field(root).concrete:
+                columns.append(root)
+        return queryset.only(*columns)
+
+
+__all__ = [
+    "FIELDS_QUERY_PARAM",
+    "FieldPlan",
+    "OMIT_QUERY_PARAM",
+    "SparseFieldsetsMixin",
+    "is_sparse",
+    "parse_field_list",
+    "requested_fieldset",
+]
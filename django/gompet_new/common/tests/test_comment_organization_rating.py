@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from common.models import Comment
 from users.models import Organization, OrganizationType
+from users.ratings import recalculate_organization_ratings
 
 
 class CommentOrganizationRatingTests(TestCase):
@@ -82,3 +86,143 @@ class CommentOrganizationRatingTests(TestCase):
         self.organization.refresh_from_db()
 
         self.assertIsNone(self.organization.rating)
+
+    def _rate_as(self, email: str, rating: int | None) -> Comment:
+        user = get_user_model().objects.create_user(
+            email=email,
+            password="secret",
+            first_name="Rater",
+            last_name="Rating",
+        )
+        return Comment.objects.create(
+            user=user,
+            content_type=self.organization_ct,
+            object_id=self.organization.id,
+            body="Test comment",
+            rating=rating,
+        )
+
+    def test_counters_and_histogram_follow_rated_comments(self) -> None:
+        self._rate_as("rater-1@example.com", 5)
+        self._rate_as("rater-2@example.com", 3)
+        self._rate_as("rater-3@example.com", 5)
+        self._rate_as("rater-4@example.com", None)
+
+        self.organization.refresh_from_db()
+
+        self.assertEqual(self.organization.rating_sum, 13)
+        self.assertEqual(self.organization.rating_count, 3)
+        self.assertEqual(self.organization.rating_histogram, {1: 0, 2: 0, 3: 1, 4: 0, 5: 2})
+        self.assertEqual(self.organization.rating, 4)
+
+    def test_rating_update_moves_histogram_bucket(self) -> None:
+        comment = self._rate_as("rater-1@example.com", 2)
+
+        comment.rating = 4
+        comment.save()
+        self.organization.refresh_from_db()
+
+        self.assertEqual(self.organization.rating_sum, 4)
+        self.assertEqual(self.organization.rating_count, 1)
+        self.assertEqual(self.organization.rating_count_2, 0)
+        self.assertEqual(self.organization.rating_count_4, 1)
+
+    def test_half_average_rounds_like_python_round(self) -> None:
+        self._rate_as("rater-1@example.com", 2)
+        self._rate_as("rater-2@example.com", 3)
+
+        self.organization.refresh_from_db()
+
+        self.assertEqual(self.organization.rating, round(2.5))
+
+    def test_rating_change_is_single_update_without_aggregation(self) -> None:
+        comment = self._rate_as("rater-1@example.com", 2)
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.rating = 5
+
+        with CaptureQueriesContext(connection) as queries:
+            comment.save(update_fields=["rating", "updated_at"])
+
+        statements = [query["sql"].upper() for query in queries.captured_queries]
+        self.assertFalse(any("AVG(" in sql for sql in statements))
+        self.assertEqual(sum('UPDATE "ORGANIZATIONS"' in sql for sql in statements), 1)
+
+    def test_body_edit_does_not_touch_counters(self) -> None:
+        comment = self._rate_as("rater-1@example.com", 4)
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.body = "Edited comment body"
+
+        with CaptureQueriesContext(connection) as queries:
+            comment.save()
+
+        statements = [query["sql"].upper() for query in queries.captured_queries]
+        self.assertFalse(any('"ORGANIZATIONS"' in sql for sql in statements))
+
+    def test_non_organization_comment_does_not_lock_row(self) -> None:
+        comment = Comment.objects.create(
+            user=self.author,
+            content_type=ContentType.objects.get_for_model(get_user_model()),
+            object_id=self.owner.id,
+            body="Profile comment",
+            rating=3,
+        )
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.rating = 4
+
+        with CaptureQueriesContext(connection) as queries:
+            comment.save()
+            comment.delete()
+
+        statements = [query["sql"].upper() for query in queries.captured_queries]
+        self.assertFalse(any("FOR UPDATE" in sql for sql in statements))
+
+    def test_organization_comment_update_locks_row(self) -> None:
+        comment = self._rate_as("rater-1@example.com", 2)
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.rating = 4
+
+        with CaptureQueriesContext(connection) as queries:
+            comment.save()
+
+        statements = [query["sql"].upper() for query in queries.captured_queries]
+        self.assertEqual(sum("FOR UPDATE" in sql for sql in statements), 1)
+
+    def test_stale_instance_moves_counters_from_stored_rating(self) -> None:
+        comment = self._rate_as("rater-1@example.com", 2)
+        stale = Comment.objects.get(pk=comment.pk)
+        fresh = Comment.objects.get(pk=comment.pk)
+        fresh.rating = 3
+        fresh.save()
+
+        stale.rating = 5
+        stale.save()
+        self.organization.refresh_from_db()
+
+        self.assertEqual(self.organization.rating_sum, 5)
+        self.assertEqual(self.organization.rating_count, 1)
+        self.assertEqual(self.organization.rating_histogram, {1: 0, 2: 0, 3: 0, 4: 0, 5: 1})
+
+    def test_comment_cannot_move_to_another_object(self) -> None:
+        comment = Comment.objects.get(pk=self._rate_as("rater-1@example.com", 4).pk)
+        comment.object_id = self.organization.id + 1
+
+        with self.assertRaises(ValidationError) as raised:
+            comment.save()
+
+        self.assertIn("object_id", raised.exception.message_dict)
+
+    def test_recalculate_rebuilds_counters_from_comments(self) -> None:
+        self._rate_as("rater-1@example.com", 1)
+        self._rate_as("rater-2@example.com", 4)
+        Organization.objects.filter(pk=self.organization.pk).update(
+            rating=None, rating_sum=0, rating_count=0, rating_count_1=0, rating_count_4=0
+        )
+
+        recalculate_organization_ratings([self.organization.pk])
+        self.organization.refresh_from_db()
+
+        self.assertEqual(self.organization.rating_sum, 5)
+        self.assertEqual(self.organization.rating_count, 2)
+        self.assertEqual(self.organization.rating_histogram[1], 1)
+        self.assertEqual(self.organization.rating_histogram[4], 1)
+        self.assertEqual(self.organization.rating, 2)
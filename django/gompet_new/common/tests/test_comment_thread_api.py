@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.models import Comment
+from users.models import Organization, OrganizationType
+
+
+class CommentThreadCursorPaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="thread-commenter@example.com",
+            password="secret",
+            first_name="Thread",
+            last_name="Commenter",
+        )
+        self.organization = Organization.objects.create(
+            type=OrganizationType.SHELTER,
+            name="Thread Shelter",
+            email="thread-shelter@example.com",
+            image="",
+            phone="",
+            user=self.user,
+        )
+        self.organization_ct = ContentType.objects.get_for_model(Organization)
+        self.url = reverse("comment-list")
+
+        now = timezone.now()
+        self.comments = []
+        for index in range(5):
+            comment = Comment.objects.create(
+                user=self.user,
+                content_type=self.organization_ct,
+                object_id=self.organization.id,
+                body=f"Thread comment {index}",
+            )
+            Comment.objects.filter(pk=comment.pk).update(created_at=now - timedelta(minutes=index))
+            self.comments.append(comment)
+
+    def _params(self, **extra):
+        return {
+            "content_type": "users.organization",
+            "object_id": self.organization.id,
+            "pagination": "cursor",
+            **extra,
+        }
+
+    def test_cursor_pages_walk_thread_newest_first(self) -> None:
+        first = self.client.get(self.url, self._params(page_size=2))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([item["id"] for item in first.data["results"]], [c.id for c in self.comments[:2]])
+        self.assertIsNotNone(first.data["next"])
+
+        seen = [item["id"] for item in first.data["results"]]
+        next_url = first.data["next"]
+        while next_url:
+            page = self.client.get(next_url)
+            seen.extend(item["id"] for item in page.data["results"])
+            next_url = page.data["next"]
+
+        self.assertEqual(seen, [comment.id for comment in self.comments])
+
+    def test_without_cursor_mode_list_stays_flat_and_honours_limit(self) -> None:
+        response = self.client.get(
+            self.url,
+            {"content_type": "users.organization", "object_id": self.organization.id, "limit": 3},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 3)
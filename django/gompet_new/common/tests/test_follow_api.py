@@ -1,11 +1,16 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 
 from animals.models import Animal, Gender, Size
-from common.models import Follow
+from common.models import Follow, FollowerCount
 from users.models import Organization, OrganizationType
 
 
@@ -210,3 +215,254 @@ class FollowViewSetTests(TestCase):
             response.data["detail"],
             "'target_type' must be users.organization or animals.animal.",
         )
+
+
+class FollowBatchLookupTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.user = User.objects.create_user(email="batch-follow@example.com", password="secret")
+        self.owner = User.objects.create_user(email="batch-owner@example.com", password="secret")
+        self.animals = [
+            Animal.objects.create(
+                name=f"Batch {index}",
+                species="Dog",
+                gender=Gender.MALE,
+                size=Size.MEDIUM,
+                owner=self.owner,
+            )
+            for index in range(2)
+        ]
+        self.organization = Organization.objects.create(
+            type=OrganizationType.SHELTER,
+            name="Batch Paws",
+            email="batch-org@example.com",
+            user=self.owner,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("follow-is-following-batch")
+
+    def test_returns_follow_map_for_mixed_targets(self) -> None:
+        follow = Follow.objects.create(
+            user=self.user,
+            target_type=ContentType.objects.get_for_model(Animal),
+            target_id=self.animals[0].id,
+        )
+
+        response = self.client.get(
+            self.url,
+            {
+                "targets": ",".join(
+                    [
+                        f"animals.animal:{self.animals[0].id}",
+                        f"animals.animal:{self.animals[1].id}",
+                        f"users.organization:{self.organization.id}",
+                    ]
+                )
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["follows"],
+            {
+                f"animals.animal:{self.animals[0].id}": follow.id,
+                f"animals.animal:{self.animals[1].id}": 0,
+                f"users.organization:{self.organization.id}": 0,
+            },
+        )
+
+    def test_requires_parameters(self) -> None:
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 400)
+
+
+class FollowerCountTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.owner = User.objects.create_user(email="count-owner@example.com", password="secret")
+        self.followers = [
+            User.objects.create_user(email=f"count-follower-{index}@example.com", password="secret")
+            for index in range(3)
+        ]
+        self.animal = Animal.objects.create(
+            name="Counted",
+            species="Dog",
+            gender=Gender.MALE,
+            size=Size.MEDIUM,
+            owner=self.owner,
+        )
+        self.organization = Organization.objects.create(
+            type=OrganizationType.SHELTER,
+            name="Counted Paws",
+            email="count-org@example.com",
+            user=self.owner,
+        )
+        self.animal_ct = ContentType.objects.get_for_model(Animal)
+        self.organization_ct = ContentType.objects.get_for_model(Organization)
+        self.client = APIClient()
+
+    def _follow(self, user, content_type, target_id) -> Follow:
+        return Follow.objects.create(user=user, target_type=content_type, target_id=target_id)
+
+    def _counter(self, content_type, target_id) -> int:
+        return FollowerCount.objects.get(target_type=content_type, target_id=target_id).followers_count
+
+    def test_counter_follows_create_and_delete(self) -> None:
+        follows = [self._follow(user, self.animal_ct, self.animal.id) for user in self.followers]
+        self.assertEqual(self._counter(self.animal_ct, self.animal.id), 3)
+
+        follows[0].delete()
+        Follow.objects.filter(pk=follows[1].pk).delete()
+
+        self.assertEqual(self._counter(self.animal_ct, self.animal.id), 1)
+
+    def test_reconcile_command_rebuilds_counters(self) -> None:
+        for user in self.followers[:2]:
+            self._follow(user, self.animal_ct, self.animal.id)
+        FollowerCount.objects.filter(target_type=self.animal_ct, target_id=self.animal.id).update(
+            followers_count=7
+        )
+        FollowerCount.objects.create(
+            target_type=self.organization_ct, target_id=self.organization.id, followers_count=4
+        )
+
+        call_command("reconcile_follower_counts", stdout=StringIO())
+
+        self.assertEqual(self._counter(self.animal_ct, self.animal.id), 2)
+        self.assertFalse(
+            FollowerCount.objects.filter(target_type=self.organization_ct, target_id=self.organization.id).exists()
+        )
+
+    def test_followers_count_endpoint_reads_counter_without_count(self) -> None:
+        self._follow(self.followers[0], self.animal_ct, self.animal.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("follow-followers-count"),
+                {"target_type": "animals.animal", "target_id": self.animal.id},
+            )
+
+        self.assertEqual(response.data["followers_count"], 1)
+        self.assertFalse(any("COUNT(" in query["sql"].upper() for query in queries.captured_queries))
+
+    def test_batch_endpoint_returns_counts_for_mixed_targets(self) -> None:
+        for user in self.followers[:2]:
+            self._follow(user, self.animal_ct, self.animal.id)
+        self._follow(self.followers[2], self.organization_ct, self.organization.id)
+
+        response = self.client.get(
+            reverse("follow-followers-count-batch"),
+            {
+                "targets": ",".join(
+                    [
+                        f"animals.animal:{self.animal.id}",
+                        f"users.organization:{self.organization.id}",
+                        "animals.animal:999999",
+                    ]
+                )
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["followers_count"],
+            {
+                f"animals.animal:{self.animal.id}": 2,
+                f"users.organization:{self.organization.id}": 1,
+                "animals.animal:999999": 0,
+            },
+        )
+
+    def test_animal_list_exposes_followers_count_in_same_query(self) -> None:
+        for user in self.followers:
+            self._follow(user, self.animal_ct, self.animal.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("animal-list"))
+
+        results = response.data.get("results", response.data)
+        payload = next(item for item in results if item["id"] == self.animal.id)
+        self.assertEqual(payload["followers_count"], 3)
+        counter_queries = [
+            query["sql"] for query in queries.captured_queries if '"follower_counts"' in query["sql"]
+        ]
+        self.assertEqual(len(counter_queries), 1)
+        self.assertIn('"animals"', counter_queries[0])
+
+
+class FollowedTargetsListTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.user = User.objects.create_user(email="targets-follower@example.com", password="secret")
+        self.owner = User.objects.create_user(email="targets-owner@example.com", password="secret")
+        self.animals = [
+            Animal.objects.create(
+                name=f"Followed {index}",
+                species="Dog",
+                gender=Gender.FEMALE,
+                size=Size.SMALL,
+                owner=self.owner,
+            )
+            for index in range(3)
+        ]
+        self.organization = Organization.objects.create(
+            type=OrganizationType.SHELTER,
+            name="Followed Paws",
+            email="targets-org@example.com",
+            user=self.owner,
+        )
+        animal_ct = ContentType.objects.get_for_model(Animal)
+        organization_ct = ContentType.objects.get_for_model(Organization)
+        self.follows = [
+            Follow.objects.create(user=self.user, target_type=animal_ct, target_id=animal.id)
+            for animal in self.animals
+        ]
+        self.follows.append(
+            Follow.objects.create(user=self.user, target_type=organization_ct, target_id=self.organization.id)
+        )
+        Follow.objects.create(user=self.owner, target_type=animal_ct, target_id=self.animals[0].id)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("follow-targets")
+
+    def test_lists_followed_objects_with_compact_representation(self) -> None:
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual(len(results), 4)
+        by_type = {}
+        for item in results:
+            by_type.setdefault(item["target_type"], []).append(item)
+        self.assertEqual(
+            {item["target"]["name"] for item in by_type["animals.animal"]},
+            {animal.name for animal in self.animals},
+        )
+        self.assertEqual(by_type["users.organization"][0]["target"]["name"], self.organization.name)
+
+    def test_loads_each_target_type_with_one_query(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+
+        statements = [query["sql"] for query in queries.captured_queries]
+        self.assertEqual(sum('FROM "animals"' in sql for sql in statements), 1)
+        self.assertEqual(sum('FROM "organizations"' in sql for sql in statements), 1)
+
+    def test_cursor_walks_all_follows_newest_first(self) -> None:
+        seen = []
+        response = self.client.get(self.url, {"page_size": 3})
+        while True:
+            seen.extend(item["id"] for item in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(seen, [follow.id for follow in reversed(self.follows)])
+
+    def test_filters_by_target_type(self) -> None:
+        response = self.client.get(self.url, {"target_type": "users.organization"})
+
+        self.assertEqual([item["target_id"] for item in response.data["results"]], [self.organization.id])
@@ -2,13 +2,25 @@ from __future__ import annotations
 
 from unittest import mock
 
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from animals.models import Animal, Gender, Size
-from common.like_counter import ReactableRef, build_payload, make_group_name, resolve_content_type
+from common.coalescing import CoalescingBroadcaster
+from common.consumers import MultiLikeCounterConsumer
+from common.content_types import warm_content_type_cache
+from common.like_counter import (
+    ReactableRef,
+    build_payload,
+    build_payloads,
+    make_group_name,
+    resolve_content_type,
+)
 from common.models import Reaction, ReactionType
+from common.services import switch_reaction
 from common.signals import broadcast_like_count
 
 
@@ -38,6 +50,15 @@ class LikeCounterHelpersTests(TestCase):
         resolved = resolve_content_type(value)
         self.assertEqual(resolved, self.content_type)
 
+    def test_resolve_content_type_uses_process_cache(self) -> None:
+        warm_content_type_cache()
+        natural_key = f"{self.content_type.app_label}.{self.content_type.model}"
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_content_type(natural_key), self.content_type)
+            self.assertEqual(resolve_content_type(str(self.content_type.id)), self.content_type)
+            self.assertEqual(resolve_content_type(self.content_type.id), self.content_type)
+
     def test_build_payload_counts_likes(self) -> None:
         Reaction.objects.create(
             user=self.user,
@@ -78,3 +99,175 @@ class LikeCounterHelpersTests(TestCase):
     @mock.patch("common.signals.get_channel_layer", return_value=None)
     def test_broadcast_like_count_returns_false_without_layer(self, mocked_layer_getter: mock.Mock) -> None:
         self.assertFalse(broadcast_like_count(self.content_type, self.animal.id))
+
+
+class CoalescingBroadcasterTests(TestCase):
+    def test_updates_for_same_group_are_coalesced(self) -> None:
+        send = mock.Mock(return_value=True)
+        broadcaster = CoalescingBroadcaster(send, "LIKE_COUNTER_BROADCAST_WINDOW", window=60)
+
+        self.assertTrue(broadcaster.schedule(3, 7))
+        self.assertFalse(broadcaster.schedule(3, 7))
+        self.assertFalse(broadcaster.schedule(3, 7))
+        self.assertTrue(broadcaster.schedule(3, 8))
+
+        send.assert_not_called()
+        self.assertEqual(broadcaster.flush_all(), 2)
+        self.assertEqual(send.call_count, 2)
+        send.assert_any_call(3, 7)
+        send.assert_any_call(3, 8)
+        self.assertEqual(broadcaster.pending_keys(), [])
+
+    def test_zero_window_sends_immediately(self) -> None:
+        send = mock.Mock(return_value=True)
+        broadcaster = CoalescingBroadcaster(send, "LIKE_COUNTER_BROADCAST_WINDOW", window=0)
+
+        broadcaster.schedule(3, 7)
+        broadcaster.schedule(3, 7)
+
+        self.assertEqual(send.call_count, 2)
+
+    @override_settings(LIKE_COUNTER_BROADCAST_WINDOW=0)
+    def test_reaction_schedules_broadcast_after_commit(self) -> None:
+        User = get_user_model()
+        user = User.objects.create_user(email="coalesce@example.com", password="secret")
+        animal = Animal.objects.create(
+            name="Azor",
+            species="dog",
+            gender=Gender.MALE,
+            size=Size.MEDIUM,
+        )
+        content_type = ContentType.objects.get_for_model(Animal)
+
+        with mock.patch("common.signals.like_count_broadcaster") as mocked_broadcaster:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                Reaction.objects.create(
+                    user=user,
+                    reaction_type=ReactionType.LIKE,
+                    reactable_type=content_type,
+                    reactable_id=animal.id,
+                )
+                mocked_broadcaster.schedule.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+        mocked_broadcaster.schedule.assert_called_once_with(content_type.id, animal.id)
+
+
+class SwitchReactionTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.user = User.objects.create_user(email="switch@example.com", password="secret")
+        self.animal = Animal.objects.create(
+            name="Reks",
+            species="dog",
+            gender=Gender.MALE,
+            size=Size.MEDIUM,
+        )
+        self.content_type = ContentType.objects.get_for_model(Animal)
+        self.reaction = Reaction.objects.create(
+            user=self.user,
+            reaction_type=ReactionType.LOVE,
+            reactable_type=self.content_type,
+            reactable_id=self.animal.id,
+        )
+
+    def test_loaded_reaction_tracks_previous_type_without_query(self) -> None:
+        reaction = Reaction.objects.get(pk=self.reaction.pk)
+        reaction.reaction_type = ReactionType.WOW
+
+        with self.assertNumQueries(0):
+            self.assertEqual(reaction.previous_reaction_type, ReactionType.LOVE)
+
+    def test_switch_updates_row_and_schedules_single_broadcast(self) -> None:
+        reaction = Reaction.objects.get(pk=self.reaction.pk)
+
+        with mock.patch("common.signals.like_count_broadcaster") as mocked_broadcaster:
+            with self.captureOnCommitCallbacks(execute=True):
+                switch_reaction(reaction, ReactionType.LIKE)
+
+        reaction.refresh_from_db()
+        self.assertEqual(reaction.reaction_type, ReactionType.LIKE)
+        mocked_broadcaster.schedule.assert_called_once_with(self.content_type.id, self.animal.id)
+
+    def test_switch_between_non_like_types_does_not_broadcast(self) -> None:
+        reaction = Reaction.objects.get(pk=self.reaction.pk)
+
+        with mock.patch("common.signals.like_count_broadcaster") as mocked_broadcaster:
+            with self.captureOnCommitCallbacks(execute=True):
+                switch_reaction(reaction, ReactionType.WOW)
+
+        mocked_broadcaster.schedule.assert_not_called()
+
+
+class MultiLikeCounterConsumerTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.user = User.objects.create_user(email="multi@example.com", password="secret")
+        self.first = Animal.objects.create(name="Pierwszy", species="dog", gender=Gender.MALE, size=Size.SMALL)
+        self.second = Animal.objects.create(name="Drugi", species="dog", gender=Gender.MALE, size=Size.SMALL)
+        self.content_type = ContentType.objects.get_for_model(Animal)
+        Reaction.objects.create(
+            user=self.user,
+            reaction_type=ReactionType.LIKE,
+            reactable_type=self.content_type,
+            reactable_id=self.first.id,
+        )
+
+    def test_build_payloads_uses_single_query(self) -> None:
+        refs = [
+            ReactableRef(content_type=self.content_type, object_id=self.first.id),
+            ReactableRef(content_type=self.content_type, object_id=self.second.id),
+        ]
+
+        with self.assertNumQueries(1):
+            payloads = build_payloads(refs)
+
+        self.assertEqual([item["total_likes"] for item in payloads], [1, 0])
+
+    def test_subscribe_returns_snapshot_and_forwards_updates(self) -> None:
+        communicator = WebsocketCommunicator(MultiLikeCounterConsumer.as_asgi(), "/ws/reactables/")
+        connected, _ = async_to_sync(communicator.connect)()
+        self.assertTrue(connected)
+
+        async_to_sync(communicator.send_json_to)(
+            {
+                "action": "subscribe",
+                "reactables": [
+                    {"type": "animals.animal", "id": self.first.id},
+                    f"animals.animal:{self.second.id}",
+                ],
+            }
+        )
+        snapshot = async_to_sync(communicator.receive_json_from)()
+        self.assertEqual(snapshot["type"], "snapshot")
+        self.assertEqual(
+            {item["reactable"]["id"]: item["total_likes"] for item in snapshot["items"]},
+            {self.first.id: 1, self.second.id: 0},
+        )
+
+        async_to_sync(communicator.application_instance.channel_layer.group_send)(
+            make_group_name(self.content_type.id, self.second.id),
+            {"type": "like_count_update", "payload": {"total_likes": 5}},
+        )
+        self.assertEqual(async_to_sync(communicator.receive_json_from)(), {"total_likes": 5})
+
+        async_to_sync(communicator.send_json_to)(
+            {"action": "unsubscribe", "reactables": [f"animals.animal:{self.second.id}"]}
+        )
+        async_to_sync(communicator.application_instance.channel_layer.group_send)(
+            make_group_name(self.content_type.id, self.second.id),
+            {"type": "like_count_update", "payload": {"total_likes": 6}},
+        )
+        self.assertTrue(async_to_sync(communicator.receive_nothing)())
+
+        async_to_sync(communicator.disconnect)()
+
+    def test_invalid_subscription_returns_error(self) -> None:
+        communicator = WebsocketCommunicator(MultiLikeCounterConsumer.as_asgi(), "/ws/reactables/")
+        async_to_sync(communicator.connect)()
+
+        async_to_sync(communicator.send_json_to)({"action": "subscribe", "reactables": ["bad"]})
+
+        response = async_to_sync(communicator.receive_json_from)()
+        self.assertEqual(response["type"], "error")
+        async_to_sync(communicator.disconnect)()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import datetime as dt
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from common.models import Notification
+from common.partitions import (
+    add_months,
+    create_month_partition_sql,
+    default_partition_months,
+    ensure_monthly_partitions,
+    expired_partitions,
+    list_monthly_partitions,
+    partition_name,
+)
+
+
+class PartitionHelpersTests(SimpleTestCase):
+    def test_add_months_crosses_year_boundary(self) -> None:
+        self.assertEqual(add_months(dt.date(2025, 11, 1), 3), dt.date(2026, 2, 1))
+        self.assertEqual(add_months(dt.date(2025, 1, 1), -1), dt.date(2024, 12, 1))
+
+    def test_partition_name(self) -> None:
+        self.assertEqual(partition_name(dt.date(2025, 3, 1)), "notifications_p202503")
+
+
+class NotificationPartitionCommandTests(TestCase):
+    def setUp(self) -> None:
+        if connection.vendor != "postgresql":
+            self.skipTest("Partycjonowanie wymaga PostgreSQL.")
+
+    def test_ensure_creates_upcoming_partitions(self) -> None:
+        today = dt.date(2031, 5, 17)
+
+        created = ensure_monthly_partitions(2, today=today)
+
+        self.assertEqual(created, ["notifications_p203105", "notifications_p203106", "notifications_p203107"])
+        self.assertEqual(ensure_monthly_partitions(2, today=today), [])
+
+    def test_prune_drops_expired_partitions(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(create_month_partition_sql(dt.date(2001, 1, 1)))
+
+        self.assertIn(
+            "notifications_p200101",
+            [partition.name for partition in expired_partitions(12)],
+        )
+
+        call_command("prune_notifications", "--retention-months", "12", stdout=StringIO())
+
+        names = [partition.name for partition in list_monthly_partitions()]
+        self.assertNotIn("notifications_p200101", names)
+
+    def _notification_in_default_partition(self, created_at: dt.datetime) -> Notification:
+        user = get_user_model().objects.create_user(email="partition@example.com", password="secret")
+        notification = Notification.objects.create(
+            recipient=user, actor=user, verb="polubił(a)", target_type="animal", target_id=1
+        )
+        Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+        return notification
+
+    def test_ensure_moves_rows_out_of_default_partition(self) -> None:
+        notification = self._notification_in_default_partition(
+            dt.datetime(2040, 3, 10, tzinfo=dt.timezone.utc)
+        )
+        self.assertEqual(default_partition_months(), {dt.date(2040, 3, 1): 1})
+
+        created = ensure_monthly_partitions(0, today=dt.date(2031, 5, 17))
+
+        self.assertIn("notifications_p204003", created)
+        self.assertEqual(default_partition_months(), {})
+        self.assertTrue(Notification.objects.filter(pk=notification.pk).exists())
+
+    def test_prune_removes_expired_rows_from_default_partition(self) -> None:
+        notification = self._notification_in_default_partition(
+            dt.datetime(2001, 2, 10, tzinfo=dt.timezone.utc)
+        )
+        stderr = StringIO()
+
+        call_command(
+            "prune_notifications", "--retention-months", "12", "--dry-run", stdout=StringIO(), stderr=stderr
+        )
+        self.assertIn("DEFAULT notification partition holds 1 row(s)", stderr.getvalue())
+
+        call_command("prune_notifications", "--retention-months", "12", stdout=StringIO())
+
+        self.assertFalse(Notification.objects.filter(pk=notification.pk).exists())
+        self.assertEqual(default_partition_months(), {})
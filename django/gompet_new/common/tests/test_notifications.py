@@ -1,19 +1,39 @@
 from __future__ import annotations
 
+from datetime import timedelta
+from io import StringIO
 from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework_simplejwt.tokens import AccessToken
 
 from animals.models import Animal, Gender, Size
 from common.consumers import NotificationConsumer
-from common.models import Follow, Notification, Reaction, ReactionType
+from common import outbox
+from common.models import Follow, Notification, OutboxMessage, Reaction, ReactionType
+from common.presence import (
+    delivery_metrics,
+    mark_connected,
+    mark_disconnected,
+    online_user_ids,
+    presence_key,
+    reset_delivery_metrics,
+)
+from common.shared_cache import check_shared_cache_features
+from common.signals import notify_followers_about_new_post
+from common.unread_counter import get_unread_count, unread_cache_key
 from common.notifications import (
     broadcast_user_notification,
+    broadcast_user_notifications,
     build_notification_payload,
+    build_notification_payloads,
     make_user_group_name,
 )
 from channels.testing import WebsocketCommunicator
@@ -25,7 +45,12 @@ from users.models import Organization, OrganizationType
 
 
 class NotificationHelpersTests(TestCase):
-    @mock.patch("common.notifications.get_channel_layer")
+    def setUp(self) -> None:
+        for user_id in (5, 6, 7):
+            mark_connected(user_id)
+            self.addCleanup(cache.delete, presence_key(user_id))
+
+    @mock.patch("common.outbox.get_channel_layer")
     def test_broadcast_user_notification_sends_payload(self, mocked_layer_getter: mock.Mock) -> None:
         mocked_layer = mock.Mock()
         mocked_layer.group_send = mock.AsyncMock()
@@ -35,10 +60,136 @@ class NotificationHelpersTests(TestCase):
         sent = broadcast_user_notification(5, payload)
 
         self.assertTrue(sent)
+        mocked_layer.group_send.assert_not_awaited()
+        self.assertEqual(OutboxMessage.objects.filter(group=make_user_group_name(5)).count(), 1)
+
+        result = outbox.drain()
+
+        self.assertEqual(result.sent, 1)
         mocked_layer.group_send.assert_awaited_once()
         args, _ = mocked_layer.group_send.await_args
         self.assertEqual(args[0], make_user_group_name(5))
         self.assertEqual(args[1]["payload"], payload)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @override_settings(NOTIFICATION_PRESENCE_ENABLED=True)
+    @mock.patch("common.shared_cache.cache_is_shared", return_value=True)
+    def test_broadcast_skips_offline_users(self, _shared: mock.Mock) -> None:
+        mark_connected(5)
+        mark_connected(404)
+        mark_disconnected(404)
+        self.addCleanup(cache.delete, presence_key(404))
+        reset_delivery_metrics()
+
+        sent = broadcast_user_notification(404, {"foo": "bar"})
+        delivered = broadcast_user_notifications([(5, {"a": 1}), (404, {"b": 2})])
+
+        self.assertFalse(sent)
+        self.assertEqual(delivered, 1)
+        self.assertEqual(
+            list(OutboxMessage.objects.values_list("group", flat=True)),
+            [make_user_group_name(5)],
+        )
+        self.assertEqual(delivery_metrics(), {"delivered": 1, "skipped_offline": 2})
+
+    @override_settings(NOTIFICATION_PRESENCE_ENABLED=True)
+    def test_presence_is_disabled_without_shared_cache(self) -> None:
+        self.assertEqual(online_user_ids([404]), {404})
+        self.assertEqual(
+            [error.id for error in check_shared_cache_features()],
+            ["common.E001"],
+        )
+
+    @mock.patch("common.outbox.get_channel_layer")
+    def test_failed_outbox_message_is_retried_later(self, mocked_layer_getter: mock.Mock) -> None:
+        mocked_layer = mock.Mock()
+        mocked_layer.group_send = mock.AsyncMock(side_effect=ConnectionError("redis down"))
+        mocked_layer_getter.return_value = mocked_layer
+        broadcast_user_notification(6, {"foo": "bar"})
+
+        result = outbox.drain()
+
+        self.assertEqual((result.sent, result.failed), (0, 1))
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.available_at, timezone.now())
+        self.assertIn("redis down", message.last_error)
+
+    @override_settings(OUTBOX_SCHEDULE_RETRIES=True, OUTBOX_DISPATCH_ON_COMMIT=True)
+    @mock.patch("common.outbox.threading.Timer")
+    @mock.patch("common.outbox.get_channel_layer")
+    def test_failed_send_schedules_retry_when_due(
+        self, mocked_layer_getter: mock.Mock, mocked_timer: mock.Mock
+    ) -> None:
+        mocked_layer = mock.Mock()
+        mocked_layer.group_send = mock.AsyncMock(side_effect=ConnectionError("redis down"))
+        mocked_layer_getter.return_value = mocked_layer
+        mocked_timer.return_value.is_alive.return_value = False
+        self.addCleanup(setattr, outbox, "_retry_timer", None)
+        broadcast_user_notification(6, {"foo": "bar"})
+
+        outbox.drain()
+
+        delay, callback = mocked_timer.call_args.args
+        self.assertGreater(delay, 0)
+        self.assertLessEqual(delay, outbox.retry_delay(1).total_seconds())
+        self.assertIs(callback, outbox.request_dispatch)
+        mocked_timer.return_value.start.assert_called_once()
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=1)
+    @mock.patch("common.outbox.get_channel_layer")
+    def test_exhausted_messages_are_logged_and_pruned(self, mocked_layer_getter: mock.Mock) -> None:
+        mocked_layer = mock.Mock()
+        mocked_layer.group_send = mock.AsyncMock(side_effect=ConnectionError("redis down"))
+        mocked_layer_getter.return_value = mocked_layer
+        broadcast_user_notification(6, {"foo": "bar"})
+
+        with self.assertLogs("common.outbox", level="ERROR"):
+            outbox.drain()
+        stderr = StringIO()
+        call_command("dispatch_outbox", stdout=StringIO(), stderr=stderr)
+        self.assertIn("1 message(s) used up all attempts", stderr.getvalue())
+        self.assertEqual(outbox.exhausted_messages().count(), 1)
+
+        call_command("dispatch_outbox", "--prune-exhausted", stdout=StringIO(), stderr=StringIO())
+
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @mock.patch("common.outbox.get_channel_layer")
+    def test_outbox_rows_are_claimed_before_sending(self, mocked_layer_getter: mock.Mock) -> None:
+        claimed_during_send = []
+
+        async def group_send(group, message):
+            claimed_during_send.append(
+                await OutboxMessage.objects.filter(available_at__lte=timezone.now()).aexists()
+            )
+
+        mocked_layer = mock.Mock()
+        mocked_layer.group_send = mock.AsyncMock(side_effect=group_send)
+        mocked_layer_getter.return_value = mocked_layer
+        broadcast_user_notification(5, {"foo": "bar"})
+
+        result = outbox.drain()
+
+        self.assertEqual(result.sent, 1)
+        # w trakcie wysyłki wiersz jest zarezerwowany – inny dispatcher by go pominął
+        self.assertEqual(claimed_during_send, [False])
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @override_settings(BACKGROUND_TASKS_ASYNC=True, OUTBOX_DISPATCH_ON_COMMIT=True)
+    @mock.patch("common.outbox.run_in_background")
+    def test_rolled_back_notification_is_not_dispatched(self, mocked_run: mock.Mock) -> None:
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    broadcast_user_notification(7, {"foo": "bar"})
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        mocked_run.assert_not_called()
+        self.assertFalse(OutboxMessage.objects.exists())
 
     def test_build_notification_payload_serializes_fields(self) -> None:
         User = get_user_model()
@@ -108,6 +259,39 @@ class NotificationHelpersTests(TestCase):
         self.assertEqual(payload["target_organization"]["id"], organization.id)
         self.assertEqual(payload["target_organization"]["name"], organization.name)
 
+    def test_build_notification_payloads_uses_constant_queries(self) -> None:
+        User = get_user_model()
+        recipient = User.objects.create_user(email="batch-to@example.com", password="secret")
+        actors = [
+            User.objects.create_user(email=f"batch-from-{index}@example.com", password="secret")
+            for index in range(3)
+        ]
+        animals = [
+            Animal.objects.create(name=f"Paczka {index}", species="dog", gender=Gender.MALE, size=Size.SMALL)
+            for index in range(3)
+        ]
+        for actor, animal in zip(actors, animals):
+            Notification.objects.create(
+                recipient=recipient,
+                actor=actor,
+                verb="polubił(a)",
+                target_type="animal",
+                target_id=animal.id,
+            )
+        notifications = list(Notification.objects.filter(recipient=recipient))
+
+        with self.assertNumQueries(2):
+            payloads = build_notification_payloads(notifications)
+
+        self.assertEqual(
+            payloads,
+            [build_notification_payload(notification) for notification in notifications],
+        )
+        self.assertEqual(
+            {payload["target_label"] for payload in payloads},
+            {animal.name for animal in animals},
+        )
+
 
 class NotificationSignalTests(TestCase):
     def setUp(self) -> None:
@@ -191,6 +375,91 @@ class NotificationSignalTests(TestCase):
         self.assertEqual(payload["verb"], "polubił(a)")
 
 
+class NotificationAggregationTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.owner = User.objects.create_user(email="agg-owner@example.com", password="secret")
+        self.first_fan = User.objects.create_user(
+            email="agg-ala@example.com", password="secret", first_name="Ala"
+        )
+        self.second_fan = User.objects.create_user(
+            email="agg-ola@example.com", password="secret", first_name="Ola"
+        )
+        self.animal = Animal.objects.create(
+            name="Grupka",
+            species="dog",
+            gender=Gender.MALE,
+            size=Size.MEDIUM,
+            owner=self.owner,
+        )
+        self.content_type = ContentType.objects.get_for_model(Animal)
+
+    def _like(self, user) -> Reaction:
+        return Reaction.objects.create(
+            user=user,
+            reaction_type=ReactionType.LIKE,
+            reactable_type=self.content_type,
+            reactable_id=self.animal.id,
+        )
+
+    @override_settings(NOTIFICATION_AGGREGATION_WINDOW=3600)
+    @mock.patch("common.signals.schedule_notification_update")
+    @mock.patch("common.signals.broadcast_user_notification")
+    def test_likes_on_same_target_are_grouped(
+        self, mocked_broadcast: mock.Mock, mocked_update: mock.Mock
+    ) -> None:
+        self._like(self.first_fan)
+        self._like(self.second_fan)
+
+        notification = Notification.objects.get(recipient=self.owner)
+        self.assertEqual(notification.actor_count, 2)
+        self.assertEqual(notification.actor_id, self.second_fan.id)
+        self.assertEqual(notification.recent_actor_ids, [self.second_fan.id, self.first_fan.id])
+        mocked_broadcast.assert_called_once()
+        mocked_update.assert_called_once()
+
+        payload = build_notification_payload(notification)
+        self.assertEqual(payload["actor_count"], 2)
+        self.assertEqual(
+            [actor["first_name"] for actor in payload["recent_actors"]],
+            ["Ola", "Ala"],
+        )
+
+    @override_settings(NOTIFICATION_AGGREGATION_WINDOW=3600)
+    @mock.patch("common.signals.schedule_notification_update")
+    @mock.patch("common.signals.broadcast_user_notification")
+    def test_grouping_moves_last_activity_but_keeps_created_at(
+        self, mocked_broadcast: mock.Mock, mocked_update: mock.Mock
+    ) -> None:
+        self._like(self.first_fan)
+        before = Notification.objects.get(recipient=self.owner)
+
+        self._like(self.second_fan)
+
+        after = Notification.objects.get(recipient=self.owner)
+        self.assertEqual(after.created_at, before.created_at)
+        self.assertGreater(after.last_activity_at, before.last_activity_at)
+
+    @override_settings(NOTIFICATION_AGGREGATION_WINDOW=3600)
+    @mock.patch("common.signals.broadcast_user_notification")
+    def test_read_group_starts_new_notification(self, mocked_broadcast: mock.Mock) -> None:
+        self._like(self.first_fan)
+        Notification.objects.filter(recipient=self.owner).update(is_read=True)
+
+        self._like(self.second_fan)
+
+        self.assertEqual(Notification.objects.filter(recipient=self.owner).count(), 2)
+
+    @override_settings(NOTIFICATION_AGGREGATION_WINDOW=0)
+    @mock.patch("common.signals.broadcast_user_notification")
+    def test_zero_window_disables_grouping(self, mocked_broadcast: mock.Mock) -> None:
+        self._like(self.first_fan)
+        self._like(self.second_fan)
+
+        self.assertEqual(Notification.objects.filter(recipient=self.owner).count(), 2)
+        self.assertEqual(mocked_broadcast.call_count, 2)
+
+
 class NotificationApiTests(TestCase):
     def setUp(self) -> None:
         User = get_user_model()
@@ -232,6 +501,157 @@ class NotificationApiTests(TestCase):
         self.assertEqual(response.data[0]["id"], first.id)
         self.assertEqual(response.data[0]["actor"]["id"], self.other_user.id)
 
+    def _create_animal_notifications(self, count: int) -> list[Notification]:
+        notifications = []
+        for index in range(count):
+            animal = Animal.objects.create(
+                name=f"Etykieta {index}",
+                species="dog",
+                gender=Gender.MALE,
+                size=Size.SMALL,
+            )
+            notifications.append(
+                Notification.objects.create(
+                    recipient=self.user,
+                    actor=self.other_user,
+                    verb="polubił(a)",
+                    target_type="animal",
+                    target_id=animal.id,
+                )
+            )
+        return notifications
+
+    def test_list_is_cursor_paginated_by_last_activity_at_and_id(self) -> None:
+        notifications = self._create_animal_notifications(5)
+        expected_ids = [
+            notification.id
+            for notification in sorted(
+                notifications, key=lambda item: (item.last_activity_at, item.id), reverse=True
+            )
+        ]
+        self.client.force_authenticate(user=self.user)
+
+        first_page = self.client.get(
+            reverse("notification-list"), {"pagination": "cursor", "page_size": 3}
+        )
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual([item["id"] for item in first_page.data["results"]], expected_ids[:3])
+        self.assertEqual([item["id"] for item in second_page.data["results"]], expected_ids[3:])
+        self.assertIsNone(second_page.data["next"])
+        self.assertEqual(first_page.data["results"][0]["target_label"], "Etykieta 4")
+
+    def test_list_query_count_does_not_depend_on_page_size(self) -> None:
+        self._create_animal_notifications(12)
+        self.client.force_authenticate(user=self.user)
+
+        for page_size in (2, 12):
+            with self.assertNumQueries(2):
+                response = self.client.get(
+                    reverse("notification-list"), {"pagination": "cursor", "page_size": page_size}
+                )
+            self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_flat_list_query_count_does_not_depend_on_size(self) -> None:
+        self._create_animal_notifications(2)
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(2):
+            self.client.get(reverse("notification-list"))
+
+        self._create_animal_notifications(6)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("notification-list"))
+        self.assertEqual(len(response.data), 8)
+
+    @override_settings(NOTIFICATION_UNREAD_CACHE_ENABLED=True)
+    @mock.patch("common.shared_cache.cache_is_shared", return_value=True)
+    def test_unread_count_uses_cache(self, _shared: mock.Mock) -> None:
+        self._create_animal_notifications(3)
+        self.client.force_authenticate(user=self.user)
+        cache.delete(unread_cache_key(self.user.id))
+
+        first = self.client.get(reverse("notification-unread-count"))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("notification-unread-count"))
+
+        self.assertEqual(first.data, {"unread": 3})
+        self.assertEqual(second.data, {"unread": 3})
+
+    @mock.patch("common.api_views.push_unread_count")
+    def test_mark_all_read_updates_in_single_query(self, mocked_push: mock.Mock) -> None:
+        self._create_animal_notifications(4)
+        self.client.force_authenticate(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                response = self.client.post(reverse("notification-mark-all-read"))
+
+        self.assertEqual(response.data, {"updated": 4, "unread": 0})
+        self.assertFalse(Notification.objects.filter(recipient=self.user, is_read=False).exists())
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        mocked_push.assert_called_once_with(self.user.id, 0)
+
+    @mock.patch("common.api_views.push_unread_count")
+    def test_mark_read_up_to_id(self, mocked_push: mock.Mock) -> None:
+        notifications = self._create_animal_notifications(3)
+        self.client.force_authenticate(user=self.user)
+
+        watermark = Notification.objects.get(pk=notifications[1].id)
+
+        response = self.client.post(
+            reverse("notification-mark-all-read"),
+            {"up_to_id": watermark.id, "up_to_last_activity_at": watermark.last_activity_at.isoformat()},
+            format="json",
+        )
+
+        self.assertEqual(response.data, {"updated": 2, "unread": 1})
+        self.assertFalse(Notification.objects.get(pk=notifications[2].id).is_read)
+
+    @mock.patch("common.api_views.push_unread_count")
+    def test_mark_read_watermark_skips_refreshed_older_id(self, mocked_push: mock.Mock) -> None:
+        notifications = self._create_animal_notifications(2)
+        watermark = Notification.objects.get(pk=notifications[1].id)
+        # starsze powiadomienie odświeżone po tym, co widział klient
+        Notification.objects.filter(pk=notifications[0].id).update(
+            last_activity_at=watermark.last_activity_at + timedelta(seconds=5)
+        )
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            reverse("notification-mark-all-read"),
+            {"up_to_id": watermark.id, "up_to_last_activity_at": watermark.last_activity_at.isoformat()},
+            format="json",
+        )
+
+        self.assertEqual(response.data["updated"], 1)
+        self.assertFalse(Notification.objects.get(pk=notifications[0].id).is_read)
+
+    def test_mark_read_requires_last_activity_at_with_id(self) -> None:
+        notifications = self._create_animal_notifications(1)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            reverse("notification-mark-all-read"), {"up_to_id": notifications[0].id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_does_not_create_notifications(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(reverse("notification-list"), {}, format="json")
+
+        self.assertEqual(response.status_code, 405)
+
+    def test_invalid_cursor_returns_404(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(
+            reverse("notification-list"), {"pagination": "cursor", "cursor": "not-a-cursor"}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
     def test_patch_allows_marking_as_read(self) -> None:
         notification = Notification.objects.create(
             recipient=self.user,
@@ -328,6 +748,76 @@ class NotificationConsumerTests(TestCase):
 
         async_to_sync(communicator.disconnect)()
 
+    @override_settings(NOTIFICATION_PRESENCE_ENABLED=True)
+    @mock.patch("common.shared_cache.cache_is_shared", return_value=True)
+    def test_connection_is_tracked_for_presence(self, _shared: mock.Mock) -> None:
+        cache.delete(presence_key(self.user.id))
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(),
+            f"/ws/notifications/{self.user.id}/",
+        )
+        communicator.scope["user"] = self.user
+
+        async_to_sync(communicator.connect)()
+        self.assertEqual(online_user_ids([self.user.id]), {self.user.id})
+
+        async_to_sync(communicator.disconnect)()
+        self.assertEqual(online_user_ids([self.user.id]), set())
+        cache.delete(presence_key(self.user.id))
+
+    @override_settings(NOTIFICATION_PRESENCE_ENABLED=True)
+    @mock.patch("common.shared_cache.cache_is_shared", return_value=True)
+    def test_expired_presence_key_still_delivers_to_open_socket(self, _shared: mock.Mock) -> None:
+        cache.delete(presence_key(self.user.id))
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(),
+            f"/ws/notifications/{self.user.id}/",
+        )
+        communicator.scope["user"] = self.user
+        async_to_sync(communicator.connect)()
+
+        # klucz wygasł po NOTIFICATION_PRESENCE_TTL, a połączenie nadal jest otwarte
+        cache.delete(presence_key(self.user.id))
+
+        self.assertEqual(online_user_ids([self.user.id]), {self.user.id})
+        self.assertTrue(broadcast_user_notification(self.user.id, {"foo": "bar"}))
+
+        async_to_sync(communicator.disconnect)()
+        # rozłączenie przy wygasłym kluczu nie oznacza użytkownika jako offline
+        self.assertEqual(online_user_ids([self.user.id]), {self.user.id})
+
+    @override_settings(NOTIFICATION_CATCH_UP_LIMIT=2)
+    def test_reconnect_streams_notifications_after_last_seen_id(self) -> None:
+        User = get_user_model()
+        actor = User.objects.create_user(email="catch-up@example.com", password="secret")
+        notifications = [
+            Notification.objects.create(
+                recipient=self.user,
+                actor=actor,
+                verb="polubił(a)",
+                target_type="post",
+                target_id=index,
+            )
+            for index in range(4)
+        ]
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(),
+            f"/ws/notifications/{self.user.id}/?last_seen_id={notifications[0].id}",
+        )
+        communicator.scope["user"] = self.user
+
+        connected, _ = async_to_sync(communicator.connect)()
+        self.assertTrue(connected)
+
+        first = async_to_sync(communicator.receive_json_from)()
+        second = async_to_sync(communicator.receive_json_from)()
+        marker = async_to_sync(communicator.receive_json_from)()
+
+        self.assertEqual([first["id"], second["id"]], [notifications[1].id, notifications[2].id])
+        self.assertEqual(marker, {"type": "catch_up_complete", "count": 2, "has_more": True})
+
+        async_to_sync(communicator.disconnect)()
+
     def test_authenticated_user_cannot_subscribe_to_other_user(self) -> None:
         other_user = get_user_model().objects.create_user(
             email="other@example.com",
@@ -446,13 +936,16 @@ class FollowPostNotificationSignalTests(TestCase):
             },
         )
 
-    @mock.patch("common.signals.broadcast_user_notification")
+    @override_settings(BACKGROUND_TASKS_ASYNC=False)
+    @mock.patch("common.signals.broadcast_user_notifications")
     def test_new_post_notifies_followers(self, mocked_broadcast: mock.Mock) -> None:
-        post = Post.objects.create(
-            content="Nowy post",
-            author=self.owner,
-            animal=self.animal,
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(
+                content="Nowy post",
+                author=self.owner,
+                animal=self.animal,
+            )
+            self.assertFalse(Notification.objects.filter(created_object_id=post.id).exists())
 
         notification = Notification.objects.get(recipient=self.follower, created_object_id=post.id)
         self.assertEqual(notification.verb, "dodał(a) nowy post")
@@ -460,3 +953,25 @@ class FollowPostNotificationSignalTests(TestCase):
         self.assertEqual(notification.target_id, self.animal.id)
 
         mocked_broadcast.assert_called_once()
+        messages = list(mocked_broadcast.call_args.args[0])
+        self.assertEqual(len(messages), 1)
+        recipient_id, payload = messages[0]
+        self.assertEqual(recipient_id, self.follower.id)
+        self.assertEqual(payload["id"], notification.id)
+        self.assertEqual(payload["target_label"], self.animal.name)
+
+    @override_settings(NOTIFICATION_FANOUT_CHUNK_SIZE=2)
+    @mock.patch("common.signals.broadcast_user_notifications")
+    def test_fanout_creates_notifications_in_chunks(self, mocked_broadcast: mock.Mock) -> None:
+        User = get_user_model()
+        animal_type = ContentType.objects.get_for_model(Animal)
+        for index in range(4):
+            follower = User.objects.create_user(email=f"bulk-{index}@example.com", password="secret")
+            Follow.objects.create(user=follower, target_type=animal_type, target_id=self.animal.id)
+        post = Post.objects.create(content="Masowy post", author=self.owner, animal=self.animal)
+
+        created = notify_followers_about_new_post(post.id)
+
+        self.assertEqual(created, 5)
+        self.assertEqual(Notification.objects.filter(created_object_id=post.id).count(), 5)
+        self.assertEqual(mocked_broadcast.call_count, 3)
@@ -9,6 +9,7 @@ from rest_framework.test import APIClient
 
 from animals.models import Animal, Gender, Size
 from articles.models import Article
+from common.content_types import warm_content_type_cache
 from common.models import Comment, Reaction, ReactionType
 from posts.models import Post
 
@@ -211,3 +212,90 @@ class ReactionViewSetTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertFalse(response.data["has_reaction"])
+
+
+class ReactionBatchLookupTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="batch-like@example.com",
+            password="secret",
+        )
+        self.client.force_authenticate(self.user)
+        self.animal = Animal.objects.create(
+            name="Wsadowy",
+            species="Dog",
+            gender=Gender.MALE,
+            size=Size.MEDIUM,
+        )
+        self.posts = [
+            Post.objects.create(content=f"Post {index}", author=self.user, animal=self.animal)
+            for index in range(3)
+        ]
+        self.post_ct = ContentType.objects.get_for_model(Post)
+        self.animal_ct = ContentType.objects.get_for_model(Animal)
+        self.url = reverse("reaction-has-reactions")
+
+    def test_returns_reaction_map_for_single_type(self) -> None:
+        liked = Reaction.objects.create(
+            user=self.user,
+            reaction_type=ReactionType.LIKE,
+            reactable_type=self.post_ct,
+            reactable_id=self.posts[1].id,
+        )
+        ids = ",".join(str(post.id) for post in self.posts)
+
+        response = self.client.get(
+            self.url, {"reactable_type": "posts.post", "reactable_ids": ids}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["reactions"],
+            {
+                str(self.posts[0].id): 0,
+                str(self.posts[1].id): liked.id,
+                str(self.posts[2].id): 0,
+            },
+        )
+
+    def test_supports_mixed_content_types(self) -> None:
+        liked_animal = Reaction.objects.create(
+            user=self.user,
+            reaction_type=ReactionType.LIKE,
+            reactable_type=self.animal_ct,
+            reactable_id=self.animal.id,
+        )
+
+        response = self.client.get(
+            self.url,
+            {"reactables": f"animals.animal:{self.animal.id},posts.post:{self.posts[0].id}"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["reactions"],
+            {
+                f"animals.animal:{self.animal.id}": liked_animal.id,
+                f"posts.post:{self.posts[0].id}": 0,
+            },
+        )
+
+    def test_lookup_uses_single_query_with_warm_content_types(self) -> None:
+        warm_content_type_cache()
+        ids = ",".join(str(post.id) for post in self.posts)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url, {"reactable_type": "posts.post", "reactable_ids": ids}
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_rejects_invalid_ids(self) -> None:
+        response = self.client.get(
+            self.url, {"reactable_type": "posts.post", "reactable_ids": "1,abc"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("detail", response.data["errors"])
@@ -0,0 +1,139 @@
+"""Licznik nieprzeczytanych powiadomień trzymany w cache.
+
+Cache jest używany tylko, gdy jest współdzielony przez procesy
+(``NOTIFICATION_UNREAD_CACHE_ENABLED``, ``common.shared_cache``). W
+przeciwnym razie każdy odczyt liczy nieprzeczytane w bazie, a zmiany
+licznika są pomijane – lokalny cache jednego workera i tak by się rozjechał.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Notification
+from .notifications import send_to_user_group
+from .shared_cache import shared_cache_feature_enabled
+
+logger = logging.getLogger(__name__)
+
+
+def unread_cache_key(user_id: int) -> str:
+    return f"notifications.unread.{user_id}"
+
+
+def is_cache_enabled() -> bool:
+    return shared_cache_feature_enabled("NOTIFICATION_UNREAD_CACHE_ENABLED")
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "NOTIFICATION_UNREAD_CACHE_TTL", 600))
+
+
+def count_unread(user_id: int) -> int:
+    """Liczy nieprzeczytane w bazie (indeks ``idx_notification_rec_read``)."""
+
+    return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+
+
+def cache_unread_count(user_id: int, count: int) -> None:
+    if not is_cache_enabled():
+        return
+    cache.set(unread_cache_key(user_id), count, _ttl())
+
+
+def refresh_unread_count(user_id: int) -> int:
+    count = count_unread(user_id)
+    cache_unread_count(user_id, count)
+    return count
+
+
+def get_unread_count(user_id: int) -> int:
+    """Zwraca licznik z cache; przy braku wpisu przelicza go z bazy."""
+
+    if not is_cache_enabled():
+        return count_unread(user_id)
+    count = cache.get(unread_cache_key(user_id))
+    if count is None:
+        return refresh_unread_count(user_id)
+    return count
+
+
+def adjust_unread_count(user_id: int, delta: int) -> None:
+    """Zmienia licznik o ``delta``; brak wpisu w cache oznacza przeliczenie przy odczycie."""
+
+    if not delta or not is_cache_enabled():
+        return
+
+    key = unread_cache_key(user_id)
+    try:
+        value = cache.incr(key, delta)
+    except ValueError:
+        return
+
+    if value < 0:
+        # licznik się rozjechał – następny odczyt policzy go od nowa
+        cache.delete(key)
+
+
+def adjust_unread_counts(user_ids: Iterable[int], delta: int = 1) -> None:
+    for user_id in user_ids:
+        adjust_unread_count(user_id, delta)
+
+
+def reconcile_unread_counts(user_ids: Iterable[int] | None = None) -> int:
+    """Przelicza liczniki z bazy jednym zapytaniem GROUP BY; zwraca liczbę użytkowników.
+
+    Bez współdzielonego cache nie ma czego uzgadniać – zwraca 0.
+    """
+
+    if not is_cache_enabled():
+        return 0
+
+    queryset = Notification.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        queryset = queryset.filter(recipient_id__in=user_ids)
+
+    rows = (
+        queryset.values("recipient_id")
+        .annotate(unread=Count("id", filter=Q(is_read=False)))
+        .order_by()
+    )
+    counts = {row["recipient_id"]: row["unread"] for row in rows}
+    if user_ids is not None:
+        for user_id in user_ids:
+            counts.setdefault(user_id, 0)
+
+    cache.set_many({unread_cache_key(user_id): count for user_id, count in counts.items()}, _ttl())
+    return len(counts)
+
+
+def push_unread_count(user_id: int, count: int | None = None) -> bool:
+    """Wysyła ``{"type": "unread_count", "unread": n}`` przez ``NotificationConsumer``."""
+
+    if count is None:
+        count = get_unread_count(user_id)
+    return send_to_user_group(
+        user_id,
+        "notification_unread_count",
+        {"type": "unread_count", "unread": count},
+    )
+
+
+__all__ = [
+    "adjust_unread_count",
+    "adjust_unread_counts",
+    "cache_unread_count",
+    "count_unread",
+    "get_unread_count",
+    "is_cache_enabled",
+    "push_unread_count",
+    "reconcile_unread_counts",
+    "refresh_unread_count",
+    "unread_cache_key",
+]
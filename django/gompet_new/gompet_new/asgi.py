@@ -11,6 +11,11 @@ from django.core.asgi import get_asgi_application
 
 django_asgi_app = get_asgi_application()
 
+from common.content_types import safe_warm_content_type_cache
+
+# ContentType rozwiązywany jest z pamięci procesu (websockety, liczniki, batch lookupy)
+safe_warm_content_type_cache()
+
 from common import routing as common_routing
 from gompet_new.middleware import JWTAuthMiddlewareStack
 
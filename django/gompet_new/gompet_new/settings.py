@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 from corsheaders.defaults import default_headers
@@ -19,6 +20,9 @@ from datetime import timedelta
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# ``manage.py test`` – wyłączamy m.in. timery w tle, które otwierają własne połączenia DB.
+RUNNING_TESTS = len(sys.argv) > 1 and sys.argv[1] == "test"
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -121,6 +125,90 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Okno (w sekundach), w którym aktualizacje licznika polubień tej samej grupy
+# websocket są zbijane do jednej wiadomości. 0 wyłącza zbijanie (domyślnie w
+# testach). Zbijanie działa w obrębie jednego procesu – każdy worker ma własne timery.
+LIKE_COUNTER_BROADCAST_WINDOW = float(
+    os.getenv("LIKE_COUNTER_BROADCAST_WINDOW", "0" if RUNNING_TESTS else "0.25")
+)
+
+# Zadania poza ścieżką żądania (np. rozsyłanie powiadomień o nowym poście).
+# BACKGROUND_TASKS_ASYNC=0 wykonuje je synchronicznie po commicie.
+BACKGROUND_TASKS_ASYNC = os.getenv("BACKGROUND_TASKS_ASYNC", "1") == "1"
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", "2"))
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(os.getenv("NOTIFICATION_FANOUT_CHUNK_SIZE", "500"))
+
+# Cache (m.in. licznik nieprzeczytanych powiadomień). Bez CACHE_REDIS_URL
+# używany jest cache w pamięci procesu.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Licznik nieprzeczytanych w cache – tylko przy cache współdzielonym (Redis);
+# bez niego liczony jest w bazie (indeks idx_notification_rec_read).
+NOTIFICATION_UNREAD_CACHE_ENABLED = (
+    os.getenv("NOTIFICATION_UNREAD_CACHE_ENABLED", "1" if CACHE_REDIS_URL else "0") == "1"
+)
+# Czas życia licznika nieprzeczytanych w cache – po wygaśnięciu jest
+# przeliczany z bazy (dodatkowo komenda reconcile_unread_notifications).
+NOTIFICATION_UNREAD_CACHE_TTL = int(os.getenv("NOTIFICATION_UNREAD_CACHE_TTL", "600"))
+
+# Tabela notifications jest partycjonowana miesięcznie. Komenda
+# prune_notifications zakłada partycje na NOTIFICATION_PARTITIONS_AHEAD
+# miesięcy naprzód i usuwa (lub archiwizuje) partycje starsze niż retencja.
+NOTIFICATION_RETENTION_MONTHS = int(os.getenv("NOTIFICATION_RETENTION_MONTHS", "12"))
+NOTIFICATION_PARTITIONS_AHEAD = int(os.getenv("NOTIFICATION_PARTITIONS_AHEAD", "3"))
+
+# Polubienia i obserwacje tego samego celu w tym oknie (sekundy) są łączone w
+# jedno powiadomienie ("Ala i 24 inne osoby…"); 0 wyłącza grupowanie.
+NOTIFICATION_AGGREGATION_WINDOW = int(os.getenv("NOTIFICATION_AGGREGATION_WINDOW", "3600"))
+# Okno zbijania wiadomości websocket o aktualizacji zgrupowanego powiadomienia.
+NOTIFICATION_AGGREGATION_PUSH_WINDOW = float(
+    os.getenv("NOTIFICATION_AGGREGATION_PUSH_WINDOW", "0" if RUNNING_TESTS else "2")
+)
+
+# Outbox wiadomości websocket: zapis w transakcji, wysyłka po commicie w tle
+# (oraz komendą dispatch_outbox --loop), ponawianie z wykładniczym odstępem.
+# Ponowne próby planowane są timerem w procesie; po restarcie podejmuje je
+# dispatch_outbox --loop, który w produkcji powinien działać jako osobny proces.
+OUTBOX_DISPATCH_ON_COMMIT = os.getenv("OUTBOX_DISPATCH_ON_COMMIT", "1") == "1"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_CLAIM_SECONDS = float(os.getenv("OUTBOX_CLAIM_SECONDS", "60"))
+OUTBOX_SCHEDULE_RETRIES = os.getenv("OUTBOX_SCHEDULE_RETRIES", "0" if RUNNING_TESTS else "1") == "1"
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "2"))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "300"))
+
+# Liczniki otwartych websocketów powiadomień (cache). Wiadomości do
+# użytkowników offline nie trafiają do outboxa ani warstwy kanałów.
+# Wymaga współdzielonego cache (CACHE_REDIS_URL) – domyślnie wyłączone.
+NOTIFICATION_PRESENCE_ENABLED = os.getenv("NOTIFICATION_PRESENCE_ENABLED", "0") == "1"
+NOTIFICATION_PRESENCE_TTL = int(os.getenv("NOTIFICATION_PRESENCE_TTL", "86400"))
+
+# Maksymalna liczba zaległych powiadomień wysyłanych po ponownym połączeniu
+# (ws/notifications/<id>/?last_seen_id=<id>); resztę klient pobiera przez REST.
+NOTIFICATION_CATCH_UP_LIMIT = int(os.getenv("NOTIFICATION_CATCH_UP_LIMIT", "50"))
+
+# Co ile sekund zmienia się seed losowej części feedu (posts.feed) – w obrębie
+# okresu kolejne strony feedu użytkownika pokazują ten sam zestaw postów.
+FEED_DISCOVERY_SEED_ROTATION = int(os.getenv("FEED_DISCOVERY_SEED_ROTATION", "86400"))
+
+# Osie czasu obserwowanych postów (posts.timeline): wielkość paczki wpisów przy
+# rozsyłaniu nowego posta oraz liczba ostatnich postów dopisywanych po obserwacji.
+TIMELINE_FANOUT_CHUNK_SIZE = int(os.getenv("TIMELINE_FANOUT_CHUNK_SIZE", "1000"))
+TIMELINE_BACKFILL_LIMIT = int(os.getenv("TIMELINE_BACKFILL_LIMIT", "700"))
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -4,12 +4,27 @@ from rest_framework import status, viewsets
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.permissions import DjangoModelPermissionsOrAnonReadOnly, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import (
+    SAFE_METHODS,
+    DjangoModelPermissionsOrAnonReadOnly,
+    IsAuthenticated,
+    IsAuthenticatedOrReadOnly,
+)
 from rest_framework.response import Response
 from animals.models import Animal
+from common.compound import CompoundDocumentViewMixin
 from common.models import Follow
+from common.pagination import KeysetCursorPagination
 from users.models import Organization
-from .models import Post
+from .feed import (
+    FeedCursorPagination,
+    discovery_seed,
+    fetch_feed_posts,
+    sample_discovery_posts,
+    sort_feed_keys,
+    uses_cursor_pagination,
+)
+from .models import Post, TimelineEntry
 from .serializers import PostSerializer
 
 # posts/api_views.py
@@ -101,11 +116,18 @@ class FeedPagePagination(PageNumberPagination):
     page_size = 10
 
 
+class TimelineCursorPagination(KeysetCursorPagination):
+    """Kursor po wpisach osi czasu – ta sama kolejność co indeks ``idx_timeline_user_created``."""
+
+    ordering = ("-created_at", "-post_id")
+    page_size = 10
+
+
 @extend_schema(
     tags=["posts", "posts_organizations", "posts_animals"],
     description="API endpoint to list and create posts."
 )
-class PostViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
+class PostViewSet(StandardizedErrorResponseMixin, CompoundDocumentViewMixin, viewsets.ModelViewSet):
     """
     PostViewSet
     ===========
@@ -192,6 +214,8 @@ class PostViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            qs = PostSerializer.eager_load(qs, self.request)
         animal_id = self.request.query_params.get("animal-id")
         organization_id = self.request.query_params.get("organization-id")
         if animal_id:
@@ -200,6 +224,55 @@ class PostViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
             qs = qs.filter(organization_id=organization_id)
         return qs
 
+    def _followed_target_ids(self, user):
+        """ID obserwowanych zwierząt i organizacji z włączonymi powiadomieniami o postach."""
+        if not user.is_authenticated:
+            return [], []
+
+        animal_ct = ContentType.objects.get_for_model(Animal)
+        organization_ct = ContentType.objects.get_for_model(Organization)
+
+        followed_animal_ids = list(
+            Follow.objects.filter(
+                user=user,
+                target_type=animal_ct,
+                notification_preferences__posts=True,
+            ).values_list("target_id", flat=True)
+        )
+
+        followed_organization_ids = list(
+            Follow.objects.filter(
+                user=user,
+                target_type=organization_ct,
+                notification_preferences__posts=True,
+            ).values_list("target_id", flat=True)
+        )
+        return followed_animal_ids, followed_organization_ids
+
+    def _fetch_page_posts(self, post_ids):
+        return fetch_feed_posts(post_ids, PostSerializer.eager_load(Post.objects.all(), self.request))
+
+    def _paginated_feed_response(self, request, candidates):
+        """
+        Stronicuje kandydatów (klucze ``(id, created_at)`` albo queryset z
+        ``.only("id", "created_at")``) i dopiero dla bieżącej strony pobiera
+        pełne posty z relacjami. ``?pagination=cursor`` zamienia numery stron
+        na nieprzezroczysty kursor (``next``).
+        """
+        if uses_cursor_pagination(request):
+            paginator = FeedCursorPagination()
+            page = paginator.paginate_queryset(candidates, request, view=self)
+            serializer = self.get_serializer(self._fetch_page_posts([key.id for key in page]), many=True)
+            return self.attach_included(paginator.get_paginated_response(serializer.data), serializer.data)
+
+        page = self.paginate_queryset(candidates)
+        if page is not None:
+            serializer = self.get_serializer(self._fetch_page_posts([key.id for key in page]), many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(self._fetch_page_posts([key.id for key in candidates]), many=True)
+        return Response(serializer.data)
+
     @action(
         detail=False,
         methods=["get"],
@@ -212,58 +285,51 @@ class PostViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
         followed_ratio_limit = 700  
         random_ratio_limit = 300
 
-        animal_ct = ContentType.objects.get_for_model(Animal)
-        organization_ct = ContentType.objects.get_for_model(Organization)
-
-        followed_animal_ids = []
-        followed_organization_ids = []
-
-        if request.user.is_authenticated:
-            followed_animal_ids = list(
-                Follow.objects.filter(
-                    user=request.user,
-                    target_type=animal_ct,
-                    notification_preferences__posts=True,
-                ).values_list("target_id", flat=True)
-            )
-
-            followed_organization_ids = list(
-                Follow.objects.filter(
-                    user=request.user,
-                    target_type=organization_ct,
-                    notification_preferences__posts=True,
-                ).values_list("target_id", flat=True)
-            )
-
+        followed_animal_ids, followed_organization_ids = self._followed_target_ids(request.user)
         has_followed_entities = bool(followed_animal_ids or followed_organization_ids)
 
+        # kandydaci to same klucze (id, created_at) – pełne wiersze tylko dla bieżącej strony
         if not has_followed_entities:
-            queryset = list(Post.objects.order_by("-created_at")[:total_feed_limit])
+            keys = sort_feed_keys(
+                Post.objects.order_by("-created_at", "-id")
+                .values_list("id", "created_at")[:total_feed_limit]
+            )
         else:
-            followed_posts = list(
-                Post.objects.filter(
-                    Q(animal_id__in=followed_animal_ids)
-                    | Q(organization_id__in=followed_organization_ids)
-                )
-                .order_by("-created_at")[:followed_ratio_limit]
+            # obserwowane posty z osi czasu użytkownika (posts.timeline) – odczyt zakresu indeksu
+            followed_keys = list(
+                TimelineEntry.objects.filter(user=request.user)
+                .order_by("-created_at", "-post_id")
+                .values_list("post_id", "created_at")[:followed_ratio_limit]
             )
-            random_posts = list(
+            random_keys = sample_discovery_posts(
                 Post.objects.exclude(
                     Q(animal_id__in=followed_animal_ids)
                     | Q(organization_id__in=followed_organization_ids)
-                )
-                .order_by("?")[:random_ratio_limit]
+                ).values_list("id", "created_at"),
+                seed=discovery_seed(request),
+                limit=random_ratio_limit,
             )
-            queryset = [*followed_posts, *random_posts]
-            queryset.sort(key=lambda post: post.created_at, reverse=True)
+            keys = sort_feed_keys([*followed_keys, *random_keys])
 
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        return self._paginated_feed_response(request, keys)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="timeline",
+        permission_classes=[IsAuthenticated],
+        pagination_class=TimelineCursorPagination,
+    )
+    def timeline(self, request):
+        """
+        Posty obserwowanych zwierząt i organizacji z osi czasu użytkownika
+        (``post_timelines``), stronicowane kursorem: ``GET /posts/timeline/?cursor=…``.
+        """
+        entries = TimelineEntry.objects.filter(user=request.user).only("post_id", "created_at")
+
+        page = self.paginate_queryset(entries)
+        serializer = self.get_serializer(self._fetch_page_posts([entry.post_id for entry in page]), many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(
         detail=False,
@@ -273,41 +339,14 @@ class PostViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet):
         pagination_class=FeedPagePagination,
     )
     def feed_test(self, request):
-        animal_ct = ContentType.objects.get_for_model(Animal)
-        organization_ct = ContentType.objects.get_for_model(Organization)
-
-        followed_animal_ids = []
-        followed_organization_ids = []
-
-        if request.user.is_authenticated:
-            followed_animal_ids = list(
-                Follow.objects.filter(
-                    user=request.user,
-                    target_type=animal_ct,
-                    notification_preferences__posts=True,
-                ).values_list("target_id", flat=True)
-            )
-
-            followed_organization_ids = list(
-                Follow.objects.filter(
-                    user=request.user,
-                    target_type=organization_ct,
-                    notification_preferences__posts=True,
-                ).values_list("target_id", flat=True)
-            )
+        followed_animal_ids, followed_organization_ids = self._followed_target_ids(request.user)
 
         queryset = Post.objects.filter(
             Q(animal_id__in=followed_animal_ids)
             | Q(organization_id__in=followed_organization_ids)
-        ).order_by("-created_at")
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        ).order_by("-created_at", "-id").only("id", "created_at")
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._paginated_feed_response(request, queryset)
 
     def perform_destroy(self, instance):
         user = self.request.user
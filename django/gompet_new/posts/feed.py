@@ -0,0 +1,147 @@
+"""Wybór postów do feedu: losowanie „do odkrycia” i stronicowanie po kluczach.
+
+Losowanie odbywa się bez ``ORDER BY random()``: każdy post ma stały, zindeksowany ``random_key`` z przedziału ``[0, 1)``.
+Próbka to kolejne posty od punktu startowego (``seed``) po indeksie, z
+zawinięciem na początek zakresu – koszt zależy od wielkości próbki, a nie
+od liczby postów. Seed wyliczany jest deterministycznie z użytkownika i
+bieżącego okresu rotacji, więc kolejne strony feedu widzą ten sam zestaw,
+a co ``FEED_DISCOVERY_SEED_ROTATION`` sekund zestaw się zmienia.
+
+Kandydaci do feedu to same klucze ``(id, created_at)``; pełne wiersze (z
+relacjami) pobierane są tylko dla bieżącej strony – ``fetch_feed_posts``.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import time
+from typing import NamedTuple, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from common.pagination import (
+    CURSOR_PAGINATION,
+    PAGINATION_QUERY_PARAM,
+    KeysetCursorPagination,
+    uses_cursor_pagination,
+)
+
+from .models import Post
+from .serializers import PostSerializer
+
+SEED_QUERY_PARAM = "seed"
+
+
+class FeedKey(NamedTuple):
+    id: int
+    created_at: dt.datetime
+
+
+def _rotation() -> int:
+    return max(int(getattr(settings, "FEED_DISCOVERY_SEED_ROTATION", 86400)), 1)
+
+
+def discovery_seed(request, now: float | None = None) -> float:
+    """Seed próbki w ``[0, 1)`` – stały dla użytkownika w obrębie okresu rotacji.
+
+    Anonimowy klient może przekazać własny ``?seed=``, żeby zachować ten sam
+    zestaw między stronami; bez niego wszyscy anonimowi dzielą seed okresu.
+    """
+
+    if request.user.is_authenticated:
+        identity = f"user:{request.user.pk}"
+    else:
+        identity = f"anon:{request.query_params.get(SEED_QUERY_PARAM, '')}"
+
+    period = int((time.time() if now is None else now) // _rotation())
+    digest = hashlib.blake2b(f"{identity}:{period}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+def sample_discovery_posts(queryset, seed: float, limit: int) -> list:
+    """Zwraca do ``limit`` postów z ``queryset`` zaczynając od ``random_key >= seed``.
+
+    Dwa zapytania po indeksie ``random_key`` (drugie tylko przy zawinięciu).
+    """
+
+    if limit <= 0:
+        return []
+
+    posts = list(queryset.filter(random_key__gte=seed).order_by("random_key", "id")[:limit])
+    missing = limit - len(posts)
+    if missing > 0:
+        posts.extend(queryset.filter(random_key__lt=seed).order_by("random_key", "id")[:missing])
+    return posts
+
+
+def sort_feed_keys(keys: Sequence[tuple[int, dt.datetime]]) -> list[FeedKey]:
+    """Klucze od najnowszego – ta sama kolejność co ``FeedCursorPagination.ordering``."""
+
+    return sorted(
+        (FeedKey(*key) for key in keys),
+        key=lambda key: (key.created_at, key.id),
+        reverse=True,
+    )
+
+
+def fetch_feed_posts(post_ids: Sequence[int], queryset: QuerySet | None = None) -> list[Post]:
+    """Pełne posty jednej strony, w kolejności ``post_ids``.
+
+    ``queryset`` niesie plan relacji (``PostSerializer.eager_load``); domyślnie
+    plan dla pełnej reprezentacji posta.
+    """
+
+    if not post_ids:
+        return []
+    if queryset is None:
+        queryset = PostSerializer.eager_load(Post.objects.all())
+    posts = queryset.filter(pk__in=post_ids)
+    by_id = {post.pk: post for post in posts}
+    return [by_id[post_id] for post_id in post_ids if post_id in by_id]
+
+
+class FeedCursorPagination(KeysetCursorPagination):
+    """Nieprzezroczysty kursor feedu po ``(created_at, id)``.
+
+    Przyjmuje queryset (stronicowany w bazie, jak ``KeysetCursorPagination``)
+    albo posortowaną listę ``FeedKey`` – wtedy kursor tnie listę kandydatów w
+    pamięci. Lista kandydatów jest deterministyczna (oś czasu + seed próbki),
+    więc kolejne strony nie powtarzają ani nie gubią postów.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 10
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if isinstance(queryset, QuerySet):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        keys = list(queryset)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, post_id = self.decode_cursor(Post.objects.all(), cursor)
+            keys = [key for key in keys if (key.created_at, key.id) < (created_at, post_id)]
+
+        items = keys[: self.page_size_value + 1]
+        self.has_next = len(items) > self.page_size_value
+        self.page = items[: self.page_size_value]
+        return self.page
+
+
+__all__ = [
+    "CURSOR_PAGINATION",
+    "FeedCursorPagination",
+    "FeedKey",
+    "PAGINATION_QUERY_PARAM",
+    "SEED_QUERY_PARAM",
+    "discovery_seed",
+    "fetch_feed_posts",
+    "sample_discovery_posts",
+    "sort_feed_keys",
+    "uses_cursor_pagination",
+]
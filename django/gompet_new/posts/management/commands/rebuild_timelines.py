@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts.timeline import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user post timelines from current follows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="user_ids",
+            type=int,
+            action="append",
+            help="Rebuild only the given user id (can be repeated).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Number of most recent posts copied per follow (defaults to TIMELINE_BACKFILL_LIMIT).",
+        )
+
+    def handle(self, *args, **options):
+        processed = rebuild_timelines(options.get("user_ids"), limit=options.get("limit"))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt timelines from {processed} follow(s)."))
@@ -0,0 +1,29 @@
+import random
+
+from django.db import migrations, models
+
+
+def populate_random_keys(apps, schema_editor):
+    # domyślna wartość z AddField jest jedna dla wszystkich istniejących wierszy
+    Post = apps.get_model("posts", "Post")
+    if schema_editor.connection.vendor == "postgresql":
+        Post.objects.update(random_key=models.Func(function="RANDOM", output_field=models.FloatField()))
+        return
+    for post in Post.objects.only("pk").iterator():
+        Post.objects.filter(pk=post.pk).update(random_key=random.random())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0007_alter_post_author"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="random_key",
+            field=models.FloatField(db_index=True, default=random.random, editable=False),
+        ),
+        migrations.RunPython(populate_random_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_timelines(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Follow = apps.get_model("common", "Follow")
+    Post = apps.get_model("posts", "Post")
+    TimelineEntry = apps.get_model("posts", "TimelineEntry")
+
+    post_fields = {}
+    for app_label, model, field in (("animals", "animal", "animal_id"), ("users", "organization", "organization_id")):
+        content_type = ContentType.objects.filter(app_label=app_label, model=model).first()
+        if content_type is not None:
+            post_fields[content_type.pk] = field
+    if not post_fields:
+        return
+
+    limit = max(0, int(getattr(settings, "TIMELINE_BACKFILL_LIMIT", 700)))
+    follows = Follow.objects.filter(
+        target_type_id__in=list(post_fields),
+        notification_preferences__posts=True,
+    ).values_list("user_id", "target_type_id", "target_id")
+    for user_id, target_type_id, target_id in follows.iterator(chunk_size=1000):
+        posts = (
+            Post.objects.filter(**{post_fields[target_type_id]: target_id})
+            .order_by("-created_at", "-id")
+            .values_list("id", "created_at")[:limit]
+        )
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=user_id, post_id=post_id, created_at=created_at)
+                for post_id, created_at in posts
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("common", "0015_follow_user_created_index"),
+        ("posts", "0009_timelineentry"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import random
+
 from django.db import models, router, transaction
 
 # Create your models here.
@@ -58,6 +60,8 @@ class Post(TimeStampedModel):
         on_delete=models.CASCADE,
         related_name="posts"
     )
+    # stały klucz losowy – próbkowanie feedu po indeksie zamiast ORDER BY random()
+    random_key = models.FloatField(default=random.random, editable=False, db_index=True)
 
     # powiązania generic
     comments = GenericRelation(
@@ -117,3 +121,43 @@ class Post(TimeStampedModel):
             self.comments.using(db_alias).all().delete()
             self.reactions.using(db_alias).all().delete()
             return super().delete(using=db_alias, keep_parents=keep_parents)
+
+
+class TimelineEntry(models.Model):
+    """
+    Wpis osobistej osi czasu (fan-out on write):
+    • jeden wiersz na parę (użytkownik, post obserwowanego zwierzęcia/organizacji),
+    • ``created_at`` skopiowane z posta – feed to odczyt zakresu indeksu
+      ``(user, created_at, post)`` bez złączeń z ``follows``.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    created_at = models.DateTimeField(editable=False)
+
+    class Meta:
+        db_table = "post_timelines"
+        ordering = ("-created_at", "-post_id")
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-post"],
+                name="idx_timeline_user_created",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "post"),
+                name="uniq_timeline_user_post",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Timeline of {self.user_id}: post#{self.post_id}"
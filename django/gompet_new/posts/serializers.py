@@ -1,8 +1,23 @@
 from urllib import request
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Post
 
-from users.serializers import UserSerializer, OrganizationSerializer
+from animals.serializers import AnimalSummarySerializer
+from common.compound import CompoundDocumentListSerializer, CompoundDocumentSerializerMixin, IncludedRelation
+from common.models import Comment, Reaction
+from common.reaction_summary import ReactionSummarySerializerMixin
+from common.sparse_fields import FieldPlan, SparseFieldsetsMixin
+from users.serializers import (
+    OrganizationSerializer,
+    OrganizationSummarySerializer,
+    UserSerializer,
+    UserSummarySerializer,
+)
+
+# ``?embed=compact`` osadza skrócone ``author``/``organization_info`` (bez adresu i gatunków).
+EMBED_QUERY_PARAM = "embed"
+COMPACT_EMBED = "compact"
 
 
 class Base64ImageField(serializers.ImageField):
@@ -20,13 +35,47 @@ class Base64ImageField(serializers.ImageField):
             data = ContentFile(base64.b64decode(imgstr), name=file_name)
         return super().to_internal_value(data)
     
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(
+    CompoundDocumentSerializerMixin,
+    SparseFieldsetsMixin,
+    ReactionSummarySerializerMixin,
+    serializers.ModelSerializer,
+):
     """Serializer for the Post model."""
 
+    # ``?embed=included`` – autor, organizacja i zwierzę raz na stronę w ``included``
+    included_relations = {
+        "author": IncludedRelation("users", "author", UserSerializer),
+        "organization_info": IncludedRelation("organizations", "organization", OrganizationSerializer),
+        "animal": IncludedRelation("animals", "animal", AnimalSummarySerializer),
+    }
+
+    sparse_field_plans = {
+        "author": FieldPlan(columns=("author",), select_related=("author",)),
+        "animal": FieldPlan(columns=("animal",), select_related=("animal",)),
+        "animal_name": FieldPlan(columns=("animal",), select_related=("animal",)),
+        "organization_name": FieldPlan(columns=("organization",), select_related=("organization",)),
+        # gatunki adresu dokłada ``eager_load`` tylko dla pełnej reprezentacji
+        "organization_info": FieldPlan(columns=("organization",), select_related=("organization__address",)),
+        "comments": FieldPlan(
+            prefetch_related=(
+                Prefetch("comments", queryset=Comment.objects.only("id", "content_type_id", "object_id")),
+            ),
+        ),
+        "reactions": FieldPlan(
+            prefetch_related=(
+                Prefetch("reactions", queryset=Reaction.objects.only("id", "reactable_type_id", "reactable_id")),
+            ),
+        ),
+        "reaction_summary": FieldPlan(),
+    }
+
     animal_name = serializers.SerializerMethodField()
     organization_name = serializers.SerializerMethodField()
     comments = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     reactions = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    # ``?reactions-version=2`` zastępuje ``reactions`` zbiorczym podsumowaniem.
+    reaction_summary = serializers.SerializerMethodField()
     
     image = Base64ImageField(required=False, allow_null=True)
 
@@ -51,9 +100,44 @@ class PostSerializer(serializers.ModelSerializer):
             "image",
             "comments",
             "reactions",
+            "reaction_summary",
         )
         read_only_fields = ("author",)
+        list_serializer_class = CompoundDocumentListSerializer
+
+    @staticmethod
+    def uses_compact_embed(request) -> bool:
+        return request is not None and request.query_params.get(EMBED_QUERY_PARAM) == COMPACT_EMBED
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.uses_compact_embed(self.context.get("request")):
+            if "author" in fields:
+                fields["author"] = UserSummarySerializer(read_only=True)
+            if "organization_info" in fields:
+                fields["organization_info"] = OrganizationSummarySerializer(source="organization", read_only=True)
+        return fields
+
+    @classmethod
+    def eager_load(cls, queryset, request=None):
+        """
+        Plan zapytań dla listy postów – stała liczba zapytań niezależnie od
+        rozmiaru strony: jeden SELECT z JOIN-ami (autor, zwierzę, organizacja,
+        adres) oraz po jednym prefetchu na komentarze, reakcje i gatunki adresu.
+        Relacje dokładane są tylko dla pól wybranych przez ``?fields=``/``?omit=``;
+        przy ``?embed=compact`` gatunki nie są potrzebne, a przy
+        ``?reactions-version=2`` reakcje liczy ``CompoundDocumentListSerializer``.
+        """
+        hidden = (
+            "reactions"
+            if ReactionSummarySerializerMixin.uses_reaction_summary_for(request)
+            else "reaction_summary"
+        )
+        names = [name for name in cls.selected_field_names(request) if name != hidden]
+        queryset = cls.sparse_queryset(queryset, request, names)
+        if "organization_info" in names and not cls.uses_compact_embed(request):
+            queryset = queryset.prefetch_related("organization__address__species")
+        return queryset
 
     def get_animal_name(self, obj):
         # Pobiera nazwę zwierzęcia z powiązanego modelu Animal
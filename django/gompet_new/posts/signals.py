@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.models import Follow
+
+from .models import Post
+from .timeline import remove_follow, schedule_fan_out, schedule_follow_sync
+
+
+@receiver(post_save, sender=Post)
+def add_post_to_timelines(sender, instance: Post, created: bool, **kwargs) -> None:
+    if not created:
+        return
+
+    schedule_fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def sync_follow_timeline(sender, instance: Follow, created: bool, **kwargs) -> None:
+    # ponowny zapis obserwacji zwykle oznacza zmianę preferencji (np. ``posts``)
+    schedule_follow_sync(instance, created)
+
+
+@receiver(post_delete, sender=Follow)
+def clear_follow_timeline(sender, instance: Follow, **kwargs) -> None:
+    remove_follow(instance)
@@ -1,16 +1,20 @@
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from unittest.mock import patch
 
 from animals.models import Animal, AnimalStatus, Gender, Size
-from common.models import Comment, Follow
+from common.models import Comment, Follow, Reaction, ReactionType
 
 from users.models import Organization, OrganizationType
 
-from .models import Post
+from .feed import discovery_seed, sample_discovery_posts
+from .models import Post, TimelineEntry
+from .timeline import fan_out_post
 
 
 class PostDeletionTests(TestCase):
@@ -128,6 +132,7 @@ class PostOwnershipAPITests(APITestCase):
         self.assertNotEqual(self.post.content, "Hacked content")
 
 
+@override_settings(BACKGROUND_TASKS_ASYNC=False)
 class PostFeedAPITests(APITestCase):
     def setUp(self):
         self.viewer = get_user_model().objects.create_user(
@@ -175,26 +180,28 @@ class PostFeedAPITests(APITestCase):
             organization=self.organization,
         )
 
-        Follow.objects.create(
-            user=self.viewer,
-            target_type=ContentType.objects.get_for_model(Animal),
-            target_id=self.animal.id,
-            notification_preferences={
-                "posts": True,
-                "status_changes": True,
-                "comments": False,
-            },
-        )
-        Follow.objects.create(
-            user=self.viewer,
-            target_type=ContentType.objects.get_for_model(Organization),
-            target_id=self.organization.id,
-            notification_preferences={
-                "posts": True,
-                "status_changes": True,
-                "comments": False,
-            },
-        )
+        # osie czasu uzupełniane są po commicie
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(
+                user=self.viewer,
+                target_type=ContentType.objects.get_for_model(Animal),
+                target_id=self.animal.id,
+                notification_preferences={
+                    "posts": True,
+                    "status_changes": True,
+                    "comments": False,
+                },
+            )
+            Follow.objects.create(
+                user=self.viewer,
+                target_type=ContentType.objects.get_for_model(Organization),
+                target_id=self.organization.id,
+                notification_preferences={
+                    "posts": True,
+                    "status_changes": True,
+                    "comments": False,
+                },
+            )
 
     def _extract_results(self, response):
         data = response.data
@@ -257,12 +264,13 @@ class PostFeedAPITests(APITestCase):
     def test_feed_each_page_keeps_8_followed_and_2_recommended_posts(self):
         self.client.force_authenticate(user=self.viewer)
 
-        for index in range(14):
-            Post.objects.create(
-                content=f"Followed post {index}",
-                author=self.owner,
-                animal=self.animal,
-            )
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(14):
+                Post.objects.create(
+                    content=f"Followed post {index}",
+                    author=self.owner,
+                    animal=self.animal,
+                )
 
         recommended_posts = self._create_unfollowed_posts(4, "outsider-multi")
 
@@ -294,6 +302,61 @@ class PostFeedAPITests(APITestCase):
         self.assertIn(self.animal_post.id, returned_ids)
         self.assertIn(self.org_post.id, returned_ids)
 
+    def test_feed_cursor_pagination_walks_all_candidates_once(self):
+        self.client.force_authenticate(user=self.viewer)
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(12):
+                Post.objects.create(
+                    content=f"Followed cursor post {index}",
+                    author=self.owner,
+                    animal=self.animal,
+                )
+        recommended_posts = self._create_unfollowed_posts(3, "outsider-cursor")
+
+        seen = []
+        url = reverse("post-feed")
+        params = {"pagination": "cursor"}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            seen.extend(item["id"] for item in response.data["results"])
+            url, params = response.data["next"], None
+
+        expected = Post.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        self.assertEqual(len(seen), 17)
+        self.assertEqual(seen, list(expected))
+        self.assertTrue({post.id for post in recommended_posts} <= set(seen))
+
+    def test_feed_rejects_invalid_cursor(self):
+        response = self.client.get(reverse("post-feed"), {"pagination": "cursor", "cursor": "???"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_discovery_sample_wraps_around_seed(self):
+        posts = self._create_unfollowed_posts(4, "outsider-sample")
+        for post, key in zip(posts, [0.1, 0.4, 0.6, 0.9]):
+            Post.objects.filter(pk=post.pk).update(random_key=key)
+        queryset = Post.objects.filter(pk__in=[post.pk for post in posts])
+
+        sampled = sample_discovery_posts(queryset, seed=0.5, limit=3)
+
+        self.assertEqual(
+            [post.pk for post in sampled],
+            [posts[2].pk, posts[3].pk, posts[0].pk],
+        )
+
+    def test_discovery_seed_is_stable_per_user_within_rotation(self):
+        request = type("Request", (), {"user": self.viewer, "query_params": {}})()
+        other = type("Request", (), {"user": self.owner, "query_params": {}})()
+
+        with self.settings(FEED_DISCOVERY_SEED_ROTATION=3600):
+            seed = discovery_seed(request, now=7200)
+            self.assertEqual(seed, discovery_seed(request, now=10799))
+            self.assertNotEqual(seed, discovery_seed(request, now=10800))
+            self.assertNotEqual(seed, discovery_seed(other, now=7200))
+        self.assertTrue(0 <= seed < 1)
+
 
 class PostErrorResponseFormatTests(APITestCase):
     def setUp(self):
@@ -404,3 +467,315 @@ class PostErrorResponseFormatTests(APITestCase):
                 "errors": {},
             },
         )
+
+
+class PostReactionSummaryTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="summary@example.com",
+            password="password123",
+        )
+        self.other = get_user_model().objects.create_user(
+            email="summary-other@example.com",
+            password="password123",
+        )
+        self.animal = Animal.objects.create(
+            name="Summary",
+            species="Dog",
+            gender=Gender.MALE,
+            size=Size.SMALL,
+            status=AnimalStatus.AVAILABLE,
+            owner=self.user,
+        )
+        self.post = Post.objects.create(content="Summary post", author=self.user, animal=self.animal)
+        post_ct = ContentType.objects.get_for_model(Post)
+        Reaction.objects.create(
+            user=self.user, reaction_type=ReactionType.LOVE, reactable_type=post_ct, reactable_id=self.post.id
+        )
+        Reaction.objects.create(
+            user=self.other, reaction_type=ReactionType.LIKE, reactable_type=post_ct, reactable_id=self.post.id
+        )
+
+    def test_default_version_keeps_reaction_ids(self):
+        response = self.client.get(reverse("post-list"))
+
+        item = response.data["results"][0]
+        self.assertIn("reactions", item)
+        self.assertNotIn("reaction_summary", item)
+
+    def test_version_2_returns_counts_and_my_reaction(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse("post-list"), {"reactions-version": "2"})
+
+        self.assertEqual(response.status_code, 200)
+        item = response.data["results"][0]
+        self.assertNotIn("reactions", item)
+        summary = item["reaction_summary"]
+        self.assertEqual(summary["total"], 2)
+        self.assertEqual(summary["counts"][ReactionType.LIKE], 1)
+        self.assertEqual(summary["counts"][ReactionType.LOVE], 1)
+        self.assertEqual(summary["my_reaction"], ReactionType.LOVE)
+
+
+@override_settings(BACKGROUND_TASKS_ASYNC=False)
+class PostTimelineTests(APITestCase):
+    def setUp(self):
+        self.viewer = get_user_model().objects.create_user(
+            email="timeline-viewer@example.com",
+            password="password123",
+        )
+        self.owner = get_user_model().objects.create_user(
+            email="timeline-owner@example.com",
+            password="password123",
+        )
+        self.animal = Animal.objects.create(
+            name="Timeline",
+            species="Dog",
+            gender=Gender.MALE,
+            size=Size.SMALL,
+            status=AnimalStatus.AVAILABLE,
+            owner=self.owner,
+        )
+        self.old_post = Post.objects.create(content="Before follow", author=self.owner, animal=self.animal)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.follow = Follow.objects.create(
+                user=self.viewer,
+                target_type=ContentType.objects.get_for_model(Animal),
+                target_id=self.animal.id,
+            )
+
+    def _timeline_post_ids(self):
+        return list(TimelineEntry.objects.filter(user=self.viewer).values_list("post_id", flat=True))
+
+    def test_follow_backfills_existing_posts(self):
+        self.assertEqual(self._timeline_post_ids(), [self.old_post.id])
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            new_post = Post.objects.create(content="After follow", author=self.owner, animal=self.animal)
+            # rozesłanie dopiero po commicie
+            self.assertEqual(self._timeline_post_ids(), [self.old_post.id])
+
+        self.assertTrue(callbacks)
+
+        self.assertEqual(self._timeline_post_ids(), [new_post.id, self.old_post.id])
+        self.assertFalse(TimelineEntry.objects.filter(user=self.owner).exists())
+
+    def test_unfollow_and_disabled_posts_preference_clear_timeline(self):
+        self.follow.notification_preferences = {**self.follow.notification_preferences, "posts": False}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.follow.save()
+        self.assertEqual(self._timeline_post_ids(), [])
+
+        self.follow.notification_preferences = {**self.follow.notification_preferences, "posts": True}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.follow.save()
+        self.assertEqual(self._timeline_post_ids(), [self.old_post.id])
+
+        self.follow.delete()
+        self.assertEqual(self._timeline_post_ids(), [])
+
+    @patch("posts.timeline.backfill_follow")
+    def test_resaving_follow_does_not_backfill_again(self, mocked_backfill):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.follow.save()
+
+        mocked_backfill.assert_not_called()
+        self.assertEqual(self._timeline_post_ids(), [self.old_post.id])
+
+    def _create_organization_follow(self, user):
+        organization = Organization.objects.create(
+            type=OrganizationType.SHELTER,
+            name="Timeline Shelter",
+            email="timeline-shelter@example.com",
+            user=self.owner,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            follow = Follow.objects.create(
+                user=user,
+                target_type=ContentType.objects.get_for_model(Organization),
+                target_id=organization.id,
+            )
+        return organization, follow
+
+    def test_post_with_both_targets_reaches_followers_of_each_once(self):
+        org_follower = get_user_model().objects.create_user(
+            email="timeline-org-follower@example.com",
+            password="password123",
+        )
+        organization, _ = self._create_organization_follow(org_follower)
+        Follow.objects.create(
+            user=self.viewer,
+            target_type=ContentType.objects.get_for_model(Organization),
+            target_id=organization.id,
+        )
+        # ograniczenie ``exactly_one_parent_fk`` nie pozwala zapisać obu celów –
+        # fan-out dostaje taki post w pamięci
+        self.old_post.organization_id = organization.id
+
+        fan_out_post(self.old_post)
+
+        self.assertEqual(
+            sorted(TimelineEntry.objects.filter(post=self.old_post).values_list("user_id", flat=True)),
+            sorted([self.viewer.id, org_follower.id]),
+        )
+
+    def test_unfollow_keeps_posts_of_other_followed_targets(self):
+        organization, org_follow = self._create_organization_follow(self.viewer)
+        with self.captureOnCommitCallbacks(execute=True):
+            org_post = Post.objects.create(content="Shelter news", author=self.owner, organization=organization)
+        self.assertEqual(sorted(self._timeline_post_ids()), sorted([self.old_post.id, org_post.id]))
+
+        self.follow.delete()
+        self.assertEqual(self._timeline_post_ids(), [org_post.id])
+
+        org_follow.delete()
+        self.assertEqual(self._timeline_post_ids(), [])
+
+    def test_timeline_endpoint_uses_cursor_pagination(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            posts = [
+                Post.objects.create(content=f"Timeline {index}", author=self.owner, animal=self.animal)
+                for index in range(11)
+            ]
+        self.client.force_authenticate(user=self.viewer)
+
+        first = self.client.get(reverse("post-timeline"))
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(
+            [item["id"] for item in first.data["results"]],
+            [post.id for post in reversed(posts[1:])],
+        )
+        self.assertEqual(
+            [item["id"] for item in second.data["results"]],
+            [posts[0].id, self.old_post.id],
+        )
+        self.assertIsNone(second.data["next"])
+
+    def test_timeline_requires_authentication(self):
+        response = self.client.get(reverse("post-timeline"))
+
+        self.assertEqual(response.status_code, 401)
+
+
+class PostListQueryBudgetTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="budget@example.com",
+            password="password123",
+            first_name="Budget",
+            last_name="User",
+        )
+        self.animal = Animal.objects.create(
+            name="Budget",
+            species="Dog",
+            gender=Gender.MALE,
+            size=Size.SMALL,
+            status=AnimalStatus.AVAILABLE,
+            owner=self.user,
+        )
+        self.organization = Organization.objects.create(
+            type=OrganizationType.SHELTER,
+            name="Budget Shelter",
+            email="budget-shelter@example.com",
+            user=self.user,
+        )
+
+    def _create_posts(self, count):
+        post_ct = ContentType.objects.get_for_model(Post)
+        for index in range(count):
+            post = Post.objects.create(
+                content=f"Budget post {index}",
+                author=self.user,
+                **({"animal": self.animal} if index % 2 else {"organization": self.organization}),
+            )
+            Comment.objects.create(
+                user=self.user, body="Budget comment", content_type=post_ct, object_id=post.id
+            )
+            Reaction.objects.create(
+                user=self.user, reaction_type=ReactionType.LIKE, reactable_type=post_ct, reactable_id=post.id
+            )
+
+    def _count_queries(self, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("post-list"), params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        self._create_posts(2)
+        self._count_queries()
+        small, _ = self._count_queries()
+
+        self._create_posts(8)
+        large, response = self._count_queries()
+
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(small, large)
+
+    def test_nested_organization_omits_followers_count(self):
+        self._create_posts(2)
+
+        _, response = self._count_queries()
+
+        organization_item = next(
+            item for item in response.data["results"] if item["organization"] == self.organization.id
+        )
+        self.assertNotIn("followers_count", organization_item["organization_info"])
+
+    def test_compact_embed_skips_address_and_private_author_fields(self):
+        self._create_posts(2)
+
+        _, response = self._count_queries({"embed": "compact"})
+
+        organization_item = next(
+            item for item in response.data["results"] if item["organization"] == self.organization.id
+        )
+        self.assertEqual(
+            set(organization_item["organization_info"]),
+            {"id", "type", "name", "image", "rating", "city"},
+        )
+        self.assertNotIn("email", organization_item["author"])
+        self.assertEqual(organization_item["author"]["id"], self.user.id)
+
+    def test_sparse_fieldset_prunes_fields_and_related_queries(self):
+        self._create_posts(3)
+        full, _ = self._count_queries()
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("post-list"), {"fields": "id,content,author"})
+
+        self.assertEqual(set(response.data["results"][0]), {"id", "content", "author"})
+        self.assertLess(len(context.captured_queries), full)
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertNotIn('"comments"', sql)
+        self.assertNotIn('"posts"."image"', sql)
+
+    def test_omit_removes_fields(self):
+        self._create_posts(1)
+
+        _, response = self._count_queries({"omit": "comments,reactions,organization_info"})
+
+        item = response.data["results"][0]
+        self.assertNotIn("comments", item)
+        self.assertNotIn("reactions", item)
+        self.assertNotIn("organization_info", item)
+        self.assertIn("content", item)
+
+    def test_included_embed_side_loads_each_related_object_once(self):
+        self._create_posts(4)
+
+        _, response = self._count_queries({"embed": "included"})
+
+        results = response.data["results"]
+        included = response.data["included"]
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(item["author"] == self.user.id for item in results))
+        self.assertTrue(all("organization_info" not in item for item in results))
+        self.assertEqual(list(included["users"]), [self.user.id])
+        self.assertEqual(list(included["organizations"]), [self.organization.id])
+        self.assertEqual(list(included["animals"]), [self.animal.id])
+        self.assertEqual(included["organizations"][self.organization.id]["name"], "Budget Shelter")
@@ -0,0 +1,230 @@
+"""Osie czasu użytkowników budowane przy zapisie (fan-out on write).
+
+Nowy post zwierzęcia/organizacji trafia od razu do ``post_timelines`` każdego
+obserwującego (``notification_preferences.posts``) – przy poście z oboma
+celami do sumy obserwujących zwierzę i organizację – a nowa obserwacja
+uzupełnia oś ostatnimi postami celu. Koniec obserwacji usuwa tylko posty,
+których nie obejmuje inna obserwacja użytkownika. Odczyt feedu obserwowanych to wtedy
+zakres indeksu ``(user, created_at, post)``. Rozesłanie i uzupełnianie
+uruchamiane są po commicie w wątku w tle (``common.background``), więc
+wycofany zapis nic nie rozsyła, a żądanie nie czeka na tysiące wstawień.
+Oś jest przez to uzupełniana z niewielkim opóźnieniem. Osie sprzed
+wprowadzenia tabeli uzupełnia migracja ``0010_backfill_timelines``.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from animals.models import Animal
+from common.background import run_in_background
+from common.models import Follow
+from users.models import Organization
+
+from .models import Post, TimelineEntry
+
+
+def _chunk_size() -> int:
+    return max(1, int(getattr(settings, "TIMELINE_FANOUT_CHUNK_SIZE", 1000)))
+
+
+def _backfill_limit() -> int:
+    return max(0, int(getattr(settings, "TIMELINE_BACKFILL_LIMIT", 700)))
+
+
+def _post_targets(post: Post) -> list[tuple[type, int]]:
+    targets = []
+    if post.animal_id:
+        targets.append((Animal, post.animal_id))
+    if post.organization_id:
+        targets.append((Organization, post.organization_id))
+    return targets
+
+
+def _target_post_filter(follow: Follow) -> dict[str, int] | None:
+    # ContentType z cache managera – bez zapytania o ``follow.target_type``
+    model = ContentType.objects.get_for_id(follow.target_type_id).model_class()
+    if model is Animal:
+        return {"animal_id": follow.target_id}
+    if model is Organization:
+        return {"organization_id": follow.target_id}
+    return None
+
+
+def _insert_entries(entries: Iterable[TimelineEntry]) -> int:
+    rows = list(entries)
+    if rows:
+        TimelineEntry.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def fan_out_post(post_or_id: Post | int) -> int:
+    """Dodaje post do osi czasu obserwujących jego zwierzę/organizację."""
+
+    if isinstance(post_or_id, Post):
+        post = post_or_id
+    else:
+        post = Post.objects.filter(pk=post_or_id).first()
+        if post is None:
+            return 0
+
+    targets = _post_targets(post)
+    if not targets:
+        return 0
+
+    follows_target = Q()
+    for model, target_id in targets:
+        follows_target |= Q(target_type=ContentType.objects.get_for_model(model), target_id=target_id)
+    # obserwujący zwierzę i jego organizację dostają post raz
+    follower_ids = (
+        Follow.objects.filter(follows_target, notification_preferences__posts=True)
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+
+    def flush(user_ids: list[int]) -> int:
+        return _insert_entries(
+            TimelineEntry(user_id=user_id, post_id=post.pk, created_at=post.created_at)
+            for user_id in user_ids
+        )
+
+    chunk_size = _chunk_size()
+    written = 0
+    chunk: list[int] = []
+    for user_id in follower_ids.iterator(chunk_size=chunk_size):
+        chunk.append(user_id)
+        if len(chunk) >= chunk_size:
+            written += flush(chunk)
+            chunk = []
+    written += flush(chunk)
+    return written
+
+
+def backfill_follow(follow: Follow, limit: int | None = None) -> int:
+    """Uzupełnia oś obserwującego ostatnimi ``limit`` postami obserwowanego celu."""
+
+    post_filter = _target_post_filter(follow)
+    if post_filter is None or not follow.notification_preferences.get("posts", False):
+        return 0
+
+    limit = _backfill_limit() if limit is None else limit
+    posts = (
+        Post.objects.filter(**post_filter)
+        .order_by("-created_at", "-id")
+        .values_list("id", "created_at")[:limit]
+    )
+    return _insert_entries(
+        TimelineEntry(user_id=follow.user_id, post_id=post_id, created_at=created_at)
+        for post_id, created_at in posts
+    )
+
+
+def _follow_entries(follow: Follow):
+    """Wpisy osi pochodzące wyłącznie z tej obserwacji.
+
+    Post zwierzęcia organizacji ma oba cele – pomija wpisy, które nadal
+    obejmuje inna obserwacja użytkownika z włączonym ``posts``.
+    """
+
+    post_filter = _target_post_filter(follow)
+    if post_filter is None:
+        return TimelineEntry.objects.none()
+
+    field, value = next(iter(post_filter.items()))
+    other_field, other_model = (
+        ("organization_id", Organization) if field == "animal_id" else ("animal_id", Animal)
+    )
+    other_target_ids = (
+        Follow.objects.filter(
+            user_id=follow.user_id,
+            target_type=ContentType.objects.get_for_model(other_model),
+            notification_preferences__posts=True,
+        )
+        .exclude(pk=follow.pk)
+        .values("target_id")
+    )
+    return TimelineEntry.objects.filter(user_id=follow.user_id, **{f"post__{field}": value}).exclude(
+        **{f"post__{other_field}__in": other_target_ids}
+    )
+
+
+def remove_follow(follow: Follow) -> int:
+    """Usuwa z osi obserwującego posty celu, którego już nie obserwuje."""
+
+    deleted, _ = _follow_entries(follow).delete()
+    return deleted
+
+
+def _has_entries(follow: Follow) -> bool:
+    return _follow_entries(follow).exists()
+
+
+def sync_follow(follow_or_id: Follow | int, created: bool = False) -> int:
+    """Dopasowuje oś do bieżących preferencji obserwacji (``posts`` włączone/wyłączone).
+
+    Pełne uzupełnienie tylko dla nowej obserwacji albo gdy ``posts`` zostało
+    ponownie włączone (oś nie ma jeszcze postów celu) – zwykły ponowny zapis
+    obserwacji nic nie wstawia.
+    """
+
+    if isinstance(follow_or_id, Follow):
+        follow = follow_or_id
+    else:
+        follow = Follow.objects.filter(pk=follow_or_id).first()
+        if follow is None:
+            return 0
+
+    if not follow.notification_preferences.get("posts", False):
+        return remove_follow(follow)
+    if created or not _has_entries(follow):
+        return backfill_follow(follow)
+    return 0
+
+
+def schedule_fan_out(post: Post) -> None:
+    """Po commicie rozsyła post na osie obserwujących w wątku w tle."""
+
+    post_id = post.pk
+    transaction.on_commit(lambda: run_in_background(fan_out_post, post_id))
+
+
+def schedule_follow_sync(follow: Follow, created: bool) -> None:
+    """Po commicie dopasowuje oś obserwującego w wątku w tle."""
+
+    follow_id = follow.pk
+    transaction.on_commit(lambda: run_in_background(sync_follow, follow_id, created))
+
+
+def rebuild_timelines(user_ids: Iterable[int] | None = None, limit: int | None = None) -> int:
+    """Odbudowuje osie od zera na podstawie ``follows``; zwraca liczbę obserwacji."""
+
+    follows = Follow.objects.filter(notification_preferences__posts=True)
+    entries = TimelineEntry.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        follows = follows.filter(user_id__in=user_ids)
+        entries = entries.filter(user_id__in=user_ids)
+
+    entries.delete()
+    processed = 0
+    for follow in follows.iterator(chunk_size=_chunk_size()):
+        backfill_follow(follow, limit=limit)
+        processed += 1
+    return processed
+
+
+__all__ = [
+    "backfill_follow",
+    "fan_out_post",
+    "rebuild_timelines",
+    "remove_follow",
+    "schedule_fan_out",
+    "schedule_follow_sync",
+    "sync_follow",
+]
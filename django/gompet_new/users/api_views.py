@@ -19,6 +19,7 @@ from rest_framework_simplejwt.views import (
 )
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from common.follower_counts import annotate_followers_count
 from common.models import Notification
 from common.notifications import broadcast_user_notification, build_notification_payload
 from .models import Address, MemberRole, Organization, OrganizationMember, OrganizationType, Species, User
@@ -513,7 +514,12 @@ class OrganizationViewSet(StandardizedErrorResponseMixin, viewsets.ModelViewSet)
         if org_user_id:
             qs = qs.filter(user__id=org_user_id)
 
-        
+        if self.action in ("list", "retrieve"):
+            # ``?fields=``/``?omit=`` – relacje i kolumny tylko dla wybranych pól
+            qs = OrganizationSerializer.sparse_queryset(qs, self.request)
+            if "followers_count" in OrganizationSerializer.selected_field_names(self.request):
+                qs = annotate_followers_count(qs)
+
         return qs
 
     
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:00
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+
+def backfill_rating_counters(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Comment = apps.get_model("common", "Comment")
+    Organization = apps.get_model("users", "Organization")
+
+    content_type = ContentType.objects.filter(app_label="users", model="organization").first()
+    if content_type is None:
+        return
+
+    rows = (
+        Comment.objects.filter(content_type=content_type, rating__isnull=False)
+        .order_by()
+        .values("object_id", "rating")
+        .annotate(total=Count("id"))
+    )
+    histograms = {}
+    for row in rows:
+        histograms.setdefault(row["object_id"], {})[row["rating"]] = row["total"]
+
+    for organization_id, histogram in histograms.items():
+        total = sum(rating * votes for rating, votes in histogram.items())
+        count = sum(histogram.values())
+        Organization.objects.filter(pk=organization_id).update(
+            rating_sum=total,
+            rating_count=count,
+            rating=int(round(total / count)),
+            **{f"rating_count_{rating}": histogram.get(rating, 0) for rating in RATING_VALUES},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("common", "0012_outboxmessage"),
+        ("users", "0015_species_label"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="rating_count_1",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="rating_count_2",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="rating_count_3",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="rating_count_4",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="rating_count_5",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_counters, migrations.RunPython.noop),
+    ]
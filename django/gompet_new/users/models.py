@@ -249,6 +249,14 @@ class Organization(models.Model):
         null=True, blank=True,
         validators=[MinValueValidator(1), MaxValueValidator(5)]
     )
+    # liczniki ocen z komentarzy – aktualizowane przyrostowo (users.ratings)
+    rating_sum     = models.PositiveIntegerField(default=0, editable=False)
+    rating_count   = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_5 = models.PositiveIntegerField(default=0, editable=False)
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -270,6 +278,11 @@ class Organization(models.Model):
 
     def __str__(self) -> str:      # czytelne w adminie / shellu
         return self.name
+
+    @property
+    def rating_histogram(self) -> dict[int, int]:
+        """Liczba ocen 1–5 bez agregacji po komentarzach."""
+        return {value: getattr(self, f"rating_count_{value}") for value in range(1, 6)}
     
     
 
@@ -0,0 +1,126 @@
+"""Przyrostowa ocena organizacji liczona z ocenionych komentarzy.
+
+Organizacja trzyma sumę ocen, ich liczbę oraz histogram 1–5. Każda zmiana
+oceny komentarza to jeden ``UPDATE`` z wyrażeniami ``F()`` – bez agregacji
+po komentarzach; równoległe zmiany różnych komentarzy sumują się poprawnie.
+Poprawna różnica wymaga jednak właściwej starej oceny: ``Comment.save`` i
+``Comment.delete`` czytają ją z blokadą wiersza (``SELECT … FOR UPDATE``) w
+tej samej transakcji. Zaokrąglona ``rating`` liczona jest w tym samym
+zapytaniu z nowych wartości licznika.
+
+Zapisy omijające ``Comment.save``/``Comment.delete`` (np. ``QuerySet.delete``)
+nie aktualizują liczników – ``recalculate_organization_ratings`` odbudowuje
+je z komentarzy.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.db.models.lookups import Exact, GreaterThan, LessThan
+from django.utils import timezone
+
+from .models import Organization
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+
+def histogram_field(rating: int) -> str:
+    return f"rating_count_{rating}"
+
+
+def rounded_average(total: int, count: int) -> int | None:
+    """Średnia zaokrąglona jak ``round()`` w Pythonie (połówki do parzystej)."""
+
+    if count <= 0:
+        return None
+    return int(round(total / count))
+
+
+def _rounded_average_expression(total, count):
+    """SQL-owy odpowiednik ``rounded_average`` na liczbach całkowitych."""
+
+    quotient = total / count
+    double_remainder = (total - quotient * count) * 2
+    return Case(
+        When(Exact(count, 0), then=Value(None)),
+        When(GreaterThan(double_remainder, count), then=quotient + 1),
+        When(LessThan(double_remainder, count), then=quotient),
+        # dokładnie połowa – do parzystej, jak ``round()``
+        default=quotient + quotient % 2,
+        output_field=IntegerField(),
+    )
+
+
+def apply_rating_change(organization_id: int, old_rating: int | None, new_rating: int | None) -> int:
+    """Przenosi ocenę komentarza z ``old_rating`` na ``new_rating`` w licznikach organizacji."""
+
+    if old_rating == new_rating:
+        return 0
+
+    sum_delta = (new_rating or 0) - (old_rating or 0)
+    count_delta = int(new_rating is not None) - int(old_rating is not None)
+    total = F("rating_sum") + sum_delta
+    count = F("rating_count") + count_delta
+
+    updates = {
+        "rating_sum": total,
+        "rating_count": count,
+        "rating": _rounded_average_expression(total, count),
+        "updated_at": timezone.now(),
+    }
+    if old_rating is not None:
+        updates[histogram_field(old_rating)] = F(histogram_field(old_rating)) - 1
+    if new_rating is not None:
+        updates[histogram_field(new_rating)] = F(histogram_field(new_rating)) + 1
+
+    return Organization.objects.filter(pk=organization_id).update(**updates)
+
+
+def recalculate_organization_ratings(organization_ids: Iterable[int] | None = None) -> int:
+    """Odbudowuje liczniki z komentarzy; zwraca liczbę przeliczonych organizacji."""
+
+    from common.models import Comment
+
+    organizations = Organization.objects.all()
+    if organization_ids is not None:
+        organizations = organizations.filter(pk__in=list(organization_ids))
+
+    rows = (
+        Comment.objects.filter(
+            content_type=ContentType.objects.get_for_model(Organization),
+            object_id__in=organizations.values("pk"),
+            rating__isnull=False,
+        )
+        .order_by()
+        .values("object_id", "rating")
+        .annotate(total=Count("id"))
+    )
+    histograms: dict[int, dict[int, int]] = {}
+    for row in rows:
+        histograms.setdefault(row["object_id"], {})[row["rating"]] = row["total"]
+
+    updated = 0
+    for organization_id in organizations.values_list("pk", flat=True).iterator():
+        histogram = histograms.get(organization_id, {})
+        total = sum(rating * votes for rating, votes in histogram.items())
+        count = sum(histogram.values())
+        Organization.objects.filter(pk=organization_id).update(
+            rating_sum=total,
+            rating_count=count,
+            rating=rounded_average(total, count),
+            **{histogram_field(rating): histogram.get(rating, 0) for rating in RATING_VALUES},
+        )
+        updated += 1
+    return updated
+
+
+__all__ = [
+    "RATING_VALUES",
+    "apply_rating_change",
+    "histogram_field",
+    "recalculate_organization_ratings",
+    "rounded_average",
+]
@@ -8,6 +8,9 @@ from django.core.files.base import ContentFile
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 
+from common.follower_counts import FollowersCountListSerializer, FollowersCountSerializerMixin
+from common.sparse_fields import FieldPlan, SparseFieldsetsMixin
+
 from .models import User
 from .models import Organization, Address, OrganizationMember, BreedingTypeOrganizations, \
       BreedingType, Species
@@ -67,6 +70,21 @@ class UserSerializer(serializers.ModelSerializer):
         ]
 
 
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Skrócone dane użytkownika do osadzania w listach (np. autor posta)."""
+    full_name = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "first_name",
+            "last_name",
+            "full_name",
+            "image",
+        ]
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     """Serializer do tworzenia nowego uĹĽytkownika."""
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
@@ -260,9 +278,17 @@ class BreedingTypeSerializer(serializers.ModelSerializer):
             "description",
         ]
 
-class OrganizationSerializer(serializers.ModelSerializer):
+class OrganizationSerializer(SparseFieldsetsMixin, FollowersCountSerializerMixin, serializers.ModelSerializer):
     """Serializer odczytu organizacji wraz z adresem i powiÄ…zaniami."""
+    sparse_field_plans = {
+        "address": FieldPlan(select_related=("address",), prefetch_related=("address__species",)),
+        "rating_histogram": FieldPlan(columns=tuple(f"rating_count_{value}" for value in range(1, 6))),
+        "followers_count": FieldPlan(),
+    }
     address = AddressSerializer(required=True)
+    rating_histogram = serializers.SerializerMethodField()
+    # licznik z ``follower_counts`` – widok dokłada go podzapytaniem do listy
+    followers_count = serializers.SerializerMethodField()
     image = Base64ImageField(required=False, allow_null=True)
     # species = SpeciesOrganizationsSerializer(
     #     source='speciesorganizations_set',
@@ -286,6 +312,9 @@ class OrganizationSerializer(serializers.ModelSerializer):
             "phone",
             "description",
             "rating",
+            "rating_count",
+            "rating_histogram",
+            "followers_count",
             "created_at",
             "updated_at",
             "deleted_at",
@@ -296,6 +325,11 @@ class OrganizationSerializer(serializers.ModelSerializer):
             # "breeding_type",
         ]
         read_only_fields = ('user',)      # <- nie przyjmujemy ownera z request body
+        list_serializer_class = FollowersCountListSerializer
+
+    def get_rating_histogram(self, obj) -> dict[str, int]:
+        # klucze jako napisy – JSON i tak nie ma kluczy liczbowych
+        return {str(value): count for value, count in obj.rating_histogram.items()}
 
     def create(self, validated_data):
         address_data = validated_data.pop("address")
@@ -526,6 +560,22 @@ class LatestOrganizationSerializer(serializers.ModelSerializer):
 
 
 
+class OrganizationSummarySerializer(serializers.ModelSerializer):
+    """Skrócona organizacja do osadzania w listach – bez adresu i gatunków (brak dodatkowych zapytań)."""
+    city = serializers.CharField(source="address.city", read_only=True, default=None)
+
+    class Meta:
+        model = Organization
+        fields = [
+            "id",
+            "type",
+            "name",
+            "image",
+            "rating",
+            "city",
+        ]
+
+
 class OrganizationTypeSerializer(serializers.Serializer):
     """Representation of organization type choices."""
     value = serializers.CharField()